@@ -0,0 +1,52 @@
+"""Add creation time to parcels.
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: str | None = "f6a7b8c9d0e1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing parcels are stamped with the migration time; the application
+    # sets the value on insert, so the server default is dropped afterwards.
+    op.add_column(
+        "parcel",
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.func.current_timestamp(),
+        ),
+    )
+    op.alter_column(
+        "parcel",
+        "created_at",
+        existing_type=sa.DateTime(),
+        existing_nullable=False,
+        server_default=None,
+    )
+    op.create_index(
+        "ix_parcel_delivery_cost_rub_created_at",
+        "parcel",
+        ["delivery_cost_rub", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_parcel_delivery_cost_rub_created_at", "parcel")
+    op.drop_column("parcel", "created_at")
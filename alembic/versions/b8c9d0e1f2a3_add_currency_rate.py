@@ -0,0 +1,50 @@
+"""Add currency rate history and the rate each parcel was priced with.
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: str | None = "a7b8c9d0e1f2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "currency_rate",
+        sa.Column("id", sa.String(36), nullable=False),
+        sa.Column("rate_date", sa.Date(), nullable=False),
+        sa.Column("pair", sa.String(7), nullable=False),
+        sa.Column("value", sa.Numeric(18, 8), nullable=False),
+        sa.Column("source", sa.String(32), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("rate_date", "pair", name="uq_currency_rate_date_pair"),
+    )
+    # Parcels priced before the history existed keep a NULL reference.
+    op.add_column("parcel", sa.Column("currency_rate_id", sa.String(36), nullable=True))
+    op.create_foreign_key(
+        "fk_parcel_currency_rate_id",
+        "parcel",
+        "currency_rate",
+        ["currency_rate_id"],
+        ["id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("fk_parcel_currency_rate_id", "parcel", type_="foreignkey")
+    op.drop_column("parcel", "currency_rate_id")
+    op.drop_table("currency_rate")
@@ -0,0 +1,47 @@
+"""Record when each currency rate table was last fetched.
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c9d0e1f2a3b4"
+down_revision: str | None = "b8c9d0e1f2a3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows were last fetched when they were written; the application
+    # sets the value on insert, so the server default is dropped afterwards.
+    op.add_column(
+        "currency_rate",
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.func.current_timestamp(),
+        ),
+    )
+    op.execute("UPDATE currency_rate SET fetched_at = created_at")
+    op.alter_column(
+        "currency_rate",
+        "fetched_at",
+        existing_type=sa.DateTime(),
+        existing_nullable=False,
+        server_default=None,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("currency_rate", "fetched_at")
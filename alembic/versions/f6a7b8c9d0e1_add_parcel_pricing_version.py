@@ -0,0 +1,33 @@
+"""Add pricing version to parcels.
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f6a7b8c9d0e1"
+down_revision: str | None = "e5f6a7b8c9d0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "parcel", sa.Column("pricing_version", sa.String(length=64), nullable=True)
+    )
+    op.create_index("ix_parcel_pricing_version_id", "parcel", ["pricing_version", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_parcel_pricing_version_id", "parcel")
+    op.drop_column("parcel", "pricing_version")
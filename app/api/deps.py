@@ -13,7 +13,7 @@ from fastapi import Depends, Header, Request
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.exceptions import ForbiddenError, UnauthorizedError
-from app.core.security import TokenClaims, decode_token
+from app.core.security import TokenClaims, decode_token_cached, require_scopes
 from app.core.settings import settings
 
 log = logging.getLogger(__name__)
@@ -39,7 +39,38 @@ def get_session_id(request: Request) -> str:
     return str(request.state.session_id)
 
 
+def _claims_for(
+    request: Request,
+    token: str | None,
+    required_scopes: Iterable[str] = (),
+) -> TokenClaims:
+    """Return validated claims for the Bearer token, decoding once per request.
+
+    Several dependencies of one route may each need the claims; the first
+    decode is kept on ``request.state`` and reused for the same token.
+
+    Raises:
+        UnauthorizedError: If the token is missing, invalid, expired, or lacks
+            a required scope.
+    """
+    if not token:
+        raise UnauthorizedError("Missing authorization token")
+    memo: tuple[str, TokenClaims | None] | None = getattr(
+        request.state, "token_claims", None
+    )
+    if memo is not None and memo[0] == token:
+        claims = memo[1]
+    else:
+        claims = decode_token_cached(token)
+        request.state.token_claims = (token, claims)
+    claims = require_scopes(claims, required_scopes)
+    if claims is None:
+        raise UnauthorizedError("Invalid or expired token")
+    return claims
+
+
 async def get_current_user_id(
+    request: Request,
     token: str | None = Depends(oauth2_scheme),
 ) -> str:
     """Extract the user ID from a JWT Bearer token.
@@ -50,24 +81,15 @@ async def get_current_user_id(
     Raises:
         UnauthorizedError: If the token is missing, invalid, or expired.
     """
-    if not token:
-        raise UnauthorizedError("Missing authorization token")
-    claims = decode_token(token)
-    if claims is None:
-        raise UnauthorizedError("Invalid or expired token")
-    return claims.sub
+    return _claims_for(request, token).sub
 
 
 async def get_current_claims(
+    request: Request,
     token: str | None = Depends(oauth2_scheme),
 ) -> TokenClaims:
     """Return validated JWT claims for the current Bearer token."""
-    if not token:
-        raise UnauthorizedError("Missing authorization token")
-    claims = decode_token(token)
-    if claims is None:
-        raise UnauthorizedError("Invalid or expired token")
-    return claims
+    return _claims_for(request, token)
 
 
 async def get_owner_id(
@@ -83,12 +105,7 @@ async def get_owner_id(
     if settings.AUTH_REQUIRED:
         # JWT mode stores parcel ownership in Parcel.user_id and requires a
         # Bearer token for every protected parcel operation.
-        if not token:
-            raise UnauthorizedError("Missing authorization token")
-        claims = decode_token(token, required_scopes=required_scopes)
-        if claims is None:
-            raise UnauthorizedError("Invalid or expired token")
-        return claims.sub
+        return _claims_for(request, token, required_scopes).sub
     # Legacy mode stores parcel ownership in Parcel.session_id and relies on
     # session middleware to create/propagate X-Session-Id.
     return get_session_id(request)
@@ -9,16 +9,16 @@ from collections.abc import Sequence
 from typing import Any
 
 from fastapi import FastAPI, Request
-from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 
 from app.core.exceptions import (
     BusinessError,
     ForbiddenError,
     NotFoundError,
+    ServiceUnavailableError,
     UnauthorizedError,
 )
+from app.core.json_codec import FastJSONResponse
 
 log = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ def _error_response(
     *,
     status: int = 400,
     exc: Exception | None = None,
-) -> JSONResponse:
+) -> FastJSONResponse:
     """Return a structured JSON error response and log it.
 
     Every exception handler funnels through this helper so clients receive the
@@ -46,15 +46,15 @@ def _error_response(
         exc_info=exc,
     )
 
-    return JSONResponse(
+    # Details may hold raw validation inputs and ``ctx`` values; the shared
+    # codec converts them while encoding instead of in a separate pass.
+    return FastJSONResponse(
         status_code=status,
-        content=jsonable_encoder(
-            {"code": code, "message": message, "details": details}
-        ),
+        content={"code": code, "message": message, "details": details},
     )
 
 
-async def internal_error_handler(_request: Request, exc: Exception) -> JSONResponse:
+async def internal_error_handler(_request: Request, exc: Exception) -> FastJSONResponse:
     """Handle unexpected exceptions without leaking internal details."""
     return _error_response(
         "internal_error", "Unexpected server error", None, status=500, exc=exc
@@ -63,7 +63,7 @@ async def internal_error_handler(_request: Request, exc: Exception) -> JSONRespo
 
 async def validation_exception_handler(
     _request: Request, exc: Exception
-) -> JSONResponse:
+) -> FastJSONResponse:
     """Handle FastAPI request validation errors with the shared error envelope."""
     if not isinstance(exc, RequestValidationError):
         return await internal_error_handler(_request, exc)
@@ -75,26 +75,41 @@ async def validation_exception_handler(
     )
 
 
-async def business_error_handler(_request: Request, exc: Exception) -> JSONResponse:
+async def business_error_handler(_request: Request, exc: Exception) -> FastJSONResponse:
     """Convert domain validation failures to HTTP 400 responses."""
     return _error_response("business_error", str(exc), None, status=400)
 
 
-async def not_found_error_handler(_request: Request, exc: Exception) -> JSONResponse:
+async def not_found_error_handler(
+    _request: Request, exc: Exception
+) -> FastJSONResponse:
     """Convert missing domain resources to HTTP 404 responses."""
     return _error_response("not_found", str(exc), None, status=404)
 
 
-async def unauthorized_error_handler(_request: Request, exc: Exception) -> JSONResponse:
+async def unauthorized_error_handler(
+    _request: Request, exc: Exception
+) -> FastJSONResponse:
     """Convert authentication failures to HTTP 401 responses."""
     return _error_response("unauthorized", str(exc), None, status=401)
 
 
-async def forbidden_error_handler(_request: Request, exc: Exception) -> JSONResponse:
+async def forbidden_error_handler(
+    _request: Request, exc: Exception
+) -> FastJSONResponse:
     """Convert authorization failures to HTTP 403 responses."""
     return _error_response("forbidden", str(exc), None, status=403)
 
 
+async def service_unavailable_error_handler(
+    _request: Request, exc: Exception
+) -> FastJSONResponse:
+    """Convert capacity limits to HTTP 503 responses the client may retry."""
+    response = _error_response("service_unavailable", str(exc), None, status=503)
+    response.headers["Retry-After"] = "1"
+    return response
+
+
 def register_exception_handlers(app: FastAPI) -> None:
     """Register all custom exception handlers on the FastAPI app.
 
@@ -107,3 +122,6 @@ def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(NotFoundError, not_found_error_handler)
     app.add_exception_handler(UnauthorizedError, unauthorized_error_handler)
     app.add_exception_handler(ForbiddenError, forbidden_error_handler)
+    app.add_exception_handler(
+        ServiceUnavailableError, service_unavailable_error_handler
+    )
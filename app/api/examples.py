@@ -66,6 +66,54 @@ PARCEL_CREATE_RESPONSE_EXAMPLE = {
     "owner_id": "c83e529a-9fa9-4445-a2f5-508e2f10e3de",
 }
 
+PARCEL_BULK_RESPONSE_EXAMPLE = {
+    "owner_id": "c83e529a-9fa9-4445-a2f5-508e2f10e3de",
+    "created": 1,
+    "failed": 1,
+    "items": [
+        {
+            "index": 0,
+            "id": "99e93aee-776d-4bc5-8157-ab80a12b6556",
+            "errors": None,
+        },
+        {
+            "index": 1,
+            "id": None,
+            "errors": [
+                {
+                    "type": "unknown_parcel_type",
+                    "loc": ["parcelTypeId"],
+                    "msg": "Unknown parcel type",
+                }
+            ],
+        },
+    ],
+}
+
+PARCEL_IMPORT_JOB_EXAMPLE = {
+    "job_id": "0f6d7c5e-6a0f-4b7e-9d7f-2f0f0b7c9a11",
+    "kind": "parcel_import",
+    "status": "running",
+    "message": None,
+    "progress": {"processed": 2000, "created": 1998, "failed": 2},
+    "errors": [
+        {
+            "line": 17,
+            "type": "parse_error",
+            "msg": "Expecting ',' delimiter: line 1 column 23 (char 22)",
+        },
+        {
+            "line": 1204,
+            "type": "greater_than",
+            "loc": ["weightKg"],
+            "msg": "Input should be greater than 0",
+        },
+    ],
+    "created_at": "2026-01-01T12:00:00+00:00",
+    "started_at": "2026-01-01T12:00:00+00:00",
+    "updated_at": "2026-01-01T12:00:04+00:00",
+}
+
 PARCEL_DETAIL_EXAMPLE = {
     "id": "99e93aee-776d-4bc5-8157-ab80a12b6556",
     "name": "Apple iPhone 15 Pro",
@@ -89,4 +137,30 @@ NOT_FOUND_ERROR_EXAMPLE = {"detail": "Not found"}
 
 PARCEL_FORBIDDEN_EXAMPLE = {"detail": "Forbidden"}
 
-TASK_RECALC_RESPONSE_EXAMPLE = {"updated": 5}
+TASK_RECALC_RESPONSE_EXAMPLE = {
+    "job_id": "5b1e0c1a-2f7e-4c0e-8d51-2c7b8f0a9e42",
+    "status": "pending",
+}
+
+TASK_RECALC_JOB_EXAMPLE: dict[str, object] = {
+    "job_id": "5b1e0c1a-2f7e-4c0e-8d51-2c7b8f0a9e42",
+    "kind": "delivery_recalc",
+    "status": "completed",
+    "message": None,
+    "progress": {"parcels": 48210, "batches": 31, "shards": 16},
+    "info": {"rate": "90.1234", "version": "2026-01-01:0.5:0.01"},
+    "errors": [],
+    "created_at": "2026-01-01T12:00:00+00:00",
+    "started_at": "2026-01-01T12:00:01+00:00",
+    "updated_at": "2026-01-01T12:00:17+00:00",
+    "parcels_done": 48210,
+    "rate": "90.1234",
+    "elapsed_sec": 16.0,
+    "batches_per_sec": 1.94,
+}
+
+TASK_PRICING_VERSIONS_EXAMPLE = [
+    {"version": "2026-01-02:0.5:0.01", "parcels": 1200, "current": True},
+    {"version": "2026-01-01:0.5:0.01", "parcels": 48210, "current": False},
+    {"version": None, "parcels": 35, "current": False},
+]
@@ -6,36 +6,59 @@ not need to know whether the caller is anonymous-session or JWT-based.
 """
 
 import logging
+from collections.abc import Mapping
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_parcel_reader_owner_id, get_parcel_writer_owner_id
 from app.api.examples import (
     BUSINESS_ERROR_EXAMPLE,
+    PARCEL_BULK_RESPONSE_EXAMPLE,
     PARCEL_CREATE_RESPONSE_EXAMPLE,
     PARCEL_DETAIL_EXAMPLE,
     PARCEL_FORBIDDEN_EXAMPLE,
+    PARCEL_IMPORT_JOB_EXAMPLE,
     PARCEL_LIST_EXAMPLE,
     UNAUTHORIZED_ERROR_EXAMPLE,
     VALIDATION_ERROR_EXAMPLE,
 )
 from app.core.cache import redis_cache
 from app.core.exceptions import NotFoundError, UnauthorizedError
+from app.core.jobs import create_job, get_job
 from app.core.rate_limit import limiter
 from app.core.settings import settings
 from app.db.deps import get_db
-from app.models.parcel import Parcel
 from app.schemas import (
     ErrorResponse,
+    JobCreateResponse,
+    JobRead,
     PaginatedResponse,
     PaginationParams,
+    ParcelBulkResponse,
     ParcelCreate,
     ParcelCreateResponse,
     ParcelFilterParams,
     ParcelRead,
 )
 from app.services import ParcelService
+from app.services.parcel_export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    export_owned_parcels,
+)
+from app.services.parcel_import import JOB_KIND, ImportFormat, ParcelImportService
 
 router = APIRouter(prefix="/parcels", tags=["parcels"])
 
@@ -89,8 +112,72 @@ async def register_parcel(
     return ParcelCreateResponse(id=parcel.id, owner_id=owner_id)
 
 
+def _bulk_cost(kwargs: Mapping[str, object]) -> int:
+    """Charge bulk registration one rate-limit hit per submitted item."""
+    body = kwargs.get("body")
+    return len(body) if isinstance(body, list) else 1
+
+
+# Register many parcels in one request. Items are validated individually so
+# one bad row is reported in the response instead of rejecting the batch.
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=ParcelBulkResponse,
+    responses={
+        200: {
+            "description": "Per-item outcome of the bulk registration.",
+            "content": {"application/json": {"example": PARCEL_BULK_RESPONSE_EXAMPLE}},
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "A parcel type was removed while the batch was saved.",
+            "content": {"application/json": {"example": BUSINESS_ERROR_EXAMPLE}},
+        },
+        401: {
+            "model": ErrorResponse,
+            "description": "Missing or invalid access token.",
+            "content": {"application/json": {"example": UNAUTHORIZED_ERROR_EXAMPLE}},
+        },
+        422: {
+            "model": ErrorResponse,
+            "description": "Body is not a list or exceeds the item limit.",
+            "content": {"application/json": {"example": VALIDATION_ERROR_EXAMPLE}},
+        },
+    },
+)
+@limiter.limit(settings.RATE_LIMIT_BULK_ITEMS, cost=_bulk_cost)
+async def register_parcels_bulk(
+    request: Request,
+    body: list[dict[str, Any]] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.PARCEL_BULK_MAX_ITEMS,
+        description="Parcels in the same shape as the POST /parcels body.",
+    ),
+    db: AsyncSession = Depends(get_db),
+    owner_id: str = Depends(get_parcel_writer_owner_id),
+) -> ParcelBulkResponse:
+    """Register up to ``PARCEL_BULK_MAX_ITEMS`` parcels in one transaction."""
+    log.info(
+        "api_register_parcels_bulk_called: owner_id=%s items=%s",
+        owner_id,
+        len(body),
+    )
+    items = await ParcelService(db).create_bulk(body, owner_id)
+    created = sum(item.id is not None for item in items)
+    return ParcelBulkResponse(
+        owner_id=owner_id,
+        created=created,
+        failed=len(items) - created,
+        items=items,
+    )
+
+
 # List responses are cached per owner and query string. The short TTL keeps
 # polling cheap while allowing background delivery-cost updates to appear soon.
+# The handler returns pre-encoded JSON, so response_model only documents the
+# shape; FastAPI does not validate or re-encode a returned Response.
 @router.get(
     "",
     response_model=PaginatedResponse[ParcelRead],
@@ -113,31 +200,187 @@ async def register_parcel(
     },
 )
 @limiter.limit(settings.RATE_LIMIT_LIST)
-@redis_cache("parcels", ttl=settings.CACHE_TTL_DEFAULT)
+@redis_cache("parcels", ttl=settings.CACHE_TTL_DEFAULT, media_type="application/json")
 async def list_parcels(
     request: Request,
     pagination: PaginationParams = Depends(),
     filters: ParcelFilterParams = Depends(),
     db: AsyncSession = Depends(get_db),
     owner_id: str = Depends(get_parcel_reader_owner_id),
-) -> PaginatedResponse[ParcelRead]:
+) -> Response:
     """List parcels belonging to the current user/session, with optional filters.
 
-    Results are cached per owner and query string. The service returns both the
-    total count and current page rows so pagination metadata stays consistent.
+    Results are cached per owner and query string. The service selects plain
+    columns and encodes the page itself, so the body goes from the database
+    cursor to the client (and the cache) without ORM objects or validation.
     """
-    total, rows = await ParcelService(db).list_owned(
+    body = await ParcelService(db).list_owned_json(
         owner_id=owner_id,
         filters=filters,
         limit=pagination.limit,
         offset=pagination.offset,
     )
-    return PaginatedResponse[ParcelRead](
-        items=rows,
-        total=total,
-        limit=pagination.limit,
-        offset=pagination.offset,
+    return Response(content=body, media_type="application/json")
+
+
+# Export streams every owned parcel instead of paging. It must be declared
+# before "/{parcel_id}" so "export" is not captured as a parcel ID.
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "description": "All parcels owned by the caller, one record per line.",
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+        },
+        401: {
+            "model": ErrorResponse,
+            "description": "Missing or invalid access token.",
+            "content": {"application/json": {"example": UNAUTHORIZED_ERROR_EXAMPLE}},
+        },
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid format or filter query.",
+            "content": {"application/json": {"example": VALIDATION_ERROR_EXAMPLE}},
+        },
+    },
+)
+@limiter.limit(settings.RATE_LIMIT_EXPORT)
+async def export_parcels(
+    request: Request,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    filters: ParcelFilterParams = Depends(),
+    owner_id: str = Depends(get_parcel_reader_owner_id),
+) -> StreamingResponse:
+    """Stream the caller's parcels as NDJSON or CSV.
+
+    Rows are read through a server-side cursor and encoded batch by batch, so
+    memory use and time to first byte do not grow with the number of parcels.
+    """
+    log.info(
+        "api_export_parcels_called: owner_id=%s format=%s", owner_id, export_format
+    )
+    return StreamingResponse(
+        export_owned_parcels(owner_id, filters, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="parcels.{export_format}"'
+        },
+    )
+
+
+# File imports are two calls so the job ID is known before the upload starts:
+# POST creates the job, PUT streams the file into it, and GET polls progress.
+@router.post(
+    "/imports",
+    status_code=status.HTTP_201_CREATED,
+    response_model=JobCreateResponse,
+    responses={
+        401: {
+            "model": ErrorResponse,
+            "description": "Missing or invalid access token.",
+            "content": {"application/json": {"example": UNAUTHORIZED_ERROR_EXAMPLE}},
+        },
+    },
+)
+@limiter.limit(settings.RATE_LIMIT_IMPORT)
+async def create_parcel_import(
+    request: Request,
+    owner_id: str = Depends(get_parcel_writer_owner_id),
+) -> JobCreateResponse:
+    """Create an import job; upload the file with ``PUT /parcels/imports/{id}``."""
+    job_id = await create_job(JOB_KIND, owner_id)
+    log.info("api_parcel_import_created: job_id=%s owner_id=%s", job_id, owner_id)
+    return JobCreateResponse(job_id=job_id, status="pending")
+
+
+@router.put(
+    "/imports/{job_id}",
+    response_model=JobRead,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+    responses={
+        200: {
+            "description": "Import finished; per-line errors are in the job.",
+            "content": {"application/json": {"example": PARCEL_IMPORT_JOB_EXAMPLE}},
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "Job already started, or a line is too long.",
+            "content": {"application/json": {"example": BUSINESS_ERROR_EXAMPLE}},
+        },
+        401: {
+            "model": ErrorResponse,
+            "description": "Missing or invalid access token.",
+            "content": {"application/json": {"example": UNAUTHORIZED_ERROR_EXAMPLE}},
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Import job not found for this caller.",
+        },
+    },
+)
+@limiter.limit(settings.RATE_LIMIT_IMPORT)
+async def upload_parcel_import(
+    request: Request,
+    job_id: str,
+    import_format: ImportFormat = Query("ndjson", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    owner_id: str = Depends(get_parcel_writer_owner_id),
+) -> JobRead:
+    """Stream an NDJSON or CSV file into an import job.
+
+    The body is consumed incrementally and inserted in batches, so files of any
+    size use the same amount of memory. CSV files need a header row naming the
+    ``POST /parcels`` fields, and each record must fit on one line.
+    """
+    svc = ParcelImportService(db)
+    await svc.get_owned_job(job_id, owner_id)
+    log.info(
+        "api_parcel_import_upload_started: job_id=%s format=%s", job_id, import_format
     )
+    await svc.run(job_id, owner_id, request.stream(), import_format)
+    return JobRead.model_validate(await get_job(job_id))
+
+
+@router.get(
+    "/imports/{job_id}",
+    response_model=JobRead,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "description": "Current import progress and per-line errors.",
+            "content": {"application/json": {"example": PARCEL_IMPORT_JOB_EXAMPLE}},
+        },
+        401: {
+            "model": ErrorResponse,
+            "description": "Missing or invalid access token.",
+            "content": {"application/json": {"example": UNAUTHORIZED_ERROR_EXAMPLE}},
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Import job not found for this caller.",
+        },
+    },
+)
+@limiter.limit(settings.RATE_LIMIT_DETAIL)
+async def get_parcel_import(
+    request: Request,
+    job_id: str,
+    owner_id: str = Depends(get_parcel_reader_owner_id),
+) -> JobRead:
+    """Return the progress of an import job owned by the caller."""
+    job = await ParcelImportService.get_owned_job(job_id, owner_id)
+    return JobRead.model_validate(job)
 
 
 # Single-parcel reads use the same owner-aware cache key as list reads.
@@ -172,15 +415,16 @@ async def get_parcel(
     parcel_id: str,
     db: AsyncSession = Depends(get_db),
     owner_id: str = Depends(get_parcel_reader_owner_id),
-) -> Parcel:
+) -> ParcelRead:
     """Retrieve a single parcel by ID, ensuring it belongs to the caller.
 
     Unauthorized ownership is intentionally mapped to a generic HTTP error so
     callers cannot infer another user's parcel state from this endpoint.
     """
     log.info("api_get_parcel_called: parcel_id=%s owner_id=%s", parcel_id, owner_id)
+    svc = ParcelService(db)
     try:
-        parcel = await ParcelService(db).get_owned(parcel_id, owner_id)
+        parcel = await svc.get_owned(parcel_id, owner_id)
     except UnauthorizedError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden"
@@ -189,4 +433,5 @@ async def get_parcel(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Not found"
         ) from None
-    return parcel
+    [result] = await svc.to_read_models([parcel])
+    return result
@@ -2,24 +2,22 @@
 
 The router contains read-only operations for the reference table
 :class:`app.models.parcel_type.ParcelType` and is mounted under the
-``/parcel-types`` prefix.
+``/parcel-types`` prefix. Responses are served from the in-process parcel-type
+registry, so this router touches neither MySQL nor the Redis response cache.
 """
 
 from fastapi import APIRouter, Depends, Request, status
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.examples import PARCEL_TYPE_LIST_EXAMPLE, VALIDATION_ERROR_EXAMPLE
-from app.core.cache import make_cache_key_no_session, redis_cache
 from app.core.rate_limit import limiter
 from app.core.settings import settings
-from app.db.deps import get_db
 from app.schemas import (
     ErrorResponse,
     PaginatedResponse,
     PaginationParams,
     ParcelTypeRead,
 )
-from app.services import ParcelTypeService
+from app.services.parcel_type_registry import get_parcel_type_registry
 
 router = APIRouter(prefix="/parcel-types", tags=["parcel-types"])
 
@@ -41,32 +39,22 @@ router = APIRouter(prefix="/parcel-types", tags=["parcel-types"])
     },
 )
 @limiter.limit(settings.RATE_LIMIT_PARCEL_TYPES)
-@redis_cache(
-    "parcel_types",
-    ttl=settings.CACHE_TTL_DEFAULT,
-    key_func=make_cache_key_no_session,
-)
 async def list_parcel_types(
     request: Request,
     pagination: PaginationParams = Depends(),
-    db: AsyncSession = Depends(get_db),
 ) -> PaginatedResponse[ParcelTypeRead]:
     """Return a paginated list of all available parcel types.
 
-    Parcel types are reference data, so the cache key deliberately ignores
-    session/JWT identity. Pagination is applied after fetching the small
-    reference set ordered by the service.
+    Parcel types are reference data shared by every caller. Pagination slices
+    the registry snapshot, which is already ordered by name.
     """
-    svc = ParcelTypeService(db)
-
-    total = await svc.total()
-    rows = await svc.list_all()
+    registry = await get_parcel_type_registry()
 
-    sliced = rows[pagination.offset : pagination.offset + pagination.limit]
+    sliced = registry.items[pagination.offset : pagination.offset + pagination.limit]
 
     return PaginatedResponse[ParcelTypeRead](
-        items=sliced,
-        total=int(total or 0),
+        items=list(sliced),
+        total=len(registry.items),
         limit=pagination.limit,
         offset=pagination.offset,
     )
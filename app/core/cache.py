@@ -17,10 +17,10 @@ from collections.abc import Awaitable, Callable
 from functools import wraps
 from typing import ParamSpec, TypeVar, cast
 
-from fastapi import Request
-from fastapi.encoders import jsonable_encoder
+from fastapi import Request, Response
 from redis.asyncio import Redis
 
+from app.core import json_codec
 from app.core.settings import settings
 from app.redis_client import get_redis
 
@@ -117,6 +117,7 @@ def redis_cache(
     prefix: str,
     ttl: int = 60,
     key_func: Callable[..., str] = make_cache_key,
+    media_type: str | None = None,
 ) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
     """Decorator for caching FastAPI handler results in Redis.
 
@@ -124,6 +125,10 @@ def redis_cache(
         prefix: Cache namespace prefix (e.g. "parcel_detail").
         ttl: Time-to-live for the cache entry in seconds.
         key_func: Function used to generate cache key from request.
+        media_type: Set for handlers that return an already encoded
+            ``Response``. Its body is cached verbatim and cache hits are
+            replayed as a ``Response`` with this media type, so neither path
+            decodes or re-encodes the payload.
 
     Returns:
         Callable: A decorator that wraps an async handler function.
@@ -140,21 +145,23 @@ def redis_cache(
 
             key = key_func(prefix, request, *cache_args, **cache_kwargs)
             cached = await redis.get(key)
+            if cached and media_type is not None:
+                return cast(R, Response(content=cached, media_type=media_type))
             if cached:
                 # Cached responses are plain JSON-compatible values. FastAPI
                 # will still apply the route response_model when sending them.
-                return cast(R, json.loads(cached))
+                return cast(R, json_codec.loads(cached))
 
             result = await fn(*args, **kwargs)
 
+            if media_type is not None:
+                body = cast(Response, result).body
+                await redis.set(key, bytes(body), ex=ttl)
+                return result
+
             # FastAPI may return Pydantic models, ORM-backed response models, or
-            # plain dicts. jsonable_encoder normalizes all of them before caching.
-            serializable = jsonable_encoder(result)
-            await redis.set(
-                key,
-                json.dumps(serializable),
-                ex=ttl,
-            )
+            # plain dicts. The shared codec encodes all of them in one pass.
+            await redis.set(key, json_codec.dumps(result), ex=ttl)
             return result
 
         return wrapper
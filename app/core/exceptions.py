@@ -15,3 +15,7 @@ class UnauthorizedError(ValueError):
 
 class ForbiddenError(ValueError):
     """Access to resource is denied → HTTP 403."""
+
+
+class ServiceUnavailableError(RuntimeError):
+    """Server is temporarily at capacity and the caller should retry → HTTP 503."""
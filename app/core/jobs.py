@@ -0,0 +1,181 @@
+"""Redis-backed progress records for long-running jobs.
+
+Each job is a hash ``job:{id}`` holding its kind, owner, status, timestamps,
+integer progress counters, and string info fields, plus a capped list
+``job:{id}:errors`` of JSON error records. Producers update both in one
+pipeline so readers polling the job never see counters and errors out of step.
+Records expire ``JOB_TTL_SEC`` after their last update; writes to an expired
+record are dropped rather than recreating a partial one.
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Final, Literal, cast
+from uuid import uuid4
+
+from app.core.settings import settings
+from app.redis_client import get_redis
+
+JobStatus = Literal["pending", "running", "completed", "failed"]
+
+KEY_PREFIX: Final[str] = "job"
+# Progress counters are stored next to metadata in the same hash; the prefix
+# keeps arbitrary counter names from colliding with fixed fields.
+PROGRESS_PREFIX: Final[str] = "progress."
+INFO_PREFIX: Final[str] = "info."
+
+
+@dataclass(frozen=True)
+class Job:
+    """Snapshot of a job record read from Redis."""
+
+    job_id: str
+    kind: str
+    owner_id: str
+    status: JobStatus
+    created_at: datetime
+    updated_at: datetime
+    message: str | None = None
+    started_at: datetime | None = None
+    progress: dict[str, int] = field(default_factory=dict)
+    info: dict[str, str] = field(default_factory=dict)
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+
+def _key(job_id: str) -> str:
+    """Return the hash key holding job metadata and counters."""
+    return f"{KEY_PREFIX}:{job_id}"
+
+
+def _errors_key(job_id: str) -> str:
+    """Return the list key holding job error records."""
+    return f"{KEY_PREFIX}:{job_id}:errors"
+
+
+def _now() -> str:
+    """Return the current UTC time in the format stored on job records."""
+    return datetime.now(UTC).isoformat()
+
+
+async def create_job(kind: str, owner_id: str) -> str:
+    """Create a pending job record and return its ID.
+
+    Args:
+        kind: Short job type name, for example "parcel_import".
+        owner_id: Caller allowed to read and drive the job.
+    """
+    job_id = str(uuid4())
+    now = _now()
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.hset(
+            _key(job_id),
+            mapping={
+                "kind": kind,
+                "owner_id": owner_id,
+                "status": "pending",
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        pipe.expire(_key(job_id), settings.JOB_TTL_SEC)
+        await pipe.execute()
+    return job_id
+
+
+async def start_job(job_id: str) -> bool:
+    """Move a pending job to running, at most once.
+
+    Returns:
+        bool: False when the job has expired or was already started by
+        another request or worker, so callers can refuse to run it twice.
+    """
+    redis = get_redis()
+    if not await redis.exists(_key(job_id)):
+        return False
+    if not await redis.hsetnx(_key(job_id), "started_at", _now()):
+        return False
+    await update_job(job_id, status="running")
+    return True
+
+
+async def update_job(
+    job_id: str,
+    *,
+    status: JobStatus | None = None,
+    message: str | None = None,
+    progress: Mapping[str, int] | None = None,
+    info: Mapping[str, str] | None = None,
+    errors: Sequence[Mapping[str, Any]] = (),
+) -> None:
+    """Apply a progress update to a job in one atomic pipeline.
+
+    An expired job is left alone, so a late update from a long run never
+    recreates a record without its kind and owner.
+
+    Args:
+        job_id: Job to update.
+        status: New status, if it changes.
+        message: Human-readable status detail, for example a failure reason.
+        progress: Counter increments, added to the stored values.
+        info: String facts about the run, for example the rate it used;
+            each replaces the stored value of the same name.
+        errors: Error records to append; only the first ``JOB_MAX_ERRORS``
+            records of a job are kept.
+    """
+    redis = get_redis()
+    if not await redis.exists(_key(job_id)):
+        return
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(_key(job_id), "updated_at", _now())
+        if status is not None:
+            pipe.hset(_key(job_id), "status", status)
+        if message is not None:
+            pipe.hset(_key(job_id), "message", message)
+        for name, amount in (progress or {}).items():
+            pipe.hincrby(_key(job_id), f"{PROGRESS_PREFIX}{name}", amount)
+        for name, value in (info or {}).items():
+            pipe.hset(_key(job_id), f"{INFO_PREFIX}{name}", value)
+        if errors:
+            pipe.rpush(_errors_key(job_id), *(json.dumps(e) for e in errors))
+            pipe.ltrim(_errors_key(job_id), 0, settings.JOB_MAX_ERRORS - 1)
+            pipe.expire(_errors_key(job_id), settings.JOB_TTL_SEC)
+        pipe.expire(_key(job_id), settings.JOB_TTL_SEC)
+        await pipe.execute()
+
+
+async def get_job(job_id: str) -> Job | None:
+    """Return a job with its stored errors, or None if it expired or never existed.
+
+    A hash without ``kind`` is what remains when an update raced the record's
+    expiry; it is treated as expired too.
+    """
+    redis = get_redis()
+    raw = cast(dict[str, str], await redis.hgetall(_key(job_id)))
+    if "kind" not in raw:
+        return None
+    errors = cast(list[str], await redis.lrange(_errors_key(job_id), 0, -1))
+    return Job(
+        job_id=job_id,
+        kind=raw["kind"],
+        owner_id=raw["owner_id"],
+        status=cast(JobStatus, raw["status"]),
+        created_at=datetime.fromisoformat(raw["created_at"]),
+        updated_at=datetime.fromisoformat(raw["updated_at"]),
+        message=raw.get("message"),
+        started_at=(
+            datetime.fromisoformat(raw["started_at"]) if "started_at" in raw else None
+        ),
+        progress={
+            name.removeprefix(PROGRESS_PREFIX): int(value)
+            for name, value in raw.items()
+            if name.startswith(PROGRESS_PREFIX)
+        },
+        info={
+            name.removeprefix(INFO_PREFIX): value
+            for name, value in raw.items()
+            if name.startswith(INFO_PREFIX)
+        },
+        errors=[json.loads(error) for error in errors],
+    )
@@ -0,0 +1,99 @@
+"""Process-wide JSON encoding with an optional fast backend.
+
+Error envelopes, non-model responses, and cache payloads are all encoded here.
+When ``orjson`` is installed it is used; otherwise the stdlib ``json`` module
+is. Both backends produce the same bytes as Starlette's ``JSONResponse`` fed
+with ``jsonable_encoder`` output: compact separators, raw UTF-8, and Pydantic
+models (including their ``Decimal`` fields) rendered as in API responses.
+
+Routes with a response model do not come through here: FastAPI already dumps
+those to bytes with Pydantic's own serializer.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Final
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+
+@dataclass(frozen=True)
+class JSONCodec:
+    """Pair of encode/decode functions for one JSON backend.
+
+    Attributes:
+        name: Backend name, reported in logs and tests.
+        dumps: Encode a value to UTF-8 JSON bytes.
+        loads: Decode JSON text or bytes.
+    """
+
+    name: str
+    dumps: Callable[[object], bytes]
+    loads: Callable[[str | bytes], Any]
+
+
+def _default(obj: object) -> object:
+    """Convert values that the backends do not encode natively.
+
+    Delegating to FastAPI's encoder keeps output identical to the
+    ``jsonable_encoder`` pass this codec replaces: models are dumped in JSON
+    mode (``Decimal`` fields become strings), while bare ``Decimal`` values,
+    such as bounds in validation error ``ctx``, stay numbers.
+    """
+    return jsonable_encoder(obj)
+
+
+def stdlib_codec() -> JSONCodec:
+    """Return the codec built on the standard library ``json`` module."""
+    encoder = json.JSONEncoder(
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default,
+    )
+
+    def dumps(obj: object) -> bytes:
+        return encoder.encode(obj).encode()
+
+    return JSONCodec(name="stdlib", dumps=dumps, loads=json.loads)
+
+
+def orjson_codec() -> JSONCodec:
+    """Return the codec built on ``orjson``.
+
+    Raises:
+        ImportError: If ``orjson`` is not installed.
+    """
+    import orjson
+
+    def dumps(obj: object) -> bytes:
+        # The stdlib turns int and float dict keys into strings; so does this.
+        encoded: bytes = orjson.dumps(
+            obj, default=_default, option=orjson.OPT_NON_STR_KEYS
+        )
+        return encoded
+
+    return JSONCodec(name="orjson", dumps=dumps, loads=orjson.loads)
+
+
+def _select_codec() -> JSONCodec:
+    """Return the fastest available codec."""
+    try:
+        return orjson_codec()
+    except ImportError:
+        return stdlib_codec()
+
+
+codec: Final = _select_codec()
+dumps: Final = codec.dumps
+loads: Final = codec.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with the process-wide codec."""
+
+    def render(self, content: object) -> bytes:
+        """Encode the response content."""
+        return dumps(content)
@@ -2,10 +2,12 @@
 
 HTTP request metrics are installed by ``prometheus-fastapi-instrumentator`` in
 ``app.main``. This module defines domain metrics that are easier to alert on:
-parcel creation volume and delivery-cost job behavior.
+parcel creation volume and delivery-cost job behavior. The delivery metrics are
+updated in the scheduler process, which serves them on
+``SCHEDULER_METRICS_PORT``.
 """
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 PARCELS_CREATED = Counter(
     "parcels_created_total",
@@ -22,3 +24,87 @@ DELIVERY_RECALC_PARCELS = Counter(
     "delivery_recalc_parcels_total",
     "Total parcels recalculated",
 )
+
+DELIVERY_BATCH_DURATION = Histogram(
+    "delivery_recalc_batch_duration_seconds",
+    "Time to price and commit one delivery recalculation batch",
+    ["mode"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+DELIVERY_BATCH_SIZE = Histogram(
+    "delivery_recalc_batch_parcels",
+    "Parcels priced per delivery recalculation batch",
+    ["mode"],
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+)
+
+DELIVERY_RECALC_THROUGHPUT = Gauge(
+    "delivery_recalc_rows_per_second",
+    "Parcels priced per second by the last delivery recalculation run",
+)
+
+DELIVERY_BACKLOG = Gauge(
+    "delivery_backlog_parcels",
+    "Parcels still waiting for a delivery cost",
+)
+
+DELIVERY_OLDEST_UNPRICED_AGE = Gauge(
+    "delivery_oldest_unpriced_age_seconds",
+    "Age of the oldest parcel still waiting for a delivery cost, 0 when none",
+)
+
+DELIVERY_SHARD_SKIPS = Counter(
+    "delivery_shard_skips_total",
+    "Shards skipped because another worker held their lease",
+)
+
+DELIVERY_SCHEDULER_DECISIONS = Counter(
+    "delivery_scheduler_decisions_total",
+    "Backlog polls of the adaptive delivery scheduler, by decision",
+    ["decision"],
+)
+
+DELIVERY_SCHEDULER_BACKLOG = Gauge(
+    "delivery_scheduler_backlog_estimate",
+    "Unpriced parcels seen by the last poll, capped at DELIVERY_BURST_BACKLOG",
+)
+
+DELIVERY_SCHEDULER_DELAY = Gauge(
+    "delivery_scheduler_next_poll_seconds",
+    "Delay before the adaptive delivery scheduler polls the backlog again",
+)
+
+DELIVERY_SCHEDULER_RUNS = Gauge(
+    "delivery_scheduler_runs_in_flight",
+    "Delivery recalculation runs started by the adaptive scheduler and running",
+)
+
+RATE_STALENESS = Gauge(
+    "usd_rub_rate_staleness_seconds",
+    "Age of the rate table served in place of a failed fetch, 0 when fresh",
+)
+
+RATE_FALLBACKS = Counter(
+    "usd_rub_rate_fallbacks_total",
+    "Lookups answered with the last known good rate table after a failed fetch",
+)
+
+PRICING_STREAM_LAG = Histogram(
+    "pricing_stream_lag_seconds",
+    "Time from parcel creation event to its pricing by the stream consumer",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0, 60.0, 300.0),
+)
+
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a bcrypt call waited for a free hashing thread",
+    ["op"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "bcrypt calls refused with 503 because the hashing queue was full",
+    ["op"],
+)
@@ -5,7 +5,7 @@ The limiter is shared by all routers and attached to ``app.state`` in
 rate-limit state does not mix with response cache values.
 """
 
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Mapping
 from functools import wraps
 from typing import ParamSpec, TypeVar
 
@@ -13,8 +13,8 @@ from limits import parse
 from limits.aio.storage import RedisStorage
 from limits.aio.strategies import FixedWindowRateLimiter
 from starlette.requests import Request
-from starlette.responses import JSONResponse
 
+from app.core.json_codec import FastJSONResponse
 from app.core.settings import settings
 
 P = ParamSpec("P")
@@ -34,7 +34,9 @@ class Limiter:
     """Small FastAPI route limiter backed by Redis.
 
     The public surface intentionally stays tiny: ``@limiter.limit("20/minute")``
-    on async route handlers that accept a ``Request`` argument.
+    on async route handlers that accept a ``Request`` argument. Handlers whose
+    requests carry a variable amount of work pass ``cost`` to consume more than
+    one hit per call.
     """
 
     def __init__(self, storage_uri: str) -> None:
@@ -45,8 +47,15 @@ class Limiter:
     def limit(
         self,
         limit_value: str,
+        cost: Callable[[Mapping[str, object]], int] | None = None,
     ) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
-        """Decorate an async route handler with a fixed-window rate limit."""
+        """Decorate an async route handler with a fixed-window rate limit.
+
+        Args:
+            limit_value: Limit in ``limits`` syntax, for example "20/minute".
+            cost: Optional callable that receives the handler keyword arguments
+                and returns how many hits the call consumes. Defaults to one.
+        """
         item = parse(limit_value)
 
         def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
@@ -61,6 +70,7 @@ class Limiter:
                     item,
                     _route_identifier(request),
                     _remote_address(request),
+                    cost=cost(kwargs) if cost is not None else 1,
                 ):
                     raise RateLimitExceeded(str(item))
 
@@ -106,9 +116,9 @@ limiter = Limiter(settings.REDIS_RATE_LIMIT_URL)
 async def rate_limit_exceeded_handler(
     request: Request,
     exc: RateLimitExceeded,
-) -> JSONResponse:
+) -> FastJSONResponse:
     """Return a stable JSON response for rate-limit failures."""
-    return JSONResponse(
+    return FastJSONResponse(
         {"error": f"Rate limit exceeded: {exc.detail}"},
         status_code=429,
     )
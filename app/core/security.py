@@ -1,6 +1,17 @@
-"""JWT, refresh-token, CSRF, and password hashing utilities."""
-
-from collections.abc import Iterable, Sequence
+"""JWT, refresh-token, CSRF, and password hashing utilities.
+
+bcrypt takes a few hundred milliseconds per call by design, so request code
+uses the async wrappers, which run it on a small dedicated thread pool instead
+of the event loop (bcrypt releases the GIL while hashing). The number of calls
+running or queued per process is capped; beyond that, callers get
+``ServiceUnavailableError`` (HTTP 503) instead of waiting behind the queue.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from hashlib import sha256
@@ -11,6 +22,8 @@ from uuid import uuid4
 import bcrypt
 import jwt
 
+from app.core.exceptions import ServiceUnavailableError
+from app.core.metrics import PASSWORD_HASH_REJECTED, PASSWORD_HASH_WAIT
 from app.core.settings import DEFAULT_JWT_SECRET_KEY, settings
 
 DEFAULT_USER_ROLE = "user"
@@ -54,6 +67,79 @@ def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode(), hashed.encode())
 
 
+_hash_executor: ThreadPoolExecutor | None = None
+# Calls running or queued on the executor. Only the event loop thread
+# changes it, so a plain counter is enough.
+_hash_pending = 0
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Return the process-wide bcrypt thread pool, creating it lazily."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt",
+        )
+    return _hash_executor
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the bcrypt thread pool after the calls already queued finish."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+
+async def _run_bcrypt[T](op: str, fn: Callable[[], T]) -> T:
+    """Run a bcrypt call on the hashing pool, refusing it when the queue is full.
+
+    Args:
+        op: Metric label, ``hash`` or ``verify``.
+        fn: The blocking bcrypt call.
+
+    Raises:
+        ServiceUnavailableError: If ``PASSWORD_HASH_MAX_PENDING`` calls are
+            already running or queued.
+    """
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        PASSWORD_HASH_REJECTED.labels(op=op).inc()
+        raise ServiceUnavailableError("Authentication is busy, retry shortly")
+
+    submitted = time.perf_counter()
+
+    def _timed() -> T:
+        PASSWORD_HASH_WAIT.labels(op=op).observe(time.perf_counter() - submitted)
+        return fn()
+
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), _timed)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password like ``hash_password`` without blocking the event loop.
+
+    Raises:
+        ServiceUnavailableError: If the hashing queue is full.
+    """
+    return await _run_bcrypt("hash", lambda: hash_password(password))
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """Verify a password like ``verify_password`` without blocking the event loop.
+
+    Raises:
+        ServiceUnavailableError: If the hashing queue is full.
+    """
+    return await _run_bcrypt("verify", lambda: verify_password(plain, hashed))
+
+
 def validate_jwt_secret() -> None:
     """Fail production startup when the configured JWT secret is unsafe."""
     if settings.ENVIRONMENT != "prod":
@@ -121,6 +207,55 @@ def create_access_token(
     return token
 
 
+def _decode_claims(token: str) -> tuple[TokenClaims, float | None] | None:
+    """Verify a JWT and return its typed claims with its ``exp``, or None."""
+    try:
+        payload: dict[str, Any] = jwt.decode(
+            token,
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM],
+            issuer=settings.JWT_ISSUER,
+            audience=settings.JWT_AUDIENCE,
+        )
+    except jwt.PyJWTError:
+        return None
+    sub = payload.get("sub")
+    jti = payload.get("jti")
+    iss = payload.get("iss")
+    aud = payload.get("aud")
+    role = payload.get("role")
+    scope_value = payload.get("scope", "")
+    exp = payload.get("exp")
+    if (
+        not isinstance(sub, str)
+        or not isinstance(jti, str)
+        or not isinstance(iss, str)
+        or not isinstance(aud, str)
+        or not isinstance(role, str)
+        or not isinstance(scope_value, str)
+    ):
+        return None
+
+    claims = TokenClaims(
+        sub=sub,
+        jti=jti,
+        iss=iss,
+        aud=aud,
+        role=role,
+        scopes=tuple(scope_value.split()),
+    )
+    return claims, float(exp) if isinstance(exp, int | float) else None
+
+
+def require_scopes(
+    claims: TokenClaims | None, required_scopes: Iterable[str]
+) -> TokenClaims | None:
+    """Return the claims when they grant every required scope, otherwise None."""
+    if claims is None or not set(required_scopes).issubset(claims.scopes):
+        return None
+    return claims
+
+
 def decode_token(
     token: str,
     *,
@@ -132,41 +267,47 @@ def decode_token(
     mismatches, missing claims, and missing scopes all collapse to ``None`` so
     route dependencies can return one consistent auth error.
     """
-    try:
-        payload: dict[str, Any] = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-            issuer=settings.JWT_ISSUER,
-            audience=settings.JWT_AUDIENCE,
-        )
-        sub = payload.get("sub")
-        jti = payload.get("jti")
-        iss = payload.get("iss")
-        aud = payload.get("aud")
-        role = payload.get("role")
-        scope_value = payload.get("scope", "")
-        if (
-            not isinstance(sub, str)
-            or not isinstance(jti, str)
-            or not isinstance(iss, str)
-            or not isinstance(aud, str)
-            or not isinstance(role, str)
-            or not isinstance(scope_value, str)
-        ):
-            return None
-
-        scopes = tuple(scope_value.split())
-        if not set(required_scopes).issubset(scopes):
-            return None
-
-        return TokenClaims(
-            sub=sub,
-            jti=jti,
-            iss=iss,
-            aud=aud,
-            role=role,
-            scopes=scopes,
-        )
-    except jwt.PyJWTError:
+    decoded = _decode_claims(token)
+    return require_scopes(decoded and decoded[0], required_scopes)
+
+
+# Verified claims by SHA-256 digest of the token, least recently used first,
+# with the token's ``exp`` as a Unix timestamp. Only the event loop thread
+# touches it.
+_claims_cache: OrderedDict[bytes, tuple[TokenClaims, float]] = OrderedDict()
+
+
+def decode_token_cached(
+    token: str,
+    *,
+    required_scopes: Iterable[str] = (),
+) -> TokenClaims | None:
+    """Decode a JWT like ``decode_token``, reusing earlier verifications.
+
+    Clients send the same access token for its whole lifetime, so verified
+    claims are kept in a per-process LRU of ``JWT_CLAIMS_CACHE_SIZE`` entries
+    until the token's ``exp``. Access tokens are never revoked before they
+    expire, so a cached entry is valid exactly as long as the token. Failed
+    verifications and tokens without ``exp`` are not cached.
+    """
+    if settings.JWT_CLAIMS_CACHE_SIZE <= 0:
+        return decode_token(token, required_scopes=required_scopes)
+
+    key = sha256(token.encode()).digest()
+    cached = _claims_cache.get(key)
+    if cached is not None:
+        claims, expires_at = cached
+        if expires_at > time.time():
+            _claims_cache.move_to_end(key)
+            return require_scopes(claims, required_scopes)
+        del _claims_cache[key]
+
+    decoded = _decode_claims(token)
+    if decoded is None:
         return None
+    claims, exp = decoded
+    if exp is not None:
+        _claims_cache[key] = (claims, exp)
+        if len(_claims_cache) > settings.JWT_CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+    return require_scopes(claims, required_scopes)
@@ -5,7 +5,9 @@ must be set before importing application modules in tests and worker processes.
 """
 
 from decimal import Decimal
+from typing import Literal
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Sentinel default is intentionally rejected during production startup.
@@ -62,16 +64,83 @@ class Settings(BaseSettings):
     DELIVERY_WEIGHT_COEFF: Decimal = Decimal("0.5")
     DELIVERY_VALUE_COEFF: Decimal = Decimal("0.01")
 
-    # Delivery job settings. LOCK_TTL should be higher than the expected maximum
-    # job duration and lower than the scheduler interval if overlap must be rare.
+    # Delivery job settings. The lock is extended by a heartbeat while batches
+    # make progress, so LOCK_TTL only bounds how long a stalled or crashed run
+    # blocks the next one.
+    # DELIVERY_BATCH_SIZE is the first batch; later batches are resized within
+    # MIN..MAX so each one takes about DELIVERY_BATCH_TARGET_SEC.
     DELIVERY_BATCH_SIZE: int = 500
-    DELIVERY_LOCK_TTL: int = 330
+    DELIVERY_BATCH_MIN: int = 100
+    DELIVERY_BATCH_MAX: int = 5000
+    DELIVERY_BATCH_TARGET_SEC: float = 0.5
+    DELIVERY_LOCK_TTL: int = 60
+    # Parcels are split into DELIVERY_SHARDS primary-key ranges, each leased
+    # separately; keep it well above the number of scheduler replicas so idle
+    # replicas find unclaimed shards. Each replica prices up to
+    # DELIVERY_SHARD_CONCURRENCY shards at once, one DB connection per shard.
+    DELIVERY_SHARDS: int = 16
+    DELIVERY_SHARD_CONCURRENCY: int = 4
+    # "adaptive" polls a capped count of unpriced parcels: idle polls back off
+    # from POLL_MIN_SEC up to POLL_MAX_SEC, a backlog starts a run at once, and
+    # a backlog of at least BURST_BACKLOG keeps BURST_RUNS runs going. "cron"
+    # runs every DELIVERY_JOB_INTERVAL_MIN minutes whatever the backlog.
+    DELIVERY_SCHEDULE: Literal["adaptive", "cron"] = "adaptive"
+    DELIVERY_POLL_MIN_SEC: float = 5.0
+    DELIVERY_POLL_MAX_SEC: float = 300.0
+    DELIVERY_BURST_BACKLOG: int = 10000
+    DELIVERY_BURST_RUNS: int = 2
     DELIVERY_JOB_INTERVAL_MIN: int = 5
+    # A run stops claiming batches after RUN_BUDGET_SEC and leaves a per-shard
+    # checkpoint for the next run; with the cron schedule, keep it below the
+    # job interval. On SIGTERM the scheduler waits up to DRAIN_TIMEOUT_SEC for
+    # the current batches to commit, within the 10 s Docker gives a container
+    # to stop.
+    DELIVERY_RUN_BUDGET_SEC: float = 240.0
+    DELIVERY_DRAIN_TIMEOUT_SEC: float = 8.0
+    # "python" loads pricing columns and computes costs in Python; "sql" runs
+    # one set-based UPDATE per chunk of parcels inside MySQL.
+    DELIVERY_RECALC_MODE: Literal["python", "sql"] = "python"
+
+    # New parcel IDs are published to a Redis Stream and priced by a consumer
+    # group in the scheduler process; the cron job above remains the sweep for
+    # anything the stream missed. Entries idle longer than CLAIM_IDLE_MS in a
+    # crashed consumer's pending list are reclaimed by a live one.
+    PRICING_STREAM_ENABLED: bool = True
+    PRICING_STREAM_BATCH: int = 100
+    PRICING_STREAM_BLOCK_MS: int = 1000
+    PRICING_STREAM_CLAIM_IDLE_MS: int = 30000
+    PRICING_STREAM_MAXLEN: int = 100000
+
+    # Outbound HTTP client shared per process (exchange-rate fetches). The
+    # pool keeps up to HTTP_MAX_KEEPALIVE idle connections for
+    # HTTP_KEEPALIVE_EXPIRY_SEC between calls.
+    HTTP_TIMEOUT_SEC: float = 5.0
+    HTTP_CONNECT_TIMEOUT_SEC: float = 2.0
+    HTTP_MAX_CONNECTIONS: int = 10
+    HTTP_MAX_KEEPALIVE: int = 5
+    HTTP_KEEPALIVE_EXPIRY_SEC: float = 30.0
 
     # Cache TTLs in seconds. Parcel responses are short-lived because delivery
-    # cost can be filled asynchronously after creation.
+    # cost can be filled asynchronously after creation. A date's rate stays
+    # cached past the end of that day, so each date is fetched once.
     CACHE_TTL_DEFAULT: int = 60
-    CACHE_TTL_RATE: int = 600
+    CACHE_TTL_RATE: int = 172800
+
+    # Exchange-rate refresh. The scheduler fetches the next day's rates
+    # REFRESH_LEAD_MIN (1-59) minutes before UTC midnight. A fetch holds a
+    # per-date marker for FETCH_LOCK_SEC (longer than its retries take) so one
+    # process fetches while the others wait. After a failed fetch the last
+    # known good rates are served for STALE_RETRY_SEC before the next attempt.
+    RATE_REFRESH_LEAD_MIN: int = Field(10, ge=1, le=59)
+    RATE_FETCH_LOCK_SEC: int = 20
+    RATE_STALE_RETRY_SEC: int = 60
+
+    # Exchange-rate source: "cbr" for the Central Bank daily table, or "stub"
+    # for fixed rates read from RATE_STUB_SOURCE (a JSON file path or URL), or
+    # a built-in table when that is empty.
+    RATE_PROVIDER: Literal["cbr", "stub"] = "cbr"
+    RATE_CBR_URL: str = "https://www.cbr-xml-daily.ru/daily_json.js"
+    RATE_STUB_SOURCE: str = ""
 
     # Rate limiting values use limits syntax, for example "20/minute".
     RATE_LIMIT_DEFAULT: str = "100/minute"
@@ -80,6 +149,24 @@ class Settings(BaseSettings):
     RATE_LIMIT_DETAIL: str = "60/minute"
     RATE_LIMIT_PARCEL_TYPES: str = "100/minute"
     RATE_LIMIT_RECALC: str = "5/minute"
+    # Bulk registration is limited per parcel, not per request: each call
+    # consumes as many hits as it carries items.
+    RATE_LIMIT_BULK_ITEMS: str = "2000/minute"
+    RATE_LIMIT_EXPORT: str = "5/minute"
+    RATE_LIMIT_IMPORT: str = "5/minute"
+
+    # Maximum number of parcels accepted by one POST /parcels/bulk request.
+    PARCEL_BULK_MAX_ITEMS: int = 500
+    # Rows fetched per server-side cursor round trip by parcel export.
+    PARCEL_EXPORT_BATCH_SIZE: int = 1000
+    # Streaming import: rows validated and inserted per transaction, and the
+    # longest accepted line. Together they bound memory per upload.
+    PARCEL_IMPORT_CHUNK_SIZE: int = 1000
+    PARCEL_IMPORT_MAX_LINE_BYTES: int = 64 * 1024
+
+    # Background job records (progress and errors) kept in Redis.
+    JOB_TTL_SEC: int = 86400
+    JOB_MAX_ERRORS: int = 1000
 
     @property
     def REDIS_RATE_LIMIT_URL(self) -> str:
@@ -95,18 +182,29 @@ class Settings(BaseSettings):
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     JWT_ISSUER: str = "parcel-delivery-api"
     JWT_AUDIENCE: str = "parcel-delivery-clients"
+    # Verified access-token claims kept per worker until the token expires, so
+    # repeat requests skip signature checks; 0 disables the cache.
+    JWT_CLAIMS_CACHE_SIZE: int = 10000
     REFRESH_COOKIE_NAME: str = "refresh_token"
     CSRF_COOKIE_NAME: str = "refresh_csrf"
     CSRF_HEADER_NAME: str = "X-CSRF-Token"
     AUTH_REQUIRED: bool = True
 
+    # bcrypt runs on a dedicated thread pool of HASH_WORKERS threads, off the
+    # event loop. At most HASH_MAX_PENDING calls may be running or queued per
+    # process; further register/login requests get 503 instead of queueing.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
     # Operational shared-secret for admin-only endpoints such as manual task
     # triggers. Empty string means those endpoints are disabled by default.
     TASK_ADMIN_TOKEN: str = ""
 
-    # Observability. ENABLE_METRICS gates the Prometheus endpoint, and Sentry is
-    # disabled when SENTRY_DSN is empty.
+    # Observability. ENABLE_METRICS gates the Prometheus endpoints, and Sentry
+    # is disabled when SENTRY_DSN is empty. The scheduler process has no HTTP
+    # app, so it serves its metrics on a port of its own.
     ENABLE_METRICS: bool = True
+    SCHEDULER_METRICS_PORT: int = 9101
     SENTRY_DSN: str = ""
     SENTRY_TRACES_SAMPLE_RATE: float = 0.1
 
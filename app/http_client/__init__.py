@@ -0,0 +1,12 @@
+"""Public interface of the ``app.http_client`` package.
+
+Use these exports instead of importing ``client`` internals directly. The
+module hides the lazy singleton used for calls to external HTTP APIs.
+"""
+
+from app.http_client.client import close_http_client, get_http_client
+
+__all__ = (
+    "close_http_client",
+    "get_http_client",
+)
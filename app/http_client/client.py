@@ -0,0 +1,49 @@
+"""Lazy shared ``httpx.AsyncClient`` singleton.
+
+Outbound HTTP (today the exchange-rate fetch) goes through one pooled client
+per process, so repeated calls reuse keep-alive connections instead of paying
+for a new TCP and TLS handshake each time. The client is opened on first use
+and closed explicitly from app/scheduler lifespan hooks.
+"""
+
+import httpx
+
+from app.core.settings import settings
+
+__all__ = (
+    "close_http_client",
+    "get_http_client",
+)
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Create on first call and return the process-wide HTTP client.
+
+    Timeouts and pool limits come from the ``HTTP_*`` settings; a request
+    waits at most the connect timeout for a free pooled connection.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT_SEC,
+                connect=settings.HTTP_CONNECT_TIMEOUT_SEC,
+                pool=settings.HTTP_CONNECT_TIMEOUT_SEC,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the pooled connections and reset the singleton for shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -5,23 +5,31 @@ logging/Sentry, app lifespan, metrics, exception handlers, rate limiting,
 authentication mode, OpenAPI schema, and routers are all connected here.
 """
 
+import asyncio
 import logging
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.api import auth_router, health_router, parcel_router, parcel_type_router
 from app.api.errors import register_exception_handlers
+from app.core.json_codec import FastJSONResponse
 from app.core.logger import setup_logging
 from app.core.openapi import setup_custom_openapi
 from app.core.rate_limit import RateLimitExceeded, limiter, rate_limit_exceeded_handler
-from app.core.security import validate_jwt_secret
+from app.core.security import shutdown_password_hasher, validate_jwt_secret
 from app.core.sentry import init_sentry
 from app.core.settings import settings
+from app.http_client import close_http_client
 from app.middlewares.session import assign_session_id
 from app.redis_client import close_redis
+from app.services.parcel_type_registry import (
+    get_parcel_type_registry,
+    listen_for_parcel_type_changes,
+)
 from app.tasks.routes import router as task_router
 from app.version import __version__
 
@@ -36,15 +44,28 @@ init_sentry(release=__version__)
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan hook.
 
-    Redis is a lazy singleton shared by cache, rate lookup, and task code. Closing
-    it here prevents dangling connections when Uvicorn workers are stopped.
+    The parcel-type registry is warmed before the worker accepts requests, and
+    a listener task keeps it in sync with version bumps published by other
+    processes. Redis and the outbound HTTP client are lazy singletons shared
+    by cache, rate lookup, and task code. Closing them here prevents dangling
+    connections when Uvicorn workers are stopped; the bcrypt thread pool is
+    shut down last.
     """
+    await get_parcel_type_registry()
+    listener = asyncio.create_task(listen_for_parcel_type_changes())
     yield
+    listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await listener
+    await close_http_client()
     await close_redis()
+    shutdown_password_hasher()
 
 
 # App metadata and docs endpoints. ReDoc is intentionally disabled so Swagger UI
-# remains the single interactive entry point for local exploration.
+# remains the single interactive entry point for local exploration. Wrapping
+# the response class in Default() keeps FastAPI's Pydantic dump_json fast path
+# for routes with a response model; the codec renders everything else.
 app = FastAPI(
     title="Parcel-Delivery-API",
     version=__version__,
@@ -52,6 +73,7 @@ app = FastAPI(
     redoc_url=None,  # Disable ReDoc
     openapi_url="/openapi.json",  # OpenAPI schema endpoint
     lifespan=lifespan,
+    default_response_class=Default(FastJSONResponse),
 )
 
 # HTTP-level Prometheus metrics. The instrumentator reads ENABLE_METRICS, so the
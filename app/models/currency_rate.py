@@ -0,0 +1,71 @@
+"""Exchange-rate history used to price parcels reproducibly."""
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import Date, DateTime, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CurrencyRate(Base):
+    """One currency pair's rate for one date, as fetched from a provider.
+
+    Rates are written once per date and never updated, so a parcel that
+    references the row it was priced with can be audited or repriced later
+    without asking the provider again; only ``fetched_at`` moves forward
+    when a later fetch returns the same table.
+    """
+
+    __tablename__ = "currency_rate"
+    __table_args__ = (
+        # Lookups read one date's rows through this index alone.
+        UniqueConstraint("rate_date", "pair", name="uq_currency_rate_date_pair"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+        nullable=False,
+    )
+
+    rate_date: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+    )
+
+    # "<base>/<quote>", for example "USD/RUB".
+    pair: Mapped[str] = mapped_column(
+        String(7),
+        nullable=False,
+    )
+
+    # Price of one base unit in the quote currency.
+    value: Mapped[Decimal] = mapped_column(
+        Numeric(18, 8),
+        nullable=False,
+    )
+
+    # Provider name, for example "cbr".
+    source: Mapped[str] = mapped_column(
+        String(32),
+        nullable=False,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+
+    # Last time the provider returned this table. Providers publish nothing
+    # new on weekends and holidays, so a table fetched on a later date is
+    # what that date is served with.
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(UTC),
+        nullable=False,
+    )
@@ -5,10 +5,11 @@ both in Pydantic schemas and database check constraints so invalid data is
 rejected at the API boundary and by the database.
 """
 
+from datetime import UTC, datetime
 from decimal import Decimal
 from uuid import uuid4
 
-from sqlalchemy import CheckConstraint, ForeignKey, Numeric, String
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Index, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -32,6 +33,17 @@ class Parcel(Base):
             "delivery_cost_rub >= 0 OR delivery_cost_rub IS NULL",
             name="ck_parcel_cost_non_negative",
         ),
+        # The delivery job seeks unpriced parcels by primary key; with the cost
+        # first, the NULL rows form one contiguous range ordered by ID.
+        Index("ix_parcel_delivery_cost_rub_id", "delivery_cost_rub", "id"),
+        # Backlog size and the oldest unpriced parcel are read from this index
+        # alone: one range count and one lookup at the start of the NULL range.
+        Index(
+            "ix_parcel_delivery_cost_rub_created_at", "delivery_cost_rub", "created_at"
+        ),
+        # Repricing seeks the parcels of one stale version by primary key, and
+        # the per-version counts are read from this index alone.
+        Index("ix_parcel_pricing_version_id", "pricing_version", "id"),
     )
 
     id: Mapped[str] = mapped_column(
@@ -68,6 +80,22 @@ class Parcel(Base):
         nullable=True,
     )
 
+    # Coefficients and rate date the cost was computed with; see
+    # ``app.tasks.delivery.pricing_version``. NULL until the parcel is priced,
+    # and for parcels priced before versions were recorded.
+    pricing_version: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+
+    # Rate row the cost was computed with; NULL until the parcel is priced,
+    # and for parcels priced before rates were recorded.
+    currency_rate_id: Mapped[str | None] = mapped_column(
+        String(36),
+        ForeignKey("currency_rate.id", name="fk_parcel_currency_rate_id"),
+        nullable=True,
+    )
+
     parcel_type_id: Mapped[str] = mapped_column(
         String(36),
         ForeignKey("parcel_type.id"),
@@ -82,8 +110,14 @@ class Parcel(Base):
         nullable=True,
     )
 
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+
     parcel_type: Mapped[ParcelType] = relationship(
-        # Relationship is loaded explicitly with selectinload in read paths to
-        # keep API serialization predictable in async SQLAlchemy.
+        # API read paths embed the type from the in-process registry instead of
+        # loading this relationship, so keep it out of async response code.
         backref="parcels",
     )
@@ -17,9 +17,9 @@ class ParcelType(Base):
 
     Examples: "clothes", "electronics", "misc".
 
-    This model is typically used for UI dropdowns and filtering. Business code
-    checks this table before accepting new parcels to avoid dangling
-    ``parcel_type_id`` references.
+    This model is typically used for UI dropdowns and filtering. Workers keep
+    an in-memory snapshot of it (see ``app.services.parcel_type_registry``);
+    call ``publish_parcel_types_changed`` after editing rows so they reload.
     """
 
     __tablename__ = "parcel_type"
@@ -1,19 +1,34 @@
 """Standalone entry-point for the delivery-cost scheduler process.
 
-This script launches an APScheduler loop that periodically recalculates
-delivery costs. It is intended to run as an independent background worker.
+This script launches the loop that recalculates delivery costs, either
+adaptively from the unpriced backlog or on an APScheduler cron, next to the
+stream consumer that prices new parcels as they are created and the queue
+consumer that runs recalculations requested over the API. It is intended to
+run as an independent background worker, and serves its own Prometheus
+endpoint because the API's instrumentator does not run here.
 """
 
 import asyncio
+import logging
 import signal
 
+from prometheus_client import start_http_server
+
 from app.core.logger import setup_logging
 from app.core.security import validate_jwt_secret
 from app.core.sentry import init_sentry
+from app.core.settings import settings
+from app.http_client import close_http_client
 from app.redis_client import close_redis
+from app.tasks.adaptive_recalc import schedule_recalc_adaptively
+from app.tasks.delivery import request_recalc_stop, wait_recalc_idle
+from app.tasks.pricing_stream import consume_pricing_stream
+from app.tasks.recalc_jobs import consume_recalc_requests
 from app.tasks.scheduler import init_scheduler
 from app.version import __version__
 
+log = logging.getLogger(__name__)
+
 
 def main() -> None:
     """Launch the delivery-cost scheduler process.
@@ -24,20 +39,36 @@ def main() -> None:
     setup_logging()
     validate_jwt_secret()
     init_sentry(release=__version__)
+    if settings.ENABLE_METRICS:
+        # Serves the default registry, which holds the delivery job metrics.
+        start_http_server(settings.SCHEDULER_METRICS_PORT)
 
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
     scheduler = init_scheduler(loop)
     scheduler.start()
+    consumers = [loop.create_task(consume_recalc_requests())]
+    if settings.DELIVERY_SCHEDULE == "adaptive":
+        consumers.append(loop.create_task(schedule_recalc_adaptively()))
+    if settings.PRICING_STREAM_ENABLED:
+        consumers.append(loop.create_task(consume_pricing_stream()))
 
     def _shutdown() -> None:
         # Signal handlers cannot await directly, so schedule async cleanup on
         # the worker loop before stopping it.
         scheduler.shutdown()
+        request_recalc_stop()
         loop.create_task(_cleanup_and_stop())
 
     async def _cleanup_and_stop() -> None:
+        # Running recalculations commit their current batch, checkpoint, and
+        # release their shard leases before Redis goes away.
+        if not await wait_recalc_idle(settings.DELIVERY_DRAIN_TIMEOUT_SEC):
+            log.warning("delivery_recalc_drain_timeout")
+        for consumer in consumers:
+            consumer.cancel()
+        await close_http_client()
         await close_redis()
         loop.stop()
 
@@ -7,13 +7,19 @@ routes without a schema that documents the payload.
 
 from app.schemas.auth import TokenResponse, UserLogin, UserRead, UserRegister
 from app.schemas.common import ErrorResponse, PaginatedResponse, PaginationParams
+from app.schemas.job import DeliveryRecalcJobRead, JobCreateResponse, JobRead
 from app.schemas.parcel import (
+    ParcelBulkItemResult,
+    ParcelBulkResponse,
     ParcelCreate,
     ParcelCreateResponse,
     ParcelFilterParams,
+    ParcelPageRecord,
     ParcelRead,
+    ParcelRecord,
 )
 from app.schemas.parcel_type import ParcelTypeRead
+from app.schemas.pricing import PricingVersionRead
 
 __all__ = (
     "UserRegister",
@@ -23,9 +29,17 @@ __all__ = (
     "ErrorResponse",
     "PaginationParams",
     "PaginatedResponse",
+    "JobCreateResponse",
+    "DeliveryRecalcJobRead",
+    "JobRead",
     "ParcelCreate",
     "ParcelCreateResponse",
+    "ParcelBulkItemResult",
+    "ParcelBulkResponse",
     "ParcelRead",
+    "ParcelRecord",
+    "ParcelPageRecord",
     "ParcelFilterParams",
     "ParcelTypeRead",
+    "PricingVersionRead",
 )
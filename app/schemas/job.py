@@ -0,0 +1,103 @@
+"""Schemas for reporting the progress of long-running jobs."""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class JobCreateResponse(BaseModel):
+    """Response returned when a job is created or queued."""
+
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed"]
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "job_id": "0f6d7c5e-6a0f-4b7e-9d7f-2f0f0b7c9a11",
+                "status": "pending",
+            }
+        }
+    }
+
+
+class JobRead(BaseModel):
+    """Current state of a job as stored in Redis.
+
+    ``progress`` holds job-specific counters, for example ``processed``,
+    ``created``, and ``failed`` for parcel imports; ``info`` holds job-specific
+    string facts such as the exchange rate a run used. ``errors`` keeps the
+    first ``JOB_MAX_ERRORS`` error records in the order they were reported.
+    """
+
+    job_id: str
+    kind: str
+    status: Literal["pending", "running", "completed", "failed"]
+    message: str | None = None
+    progress: dict[str, int] = Field(default_factory=dict)
+    info: dict[str, str] = Field(default_factory=dict)
+    errors: list[dict[str, Any]] = Field(default_factory=list)
+    created_at: datetime
+    started_at: datetime | None = None
+    updated_at: datetime
+
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "example": {
+                "job_id": "0f6d7c5e-6a0f-4b7e-9d7f-2f0f0b7c9a11",
+                "kind": "parcel_import",
+                "status": "completed",
+                "message": None,
+                "progress": {"processed": 3, "created": 2, "failed": 1},
+                "errors": [
+                    {
+                        "line": 2,
+                        "type": "greater_than",
+                        "loc": ["weightKg"],
+                        "msg": "Input should be greater than 0",
+                    }
+                ],
+                "created_at": "2026-01-01T12:00:00+00:00",
+                "started_at": "2026-01-01T12:00:01+00:00",
+                "updated_at": "2026-01-01T12:00:03+00:00",
+            }
+        },
+    }
+
+
+class DeliveryRecalcJobRead(JobRead):
+    """State of a delivery-cost recalculation run with derived throughput.
+
+    ``elapsed_sec`` runs from the job's start to its last update, or to now
+    while it is still running; it is 0 until a worker picks the job up.
+    """
+
+    parcels_done: int = 0
+    rate: Decimal | None = None
+    elapsed_sec: float = 0.0
+    batches_per_sec: float = 0.0
+
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "example": {
+                "job_id": "5b1e0c1a-2f7e-4c0e-8d51-2c7b8f0a9e42",
+                "kind": "delivery_recalc",
+                "status": "running",
+                "message": None,
+                "progress": {"parcels": 12000, "batches": 9, "shards": 4},
+                "info": {"rate": "90.1234"},
+                "errors": [],
+                "created_at": "2026-01-01T12:00:00+00:00",
+                "started_at": "2026-01-01T12:00:01+00:00",
+                "updated_at": "2026-01-01T12:00:05+00:00",
+                "parcels_done": 12000,
+                "rate": "90.1234",
+                "elapsed_sec": 4.5,
+                "batches_per_sec": 2.0,
+            }
+        },
+    }
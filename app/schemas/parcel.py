@@ -5,7 +5,7 @@ Field constraints mirror database checks and keep monetary/weight values as
 """
 
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, Any, TypedDict
 
 from pydantic import UUID4, BaseModel, Field
 from pydantic.alias_generators import to_camel
@@ -72,6 +72,62 @@ class ParcelCreateResponse(BaseModel):
     }
 
 
+class ParcelBulkItemResult(BaseModel):
+    """Outcome of one item in a bulk registration request.
+
+    Exactly one of ``id`` and ``errors`` is set. ``errors`` uses the same shape
+    as the ``details`` of a validation error response, with ``loc`` relative
+    to the item.
+    """
+
+    index: int = Field(..., description="Position of the item in the request")
+    id: str | None = Field(None, description="ID of the created parcel")
+    errors: list[dict[str, Any]] | None = Field(
+        None, description="Why the item was rejected"
+    )
+
+
+class ParcelBulkResponse(BaseModel):
+    """Response returned after bulk parcel registration.
+
+    Valid items are created even when other items in the same request are
+    rejected; ``items`` reports the outcome per request position.
+    """
+
+    owner_id: str
+    created: int
+    failed: int
+    items: list[ParcelBulkItemResult]
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "owner_id": "c83e529a-9fa9-4445-a2f5-508e2f10e3de",
+                "created": 1,
+                "failed": 1,
+                "items": [
+                    {
+                        "index": 0,
+                        "id": "99e93aee-776d-4bc5-8157-ab80a12b6556",
+                        "errors": None,
+                    },
+                    {
+                        "index": 1,
+                        "id": None,
+                        "errors": [
+                            {
+                                "type": "greater_than",
+                                "loc": ["weightKg"],
+                                "msg": "Input should be greater than 0",
+                            }
+                        ],
+                    },
+                ],
+            }
+        }
+    }
+
+
 class ParcelRead(BaseModel):
     """Response schema when returning a single parcel or a list item."""
 
@@ -104,6 +160,30 @@ class ParcelRead(BaseModel):
     }
 
 
+class ParcelRecord(TypedDict):
+    """``ParcelRead`` as a plain dict keyed by its camelCase JSON names.
+
+    Read paths that select columns with SQLAlchemy Core build these records and
+    dump them with a ``TypeAdapter``, which serializes without validating.
+    """
+
+    id: str
+    name: str
+    weightKg: Decimal
+    declaredValueUsd: Decimal
+    deliveryCostRub: Decimal | None
+    parcelType: ParcelTypeRead
+
+
+class ParcelPageRecord(TypedDict):
+    """``PaginatedResponse[ParcelRead]`` as a plain dict of ``ParcelRecord``."""
+
+    items: list[ParcelRecord]
+    total: int
+    limit: int
+    offset: int
+
+
 class ParcelFilterParams(BaseModel):
     """Query parameters used to filter the parcel list.
 
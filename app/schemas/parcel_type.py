@@ -1,7 +1,8 @@
 """Schemas for reading parcel type directory entries.
 
 Parcel types are reference data returned directly and nested inside parcel
-responses. The schema uses aliases consistently with other public payloads.
+responses. The schema uses aliases consistently with other public payloads and
+is frozen because instances are shared by the in-process parcel-type registry.
 """
 
 from pydantic import BaseModel, Field
@@ -25,6 +26,7 @@ class ParcelTypeRead(BaseModel):
         "alias_generator": to_camel,
         "populate_by_name": True,
         "from_attributes": True,
+        "frozen": True,
         "json_schema_extra": {
             "example": {
                 "id": "a3a814f4-4724-4947-b6ab-8337f3b33969",
@@ -0,0 +1,26 @@
+"""Schemas for reporting how parcels were priced."""
+
+from pydantic import BaseModel
+
+
+class PricingVersionRead(BaseModel):
+    """Number of parcels carrying one pricing version.
+
+    ``version`` names the rate date and formula coefficients the costs were
+    computed with; it is null for parcels not yet priced or priced before
+    versions were recorded. ``current`` marks today's version.
+    """
+
+    version: str | None
+    parcels: int
+    current: bool
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "version": "2026-01-01:0.5:0.01",
+                "parcels": 48210,
+                "current": True,
+            }
+        }
+    }
@@ -7,9 +7,10 @@ handle password hashes, refresh token hashes, or JWT construction directly.
 import logging
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from typing import Any, cast
 from uuid import uuid4
 
-from sqlalchemy import select, update
+from sqlalchemy import CursorResult, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import BusinessError, UnauthorizedError
@@ -19,9 +20,9 @@ from app.core.security import (
     create_access_token,
     create_csrf_token,
     create_refresh_token,
-    hash_password,
+    hash_password_async,
     hash_token,
-    verify_password,
+    verify_password_async,
 )
 from app.core.settings import settings
 from app.models.refresh_token import RefreshToken
@@ -53,7 +54,8 @@ class AuthService:
         if existing:
             raise BusinessError("Email already registered")
 
-        user = User(email=email, hashed_password=hash_password(password))
+        hashed_password = await hash_password_async(password)
+        user = User(email=email, hashed_password=hashed_password)
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
@@ -65,7 +67,7 @@ class AuthService:
     async def login(self, email: str, password: str) -> AuthResult:
         """Authenticate a user and return access/refresh credentials."""
         user = await self.session.scalar(select(User).where(User.email == email))
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await verify_password_async(password, user.hashed_password):
             raise UnauthorizedError("Invalid email or password")
 
         result = await self._issue_tokens(user)
@@ -73,8 +75,24 @@ class AuthService:
         return result
 
     async def refresh(self, raw_refresh_token: str) -> AuthResult:
-        """Rotate a valid refresh token and return a new credential set."""
-        token = await self._get_refresh_token(raw_refresh_token)
+        """Rotate a valid refresh token and return a new credential set.
+
+        The token and its user are read in one joined query. The old token is
+        then claimed with an UPDATE that only matches while it is unrevoked,
+        so of two concurrent rotations of one token exactly one wins and the
+        other is handled as reuse. The claim and the replacement's INSERT are
+        committed together.
+        """
+        row = (
+            await self.session.execute(
+                select(RefreshToken, User)
+                .outerjoin(User, User.id == RefreshToken.user_id)
+                .where(RefreshToken.token_hash == hash_token(raw_refresh_token))
+            )
+        ).first()
+        if row is None:
+            raise UnauthorizedError("Invalid refresh token")
+        token, user = row.tuple()
         now = self._now()
 
         if token.revoked_at is not None:
@@ -82,21 +100,19 @@ class AuthService:
             await self.session.commit()
             raise UnauthorizedError("Invalid refresh token")
 
-        if token.expires_at <= now:
-            token.revoked_at = now
+        if token.expires_at <= now or user is None:
+            await self._claim(token.jti, now)
             await self.session.commit()
             raise UnauthorizedError("Invalid refresh token")
 
-        user = await self.session.scalar(select(User).where(User.id == token.user_id))
-        if user is None:
-            token.revoked_at = now
+        raw_token, jti = create_refresh_token()
+        if not await self._claim(token.jti, now, replaced_by_jti=jti):
+            # Another request rotated this token since it was read.
+            await self._revoke_family(token.family_id, now)
             await self.session.commit()
             raise UnauthorizedError("Invalid refresh token")
 
-        raw_token, jti = create_refresh_token()
         csrf_token = create_csrf_token()
-        token.revoked_at = now
-        token.replaced_by_jti = jti
         self.session.add(
             RefreshToken(
                 jti=jti,
@@ -175,6 +191,25 @@ class AuthService:
             raise UnauthorizedError("Invalid refresh token")
         return token
 
+    async def _claim(
+        self,
+        jti: str,
+        revoked_at: datetime,
+        replaced_by_jti: str | None = None,
+    ) -> bool:
+        """Revoke a token unless already revoked; return whether this call did."""
+        result = cast(
+            CursorResult[Any],
+            await self.session.execute(
+                update(RefreshToken)
+                .where(RefreshToken.jti == jti)
+                .where(RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=revoked_at, replaced_by_jti=replaced_by_jti)
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        return result.rowcount == 1
+
     async def _revoke_family(self, family_id: str, revoked_at: datetime) -> None:
         await self.session.execute(
             update(RefreshToken)
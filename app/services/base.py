@@ -40,7 +40,7 @@ class CRUDBase(Generic[ModelT]):
         """
         self.session = session
 
-    async def _commit(self, *instances: ModelT) -> None:
+    async def _commit(self, *instances: ModelT, refresh: bool = True) -> None:
         """Persist one or more ORM instances and refresh them.
 
         The objects are added to the session, `commit` is issued, and each
@@ -49,11 +49,16 @@ class CRUDBase(Generic[ModelT]):
 
         Args:
             *instances: Arbitrary collection of ORM objects to be saved.
+            refresh: Reload the instances after commit. Callers that set every
+                column themselves can pass ``False`` to skip one SELECT per
+                instance.
         """
         # Stage instances for insertion/update and refresh them after commit so
         # callers can safely read generated IDs/defaults immediately.
         self.session.add_all(instances)
         await self.session.commit()
+        if not refresh:
+            return
         for inst in instances:
             await self.session.refresh(inst)
 
@@ -2,25 +2,129 @@
 
 Parcel routes delegate here for all database-facing rules: parcel type
 existence, owner assignment, owner checks, list filters, and delivery-cost
-updates from the background job.
+updates from the background job. Parcel types come from the in-process
+registry or the foreign key, so none of these paths query the ``parcel_type``
+table.
 """
 
 import logging
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable, Sequence
 from decimal import Decimal
+from typing import Any, Final
+from uuid import uuid4
 
-from sqlalchemy import and_, func, select
-from sqlalchemy.orm import selectinload
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import ColumnElement, and_, func, insert, select
+from sqlalchemy.exc import IntegrityError
 
 from app.core.exceptions import BusinessError, NotFoundError, UnauthorizedError
 from app.core.metrics import PARCELS_CREATED
 from app.core.settings import settings
 from app.models.parcel import Parcel
-from app.models.parcel_type import ParcelType
-from app.schemas import ParcelCreate, ParcelFilterParams
+from app.schemas import (
+    ParcelBulkItemResult,
+    ParcelCreate,
+    ParcelFilterParams,
+    ParcelPageRecord,
+    ParcelRead,
+    ParcelRecord,
+)
 from app.services.base import CRUDBase
+from app.services.parcel_type_registry import (
+    ParcelTypeRegistry,
+    get_parcel_type_registry,
+    reload_parcel_type_registry_on_miss,
+)
+from app.services.pricing_events import publish_parcels_created
 
 log = logging.getLogger(__name__)
 
+# Built once at import: bulk registration validates every item with the same
+# compiled validator instead of letting FastAPI reject the whole request.
+_PARCEL_CREATE_ADAPTER: Final = TypeAdapter(ParcelCreate)
+
+_UNKNOWN_TYPE_ERROR: Final[dict[str, Any]] = {
+    "type": "unknown_parcel_type",
+    "loc": ["parcelTypeId"],
+    "msg": "Unknown parcel type",
+}
+
+
+# Columns behind the list and export read paths. Selecting them with Core
+# skips ORM instances, identity-map bookkeeping, and response-model validation.
+PARCEL_ROW_COLUMNS: Final = (
+    Parcel.id,
+    Parcel.name,
+    Parcel.weight_kg,
+    Parcel.declared_value_usd,
+    Parcel.delivery_cost_rub,
+    Parcel.parcel_type_id,
+)
+ParcelRow = tuple[str, str, Decimal, Decimal, Decimal | None, str]
+
+# Serializers for the ``ParcelRead`` JSON shape, compiled once at import.
+# Records are plain dicts, so dumping them does not validate anything.
+PARCEL_RECORD_JSON: Final = TypeAdapter(ParcelRecord)
+PARCEL_PAGE_JSON: Final = TypeAdapter(ParcelPageRecord)
+
+
+async def registry_covering(parcel_type_ids: Iterable[str]) -> ParcelTypeRegistry:
+    """Return a registry snapshot, reloading if any type ID is missing.
+
+    The foreign key guarantees every stored type exists, so a registry miss
+    means this worker's snapshot predates a type change it has not been
+    notified about yet. Type IDs from client input may simply be unknown, so
+    the reload is throttled (see ``reload_parcel_type_registry_on_miss``);
+    the resulting snapshot is returned either way and the caller decides.
+    """
+    registry = await get_parcel_type_registry()
+    if any(parcel_type_id not in registry for parcel_type_id in parcel_type_ids):
+        registry = await reload_parcel_type_registry_on_miss()
+    return registry
+
+
+def parcel_record(row: ParcelRow, registry: ParcelTypeRegistry) -> ParcelRecord:
+    """Shape a selected row like ``ParcelRead``, embedding its parcel type."""
+    id_, name, weight_kg, value_usd, cost_rub, type_id = row
+    return {
+        "id": id_,
+        "name": name,
+        "weightKg": weight_kg,
+        "declaredValueUsd": value_usd,
+        "deliveryCostRub": cost_rub,
+        "parcelType": registry.by_id[type_id],
+    }
+
+
+def _owned_conditions(
+    owner_id: str,
+    filters: ParcelFilterParams,
+) -> list[ColumnElement[bool]]:
+    """Build WHERE predicates for the caller's parcels and optional filters."""
+    # Build ownership predicates first; optional filters are added below.
+    if settings.AUTH_REQUIRED:
+        conditions = [Parcel.user_id == owner_id]
+    else:
+        conditions = [Parcel.session_id == owner_id]
+
+    if filters.type_id:
+        conditions.append(Parcel.parcel_type_id == str(filters.type_id))
+    if filters.has_cost is True:
+        # Delivery cost is filled asynchronously; this filter lets clients
+        # separate ready parcels from those still waiting for the job.
+        conditions.append(Parcel.delivery_cost_rub.is_not(None))
+    if filters.has_cost is False:
+        conditions.append(Parcel.delivery_cost_rub.is_(None))
+    return conditions
+
+
+def _owner_fields(owner_id: str) -> dict[str, str | None]:
+    """Map an owner ID onto the ownership columns for the active auth mode."""
+    if settings.AUTH_REQUIRED:
+        return {"session_id": "", "user_id": owner_id}
+    return {"session_id": owner_id, "user_id": None}
+
 
 class ParcelService(CRUDBase[Parcel]):
     """Business-logic facade for CRUD operations on ``Parcel``.
@@ -34,43 +138,134 @@ class ParcelService(CRUDBase[Parcel]):
     async def create_from_dto(self, data: ParcelCreate, owner_id: str) -> Parcel:
         """Create and persist a new parcel from a validated DTO.
 
+        This is the hot write path, so it costs one INSERT and one COMMIT: the
+        ``parcel_type`` foreign key validates the type, and every column is
+        set here, so there is nothing to read back after the commit. The new
+        ID is then published to the pricing stream.
+
         Args:
             data: Incoming API payload mapped to ``ParcelCreate``.
             owner_id: Session ID or user ID depending on AUTH_REQUIRED.
 
         Returns:
-            Parcel: The newly created parcel, refreshed from the database.
-        """
-        # Validate the reference table before creating the parcel. The database
-        # foreign key would also reject invalid IDs, but this keeps the error in
-        # the business-error envelope used by the API.
-        type_exists = await self.session.scalar(
-            select(ParcelType.id).where(ParcelType.id == data.parcel_type_id)
-        )
-        if not type_exists:
-            log.warning("unknown_parcel_type: parcel_type_id=%s", data.parcel_type_id)
-            raise BusinessError("Unknown parcel type")
+            Parcel: The newly created parcel with all columns populated.
 
+        Raises:
+            BusinessError: If the weight is not positive or the parcel type
+                does not exist.
+        """
         if data.weight_kg <= 0:
             raise BusinessError("Weight must be positive")
 
         # Keep both ownership modes in one creation path so API handlers do not
-        # duplicate session/JWT branching.
+        # duplicate session/JWT branching. The ID and pending cost are set
+        # explicitly so the instance is complete without a post-commit refresh.
         parcel = Parcel(
+            id=str(uuid4()),
             name=data.name,
             weight_kg=data.weight_kg,
             declared_value_usd=data.declared_value_usd,
+            delivery_cost_rub=None,
             parcel_type_id=data.parcel_type_id,
-            session_id=owner_id if not settings.AUTH_REQUIRED else "",
-            user_id=owner_id if settings.AUTH_REQUIRED else None,
+            **_owner_fields(owner_id),
         )
 
-        await self._commit(parcel)
+        try:
+            await self._commit(parcel, refresh=False)
+        except IntegrityError as exc:
+            await self.session.rollback()
+            if "parcel_type_id" not in str(exc.orig):
+                raise
+            log.warning("unknown_parcel_type: parcel_type_id=%s", data.parcel_type_id)
+            raise BusinessError("Unknown parcel type") from exc
 
+        await publish_parcels_created([parcel.id])
         PARCELS_CREATED.labels(parcel_type=str(data.parcel_type_id)).inc()
         log.info("parcel_created: parcel=%s, owner_id=%s", parcel.id, owner_id)
         return parcel
 
+    async def create_bulk(
+        self,
+        payload: Sequence[object],
+        owner_id: str,
+    ) -> list[ParcelBulkItemResult]:
+        """Validate and persist many parcels in one transaction.
+
+        Items are validated one by one so a bad item is reported instead of
+        failing the request. Parcel types are checked against the registry once
+        for the whole batch, and the valid rows are written with a single
+        executemany INSERT and one COMMIT before their IDs are published to
+        the pricing stream.
+
+        Args:
+            payload: Raw request items, each expected to match ``ParcelCreate``.
+            owner_id: Session ID or user ID depending on AUTH_REQUIRED.
+
+        Returns:
+            list[ParcelBulkItemResult]: One result per payload item, in order.
+
+        Raises:
+            BusinessError: If a parcel type disappears between the registry
+                check and the INSERT; nothing is written in that case.
+        """
+        results = [ParcelBulkItemResult(index=index) for index in range(len(payload))]
+        valid: list[tuple[int, ParcelCreate]] = []
+        for index, raw in enumerate(payload):
+            try:
+                valid.append((index, _PARCEL_CREATE_ADAPTER.validate_python(raw)))
+            except ValidationError as exc:
+                results[index].errors = [
+                    dict(error)
+                    for error in exc.errors(
+                        include_url=False, include_context=False, include_input=False
+                    )
+                ]
+
+        registry = await registry_covering(dto.parcel_type_id for _, dto in valid)
+
+        owner = _owner_fields(owner_id)
+        rows: list[dict[str, Any]] = []
+        created_by_type: Counter[str] = Counter()
+        for index, dto in valid:
+            if dto.parcel_type_id not in registry:
+                results[index].errors = [dict(_UNKNOWN_TYPE_ERROR)]
+                continue
+            results[index].id = str(uuid4())
+            created_by_type[dto.parcel_type_id] += 1
+            rows.append(
+                {
+                    "id": results[index].id,
+                    "name": dto.name,
+                    "weight_kg": dto.weight_kg,
+                    "declared_value_usd": dto.declared_value_usd,
+                    "delivery_cost_rub": None,
+                    "parcel_type_id": dto.parcel_type_id,
+                    **owner,
+                }
+            )
+
+        if rows:
+            try:
+                await self.session.execute(insert(Parcel), rows)
+                await self.session.commit()
+            except IntegrityError as exc:
+                await self.session.rollback()
+                if "parcel_type_id" not in str(exc.orig):
+                    raise
+                log.warning("unknown_parcel_type_in_bulk: owner_id=%s", owner_id)
+                raise BusinessError("Unknown parcel type") from exc
+            await publish_parcels_created([row["id"] for row in rows])
+
+        for parcel_type_id, count in created_by_type.items():
+            PARCELS_CREATED.labels(parcel_type=parcel_type_id).inc(count)
+        log.info(
+            "parcels_bulk_created: owner_id=%s created=%s failed=%s",
+            owner_id,
+            len(rows),
+            len(payload) - len(rows),
+        )
+        return results
+
     async def get_owned(self, parcel_id: str, owner_id: str) -> Parcel:
         """Fetch a parcel and verify that it belongs to the caller.
 
@@ -78,11 +273,7 @@ class ParcelService(CRUDBase[Parcel]):
             parcel_id: Primary key of the parcel.
             owner_id: Caller's session or user identifier.
         """
-        stmt = (
-            select(Parcel)
-            .options(selectinload(Parcel.parcel_type))
-            .where(Parcel.id == parcel_id)
-        )
+        stmt = select(Parcel).where(Parcel.id == parcel_id)
         parcel = await self.session.scalar(stmt)
 
         if parcel is None:
@@ -112,37 +303,86 @@ class ParcelService(CRUDBase[Parcel]):
         filters: ParcelFilterParams,
         limit: int,
         offset: int,
-    ) -> tuple[int, list[Parcel]]:
-        """Return a page of parcels owned by the caller, with optional filters."""
-        # Build ownership predicates first; optional filters are added below.
-        if settings.AUTH_REQUIRED:
-            conditions = [Parcel.user_id == owner_id]
-        else:
-            conditions = [Parcel.session_id == owner_id]
+    ) -> tuple[int, list[ParcelRow]]:
+        """Return a page of the caller's parcels as plain column tuples.
 
-        if filters.type_id:
-            conditions.append(Parcel.parcel_type_id == filters.type_id)
-        if filters.has_cost is True:
-            # Delivery cost is filled asynchronously; this filter lets clients
-            # separate ready parcels from those still waiting for the job.
-            conditions.append(Parcel.delivery_cost_rub.is_not(None))
-        if filters.has_cost is False:
-            conditions.append(Parcel.delivery_cost_rub.is_(None))
+        Only ``PARCEL_ROW_COLUMNS`` are selected; no ORM instances are built.
+        """
+        conditions = and_(*_owned_conditions(owner_id, filters))
 
-        stmt = (
-            select(Parcel)
-            .options(selectinload(Parcel.parcel_type))
-            .where(and_(*conditions))
+        total = await self.session.scalar(
+            select(func.count()).select_from(Parcel).where(conditions)
         )
 
-        total = await self.session.scalar(
-            select(func.count()).select_from(stmt.subquery())
+        result = await self.session.execute(
+            select(*PARCEL_ROW_COLUMNS)
+            .where(conditions)
+            .order_by(Parcel.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return int(total or 0), list(result.tuples().all())
+
+    async def list_owned_json(
+        self,
+        owner_id: str,
+        filters: ParcelFilterParams,
+        limit: int,
+        offset: int,
+    ) -> bytes:
+        """Return a page of the caller's parcels encoded as response JSON.
+
+        The bytes match ``PaginatedResponse[ParcelRead]`` as FastAPI would
+        render it, but rows go straight from the cursor to the serializer.
+        """
+        total, rows = await self.list_owned(owner_id, filters, limit, offset)
+        registry = await registry_covering(row[5] for row in rows)
+        return PARCEL_PAGE_JSON.dump_json(
+            {
+                "items": [parcel_record(row, registry) for row in rows],
+                "total": total,
+                "limit": limit,
+                "offset": offset,
+            }
         )
 
-        rows = await self.session.scalars(
-            stmt.order_by(Parcel.id).limit(limit).offset(offset)
+    async def stream_owned(
+        self,
+        owner_id: str,
+        filters: ParcelFilterParams,
+    ) -> AsyncIterator[Sequence[ParcelRow]]:
+        """Yield the caller's parcels in primary-key order, one batch at a time.
+
+        The query runs on a server-side cursor and fetches
+        ``PARCEL_EXPORT_BATCH_SIZE`` rows per round trip, so memory stays
+        bounded by the batch size regardless of how many parcels the owner
+        has. Only the columns needed for export are selected; parcel types are
+        resolved from the registry by the caller.
+        """
+        stmt = (
+            select(*PARCEL_ROW_COLUMNS)
+            .where(and_(*_owned_conditions(owner_id, filters)))
+            .order_by(Parcel.id)
+            .execution_options(yield_per=settings.PARCEL_EXPORT_BATCH_SIZE)
         )
-        return int(total or 0), list(rows.all())
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield [row._tuple() for row in partition]
+
+    async def to_read_models(self, parcels: Sequence[Parcel]) -> list[ParcelRead]:
+        """Build response models, embedding parcel types from the registry."""
+        registry = await registry_covering(parcel.parcel_type_id for parcel in parcels)
+        return [
+            ParcelRead(
+                id=parcel.id,
+                name=parcel.name,
+                weight_kg=parcel.weight_kg,
+                declared_value_usd=parcel.declared_value_usd,
+                delivery_cost_rub=parcel.delivery_cost_rub,
+                parcel_type=registry.by_id[parcel.parcel_type_id],
+            )
+            for parcel in parcels
+        ]
 
     async def set_delivery_cost(self, parcel: Parcel, cost_rub: Decimal) -> None:
         """Persist the delivery cost calculated for a parcel."""
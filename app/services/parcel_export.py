@@ -0,0 +1,93 @@
+"""Incremental NDJSON/CSV encoding for the parcel export endpoint.
+
+Export streams every parcel an owner has, so nothing here holds more than one
+cursor batch: rows come from ``ParcelService.stream_owned`` and each batch is
+encoded into a single chunk of bytes for ``StreamingResponse``.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Final, Literal
+
+from app.db.session import AsyncSessionLocal
+from app.schemas import ParcelFilterParams
+from app.services.parcel import (
+    PARCEL_RECORD_JSON,
+    ParcelRow,
+    ParcelService,
+    parcel_record,
+    registry_covering,
+)
+from app.services.parcel_type_registry import ParcelTypeRegistry
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: Final[dict[ExportFormat, str]] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_HEADER: Final = (
+    "id",
+    "name",
+    "weightKg",
+    "declaredValueUsd",
+    "deliveryCostRub",
+    "parcelTypeId",
+    "parcelTypeName",
+)
+
+
+def encode_ndjson(rows: Sequence[ParcelRow], registry: ParcelTypeRegistry) -> bytes:
+    """Encode rows as NDJSON lines in the ``ParcelRead`` camelCase shape."""
+    lines = [PARCEL_RECORD_JSON.dump_json(parcel_record(row, registry)) for row in rows]
+    lines.append(b"")
+    return b"\n".join(lines)
+
+
+def encode_csv(rows: Sequence[ParcelRow], registry: ParcelTypeRegistry) -> bytes:
+    """Encode rows as CSV records matching ``CSV_HEADER``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for id_, name, weight_kg, value_usd, cost_rub, type_id in rows:
+        writer.writerow(
+            (
+                id_,
+                name,
+                weight_kg,
+                value_usd,
+                "" if cost_rub is None else cost_rub,
+                type_id,
+                registry.by_id[type_id].name,
+            )
+        )
+    return buffer.getvalue().encode()
+
+
+ENCODERS: Final[
+    dict[ExportFormat, Callable[[Sequence[ParcelRow], ParcelTypeRegistry], bytes]]
+] = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+}
+
+
+async def export_owned_parcels(
+    owner_id: str,
+    filters: ParcelFilterParams,
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Yield the caller's parcels as encoded chunks, one per cursor batch.
+
+    The generator opens its own session because it runs while the response is
+    being sent, after request-scoped dependencies may already be closed.
+    """
+    encode = ENCODERS[export_format]
+    if export_format == "csv":
+        yield (",".join(CSV_HEADER) + "\n").encode()
+
+    async with AsyncSessionLocal() as session:
+        async for batch in ParcelService(session).stream_owned(owner_id, filters):
+            registry = await registry_covering(row[5] for row in batch)
+            yield encode(batch, registry)
@@ -0,0 +1,195 @@
+"""Streaming parcel import from NDJSON or CSV uploads.
+
+Uploads are read chunk by chunk from the request body, split into lines, and
+grouped into batches of ``PARCEL_IMPORT_CHUNK_SIZE`` rows. Each batch goes
+through ``ParcelService.create_bulk`` (same validation, registry check, and
+single INSERT per transaction as ``POST /parcels/bulk``), so peak memory
+depends on the batch size and the line limit, not on the file size.
+
+Progress and per-line errors are written to the job record after every batch,
+so clients can poll the job while the upload is still running.
+"""
+
+import csv
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any, Final, Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BusinessError, NotFoundError
+from app.core.jobs import Job, get_job, start_job, update_job
+from app.core.settings import settings
+from app.services.parcel import ParcelService
+
+log = logging.getLogger(__name__)
+
+ImportFormat = Literal["ndjson", "csv"]
+
+JOB_KIND: Final[str] = "parcel_import"
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int,
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering more than one line.
+
+    Both LF and CRLF line endings are accepted; a final line without a trailing
+    newline is still yielded.
+
+    Raises:
+        BusinessError: If a line is longer than ``max_line_bytes``.
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            _check_line_length(end - start, max_line_bytes)
+            yield bytes(buffer[start:end]).rstrip(b"\r")
+            start = end + 1
+        del buffer[:start]
+        # What is left is the start of a line whose end has not arrived yet.
+        _check_line_length(len(buffer), max_line_bytes)
+    if buffer:
+        yield bytes(buffer).rstrip(b"\r")
+
+
+def _check_line_length(length: int, max_line_bytes: int) -> None:
+    """Reject lines that would make the line buffer grow without bound."""
+    if length > max_line_bytes:
+        raise BusinessError(f"Line exceeds {max_line_bytes} bytes")
+
+
+class _CsvRows:
+    """Turn CSV lines into dicts keyed by the header on the first line."""
+
+    def __init__(self) -> None:
+        self.header: list[str] | None = None
+
+    def __call__(self, line: bytes) -> dict[str, str] | None:
+        # utf-8-sig drops the byte-order mark spreadsheet tools put in front
+        # of the header; it is a no-op for every other line.
+        [values] = csv.reader([line.decode("utf-8-sig")])
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return None
+        if len(values) != len(self.header):
+            msg = f"Expected {len(self.header)} columns, got {len(values)}"
+            raise ValueError(msg)
+        return dict(zip(self.header, values, strict=True))
+
+
+def _ndjson_row(line: bytes) -> object:
+    """Decode one NDJSON line."""
+    return json.loads(line)
+
+
+class ParcelImportService:
+    """Run a streaming parcel import and record its progress on a job."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Create an importer that writes parcels through the given session."""
+        self.session = session
+
+    @staticmethod
+    async def get_owned_job(job_id: str, owner_id: str) -> Job:
+        """Return an import job if it belongs to the caller.
+
+        Raises:
+            NotFoundError: If the job does not exist, has expired, is not an
+                import, or belongs to someone else.
+        """
+        job = await get_job(job_id)
+        if job is None or job.kind != JOB_KIND or job.owner_id != owner_id:
+            raise NotFoundError("Import job not found")
+        return job
+
+    async def run(
+        self,
+        job_id: str,
+        owner_id: str,
+        chunks: AsyncIterator[bytes],
+        import_format: ImportFormat,
+    ) -> None:
+        """Parse, validate, and insert an upload, updating the job as it goes.
+
+        Rows that fail to parse or validate are reported per line and skipped;
+        batches already committed stay committed if a later batch fails.
+
+        Raises:
+            BusinessError: If the job was already started, or the upload
+                contains a line longer than ``PARCEL_IMPORT_MAX_LINE_BYTES``.
+        """
+        if not await start_job(job_id):
+            raise BusinessError("Import job already started")
+
+        parse: Callable[[bytes], object] = (
+            _CsvRows() if import_format == "csv" else _ndjson_row
+        )
+        batch: list[tuple[int, object]] = []
+        parse_errors: list[dict[str, Any]] = []
+        line_no = 0
+        try:
+            async for line in iter_lines(chunks, settings.PARCEL_IMPORT_MAX_LINE_BYTES):
+                line_no += 1
+                if not line.strip():
+                    continue
+                try:
+                    row = parse(line)
+                except ValueError as exc:
+                    # json.JSONDecodeError and UnicodeDecodeError are ValueErrors.
+                    parse_errors.append(
+                        {"line": line_no, "type": "parse_error", "msg": str(exc)}
+                    )
+                else:
+                    if row is not None:
+                        batch.append((line_no, row))
+                if len(batch) + len(parse_errors) >= settings.PARCEL_IMPORT_CHUNK_SIZE:
+                    await self._flush(job_id, owner_id, batch, parse_errors)
+            await self._flush(job_id, owner_id, batch, parse_errors)
+        except Exception as exc:
+            log.exception("parcel_import_failed: job_id=%s line=%s", job_id, line_no)
+            await update_job(job_id, status="failed", message=str(exc))
+            raise
+
+        await update_job(job_id, status="completed")
+        log.info("parcel_import_completed: job_id=%s lines=%s", job_id, line_no)
+
+    async def _flush(
+        self,
+        job_id: str,
+        owner_id: str,
+        batch: list[tuple[int, object]],
+        parse_errors: list[dict[str, Any]],
+    ) -> None:
+        """Insert one batch in its own transaction and publish its progress.
+
+        Both lists are cleared afterwards so the caller can reuse them.
+        """
+        errors = list(parse_errors)
+        created = 0
+        if batch:
+            results = await ParcelService(self.session).create_bulk(
+                [row for _, row in batch], owner_id
+            )
+            for (line, _), result in zip(batch, results, strict=True):
+                if result.errors is None:
+                    created += 1
+                    continue
+                errors.extend({"line": line, **error} for error in result.errors)
+
+        if batch or errors:
+            await update_job(
+                job_id,
+                progress={
+                    "processed": len(batch) + len(parse_errors),
+                    "created": created,
+                    "failed": len(batch) - created + len(parse_errors),
+                },
+                errors=sorted(errors, key=lambda error: error["line"]),
+            )
+        batch.clear()
+        parse_errors.clear()
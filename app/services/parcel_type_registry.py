@@ -0,0 +1,200 @@
+"""In-process parcel-type registry shared by parcel read and write paths.
+
+Parcel types are a tiny seeded reference table, so every worker keeps an
+immutable snapshot of it in memory instead of querying MySQL for type
+validation, nested ``parcelType`` payloads, and the ``/parcel-types`` listing.
+
+Redis holds a version counter for the table. Whoever changes ``parcel_type``
+rows calls :func:`publish_parcel_types_changed`, which bumps the counter and
+notifies every worker over pub/sub so they swap in a freshly loaded snapshot.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Final, Self
+
+from redis.exceptions import RedisError
+
+from app.db.session import AsyncSessionLocal
+from app.models.parcel_type import ParcelType
+from app.redis_client import get_redis
+from app.schemas.parcel_type import ParcelTypeRead
+from app.services.parcel_type import ParcelTypeService
+
+log = logging.getLogger(__name__)
+
+VERSION_KEY: Final[str] = "parcel_types:version"
+CHANNEL: Final[str] = "parcel_types:changed"
+RECONNECT_DELAY_SEC: Final[float] = 1.0
+# Without a newer published version, a lookup miss reloads at most this often,
+# so parcel-type IDs that are simply unknown cannot query MySQL per request.
+MISS_RELOAD_INTERVAL_SEC: Final[float] = 30.0
+
+
+@dataclass(frozen=True)
+class ParcelTypeRegistry:
+    """Immutable snapshot of the parcel-type table.
+
+    Attributes:
+        version: Redis version counter observed when the snapshot was loaded.
+        items: Parcel types ordered by name, as returned by ``/parcel-types``.
+        by_id: Read-only lookup from parcel-type ID to its public schema.
+    """
+
+    version: int
+    items: tuple[ParcelTypeRead, ...]
+    by_id: Mapping[str, ParcelTypeRead]
+
+    @classmethod
+    def build(cls, rows: Iterable[ParcelType], version: int) -> Self:
+        """Create a snapshot from ORM rows already ordered by name."""
+        items = tuple(ParcelTypeRead.model_validate(row) for row in rows)
+        return cls(
+            version=version,
+            items=items,
+            by_id=MappingProxyType({item.id: item for item in items}),
+        )
+
+    def __contains__(self, parcel_type_id: object) -> bool:
+        """Return True when the ID belongs to a known parcel type."""
+        return parcel_type_id in self.by_id
+
+    def get(self, parcel_type_id: str) -> ParcelTypeRead | None:
+        """Return the parcel type for an ID, or None when it is unknown."""
+        return self.by_id.get(parcel_type_id)
+
+
+_registry: ParcelTypeRegistry | None = None
+_loaded_at = float("-inf")
+_load_lock = asyncio.Lock()
+
+
+async def _stored_version() -> int:
+    """Return the parcel-type version counter stored in Redis."""
+    raw = await get_redis().get(VERSION_KEY)
+    return int(raw) if raw is not None else 0
+
+
+async def reload_parcel_type_registry() -> ParcelTypeRegistry:
+    """Load a fresh snapshot from MySQL and make it the active registry.
+
+    The version is read before the rows, so a change published while the rows
+    are loading yields a newer version and triggers one more reload. When
+    Redis is unreachable the snapshot is still loaded, as version 0, so the
+    listener reloads it once Redis is back with a newer version.
+    """
+    global _registry, _loaded_at
+    try:
+        version = await _stored_version()
+    except RedisError:
+        log.warning("parcel_type_version_unavailable", exc_info=True)
+        version = 0
+    async with AsyncSessionLocal() as session:
+        rows = await ParcelTypeService(session).list_all()
+
+    _registry = ParcelTypeRegistry.build(rows, version)
+    _loaded_at = time.monotonic()
+    log.info(
+        "parcel_type_registry_loaded: version=%s count=%s",
+        version,
+        len(_registry.items),
+    )
+    return _registry
+
+
+async def get_parcel_type_registry() -> ParcelTypeRegistry:
+    """Return the active registry, loading it on first use.
+
+    App startup warms the registry, but the lazy path keeps tests and ad-hoc
+    scripts that skip the lifespan hook working.
+    """
+    if _registry is not None:
+        return _registry
+    async with _load_lock:
+        # Another request may have finished loading while this one waited.
+        return _registry or await reload_parcel_type_registry()
+
+
+async def reload_parcel_type_registry_on_miss() -> ParcelTypeRegistry:
+    """Reload the registry after a lookup missed a type ID, if that can help.
+
+    A published version newer than the snapshot's always reloads. Otherwise
+    the snapshot is reloaded only when it is older than
+    ``MISS_RELOAD_INTERVAL_SEC``, in case a change was never published.
+    Concurrent misses share the load lock, so they trigger one reload.
+    """
+    async with _load_lock:
+        registry = _registry
+        if (
+            registry is not None
+            and time.monotonic() - _loaded_at < MISS_RELOAD_INTERVAL_SEC
+        ):
+            try:
+                stale = await _stored_version() > registry.version
+            except RedisError:
+                log.warning("parcel_type_version_unavailable", exc_info=True)
+                stale = False
+            if not stale:
+                return registry
+        return await reload_parcel_type_registry()
+
+
+async def publish_parcel_types_changed() -> int:
+    """Bump the parcel-type version and notify every worker to reload.
+
+    Call this after inserting, renaming, or deleting ``parcel_type`` rows.
+
+    Returns:
+        int: The new version number.
+    """
+    redis = get_redis()
+    version = int(await redis.incr(VERSION_KEY))
+    await redis.publish(CHANNEL, str(version))
+    log.info("parcel_types_changed_published: version=%s", version)
+    return version
+
+
+async def _reload_if_stale(version: int) -> None:
+    """Reload the registry when ``version`` is newer than the active snapshot."""
+    if _registry is not None and version <= _registry.version:
+        return
+    try:
+        await reload_parcel_type_registry()
+    except Exception:
+        # Keep serving the previous snapshot; the next notification or
+        # reconnect retries the load.
+        log.exception("parcel_type_registry_reload_failed: version=%s", version)
+
+
+async def listen_for_parcel_type_changes() -> None:
+    """Follow version bumps published by other processes until cancelled.
+
+    Notifications missed while disconnected are caught up by comparing the
+    stored version after every (re)subscribe. A message that is not a version
+    number is logged and skipped.
+    """
+    while True:
+        pubsub = get_redis().pubsub()
+        try:
+            await pubsub.subscribe(CHANNEL)
+            await _reload_if_stale(await _stored_version())
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    version = int(message["data"])
+                except ValueError:
+                    log.warning(
+                        "parcel_type_change_malformed: data=%r", message["data"]
+                    )
+                    continue
+                await _reload_if_stale(version)
+        except RedisError:
+            log.warning("parcel_type_listener_disconnected", exc_info=True)
+            await asyncio.sleep(RECONNECT_DELAY_SEC)
+        finally:
+            await pubsub.aclose()  # type: ignore[no-untyped-call]
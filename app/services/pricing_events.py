@@ -0,0 +1,48 @@
+"""Announce newly created parcels to the pricing stream consumer.
+
+Parcel creation commits with ``delivery_cost_rub`` still NULL. Right after the
+commit, the new IDs are appended to a Redis Stream that the scheduler process
+reads with a consumer group, so parcels are priced within about a second
+instead of waiting for the next sweep.
+
+Publishing is best effort: if Redis is unavailable the request still succeeds
+and the periodic sweep prices the parcel later.
+"""
+
+import logging
+from collections.abc import Sequence
+from typing import Final
+
+from redis.exceptions import RedisError
+
+from app.core.settings import settings
+from app.redis_client import get_redis
+
+log = logging.getLogger(__name__)
+
+STREAM: Final[str] = "parcels:created"
+GROUP: Final[str] = "pricing"
+
+
+async def publish_parcels_created(parcel_ids: Sequence[str]) -> None:
+    """Append one stream entry per new parcel ID.
+
+    The stream is trimmed approximately to ``PRICING_STREAM_MAXLEN`` entries so
+    it stays bounded while the consumer is down.
+    """
+    if not settings.PRICING_STREAM_ENABLED or not parcel_ids:
+        return
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for parcel_id in parcel_ids:
+                pipe.xadd(
+                    STREAM,
+                    {"id": parcel_id},
+                    maxlen=settings.PRICING_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            await pipe.execute()
+    except RedisError:
+        log.warning(
+            "pricing_event_publish_failed: count=%s", len(parcel_ids), exc_info=True
+        )
@@ -0,0 +1,170 @@
+"""Exchange-rate providers behind the rate service.
+
+A provider returns the whole daily rate table in one call: the price in
+roubles of one unit of every currency it knows, with the date the provider
+says those rates are effective for. The rate service caches that table per
+date, so any currency pair is answered from memory instead of a fetch per
+currency.
+
+``RATE_PROVIDER`` selects the implementation:
+
+* ``cbr``: the Central Bank of Russia daily JSON (``RATE_CBR_URL``), effective
+  for the date in its ``Date`` field.
+* ``stub``: a flat JSON object of rouble prices read from a local file or an
+  HTTP URL (``RATE_STUB_SOURCE``), or a fixed built-in table when the source
+  is empty, effective for the current UTC date; meant for offline tests and
+  benchmarks.
+"""
+
+import asyncio
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Final, Protocol, Self
+
+from tenacity import retry, stop_after_attempt, wait_fixed
+
+from app.core.settings import settings
+from app.http_client import get_http_client
+
+BASE_CURRENCY: Final[str] = "RUB"
+STUB_RATES: Final[Mapping[str, str]] = MappingProxyType(
+    {"USD": "90.0", "EUR": "98.0", "CNY": "12.5"}
+)
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Rouble prices of one unit of each currency for one date.
+
+    Attributes:
+        day: Date the rates belong to.
+        rates: Read-only map from ISO 4217 code to the RUB price of one unit;
+            always contains ``RUB`` itself at 1.
+        ids: ``currency_rate`` row ID of each currency's rate, once the table
+            has been written to MySQL; empty before that.
+    """
+
+    day: date
+    rates: Mapping[str, Decimal]
+    ids: Mapping[str, str] = MappingProxyType({})
+
+    @classmethod
+    def build(
+        cls,
+        day: date,
+        rates: Mapping[str, Decimal],
+        ids: Mapping[str, str] | None = None,
+    ) -> Self:
+        """Create a table with codes upper-cased and the rouble added."""
+        table = {code.upper(): value for code, value in rates.items()}
+        table[BASE_CURRENCY] = Decimal(1)
+        return cls(
+            day=day,
+            rates=MappingProxyType(table),
+            ids=MappingProxyType(dict(ids or {})),
+        )
+
+    def __contains__(self, currency: object) -> bool:
+        """Return True when the table has a rate for the currency."""
+        return currency in self.rates
+
+    def rate(self, base: str, quote: str = BASE_CURRENCY) -> Decimal:
+        """Return the price of one ``base`` unit in ``quote``.
+
+        Raises:
+            KeyError: If either currency is not in the table.
+        """
+        if quote == BASE_CURRENCY:
+            return self.rates[base]
+        return self.rates[base] / self.rates[quote]
+
+
+class RateProvider(Protocol):
+    """Source of daily rate tables."""
+
+    name: str
+
+    async def fetch_rates(self) -> RateTable:
+        """Return the current RUB price of one unit of every known currency.
+
+        The table's ``day`` is the date the provider publishes the rates as
+        effective for, which need not be the current UTC date.
+        """
+        ...
+
+
+class CbrRateProvider:
+    """Central Bank of Russia daily rates, with retries on transient failures."""
+
+    name = "cbr"
+
+    def __init__(self, url: str) -> None:
+        """Create a provider reading the daily JSON at ``url``."""
+        self.url = url
+
+    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1), reraise=True)
+    async def fetch_rates(self) -> RateTable:
+        """Fetch every currency of the daily table in one request.
+
+        Every attempt reuses the shared pooled client. CBR quotes some
+        currencies per 10 or 100 units (``Nominal``), so each value is divided
+        down to one unit. The table is dated by the response's ``Date``, the
+        Moscow date the rates take effect.
+        """
+        resp = await get_http_client().get(self.url)
+        resp.raise_for_status()
+        payload: dict[str, Any] = resp.json()
+        valutes: dict[str, dict[str, Any]] = payload["Valute"]
+        return RateTable.build(
+            datetime.fromisoformat(payload["Date"]).date(),
+            {
+                code: Decimal(str(item["Value"])) / Decimal(str(item.get("Nominal", 1)))
+                for code, item in valutes.items()
+            },
+        )
+
+
+class StubRateProvider:
+    """Fixed rates from a JSON file, an HTTP URL, or a built-in table."""
+
+    name = "stub"
+
+    def __init__(self, source: str = "") -> None:
+        """Create a provider reading a file path or URL; empty uses STUB_RATES."""
+        self.source = source
+
+    async def fetch_rates(self) -> RateTable:
+        """Return the rates in ``source``, a ``{"USD": 90.0, ...}`` object."""
+        raw: Mapping[str, Any]
+        if not self.source:
+            raw = STUB_RATES
+        elif self.source.startswith(("http://", "https://")):
+            resp = await get_http_client().get(self.source)
+            resp.raise_for_status()
+            raw = resp.json()
+        else:
+            text = await asyncio.to_thread(Path(self.source).read_text)
+            raw = json.loads(text)
+        return RateTable.build(
+            datetime.now(UTC).date(),
+            {code: Decimal(str(value)) for code, value in raw.items()},
+        )
+
+
+_provider: RateProvider | None = None
+
+
+def get_rate_provider() -> RateProvider:
+    """Return the provider selected by ``RATE_PROVIDER``, creating it lazily."""
+    global _provider
+    if _provider is None:
+        if settings.RATE_PROVIDER == "stub":
+            _provider = StubRateProvider(settings.RATE_STUB_SOURCE)
+        else:
+            _provider = CbrRateProvider(settings.RATE_CBR_URL)
+    return _provider
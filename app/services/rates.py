@@ -1,56 +1,391 @@
-"""Fetch and cache the USD/RUB exchange rate used by delivery pricing.
+"""Fetch, store, and cache the exchange rates used by delivery pricing.
 
-The delivery job needs a currency rate but should not call the external API for
-every parcel. Rates are cached by UTC date in Redis and retried on transient
-HTTP failures.
+The delivery job needs currency rates but should not call the external API for
+every parcel. The configured provider (``app.services.rate_providers``) returns
+the whole daily table in one call. It is written through to the
+``currency_rate`` table, cached by UTC date in one Redis hash, and memoized per
+process, so lookups read memo, then Redis, then MySQL, and only call the
+provider for a date none of them has. A Redis flush or eviction therefore
+never causes an upstream call, also on weekends and holidays, when the date
+is served with an earlier table, and parcels reference the rate row they
+were priced with.
+
+Each table carries the date the provider publishes it as effective for; MySQL
+rows, the last known good table and pricing versions use that date, while the
+Redis hash and the memo are keyed by the UTC date the table is served on. The
+scheduler fetches the next day's table shortly before UTC midnight, so the
+first lookups of a day normally find it in Redis, but only caches it once the
+provider has published rates effective for that day. Fetches are single-flight
+across processes: a ``SET NX`` marker per date lets one process call the
+provider while the others wait for its result. Every fetched table is also
+kept as the "last known good" table, without expiry; when a fetch fails, that
+table is served instead, with its date, and its age is exported as a metric.
 """
 
+import asyncio
 import logging
-from datetime import UTC, datetime
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from typing import Final
+from uuid import uuid4
 
-import httpx
-from tenacity import retry, stop_after_attempt, wait_fixed
+from redis.exceptions import RedisError
+from redis.typing import EncodableT
+from sqlalchemy import ColumnElement, and_, func, or_, select
+from sqlalchemy.dialects.mysql import insert
 
+from app.core.metrics import RATE_FALLBACKS, RATE_STALENESS
 from app.core.settings import settings
+from app.db.session import AsyncSessionLocal
+from app.models.currency_rate import CurrencyRate
 from app.redis_client import get_redis
+from app.services.rate_providers import BASE_CURRENCY, RateTable, get_rate_provider
 
 log = logging.getLogger(__name__)
 
-CBR_URL: Final[str] = "https://www.cbr-xml-daily.ru/daily_json.js"
-KEY_TMPL: Final[str] = "usd_rub:{date}"
+KEY_TMPL: Final[str] = "rates:{date}"
+FETCH_LOCK_TMPL: Final[str] = "rates:{date}:fetching"
+LAST_GOOD_KEY: Final[str] = "rates:last_good"
+# Rate hashes hold each currency's rate under its code, its row ID under this
+# prefix, and the table's effective date; LAST_GOOD_KEY also holds the fetch
+# time. Lower case never clashes with a currency code.
+_ID_PREFIX: Final[str] = "id:"
+_DATE_FIELD: Final[str] = "date"
+_FETCHED_AT_FIELD: Final[str] = "fetched_at"
+_FETCH_WAIT_POLL_SEC: Final[float] = 0.2
+
+
+class RateUnavailableError(RuntimeError):
+    """Raised when another process's fetch did not produce rates in time."""
+
+
+@dataclass(frozen=True)
+class _Memo:
+    """Table served for ``day``; a fallback table is only kept until ``expires_at``."""
+
+    day: date
+    table: RateTable
+    expires_at: float | None = None
+
+    def serves(self, day: date) -> bool:
+        return self.day == day and (
+            self.expires_at is None or time.monotonic() < self.expires_at
+        )
+
+
+_memo: _Memo | None = None
+
+
+def _text(value: bytes | str) -> str:
+    """Return a Redis reply as text, whatever the client's decoding setting."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _decode_table(day: date, stored: Mapping[bytes | str, bytes | str]) -> RateTable:
+    """Return the table held in a Redis rate hash, dated ``day`` if undated."""
+    fields = {_text(field): _text(value) for field, value in stored.items()}
+    return RateTable.build(
+        date.fromisoformat(fields[_DATE_FIELD]) if _DATE_FIELD in fields else day,
+        {code: Decimal(value) for code, value in fields.items() if code.isupper()},
+        {
+            field.removeprefix(_ID_PREFIX): value
+            for field, value in fields.items()
+            if field.startswith(_ID_PREFIX)
+        },
+    )
+
+
+def _pair(code: str) -> str:
+    """Return the ``currency_rate.pair`` of a currency's rouble rate."""
+    return f"{code}/{BASE_CURRENCY}"
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(1), reraise=True)
-async def _fetch_rate_from_cbr() -> Decimal:
-    """Fetch the current USD/RUB rate from the Central Bank mirror.
+def _table_from_rows(
+    day: date, rows: Sequence[tuple[str, str, Decimal, datetime]]
+) -> tuple[RateTable, datetime]:
+    """Build a table from ``currency_rate`` rows, with their latest fetch time."""
+    rates = {pair.split("/", 1)[0]: value for _, pair, value, _ in rows}
+    ids = {pair.split("/", 1)[0]: row_id for row_id, pair, _, _ in rows}
+    return RateTable.build(day, rates, ids), max(row[3] for row in rows)
 
-    Tenacity retries transient network failures; the caller decides how to
-    handle a final failure after all attempts are exhausted.
+
+_ROW_COLUMNS: Final = (
+    CurrencyRate.id,
+    CurrencyRate.pair,
+    CurrencyRate.value,
+    CurrencyRate.fetched_at,
+)
+
+
+async def _load_latest_of(
+    *criteria: ColumnElement[bool],
+) -> tuple[RateTable, datetime] | None:
+    """Return the latest table whose rows match ``criteria``, with its fetch time."""
+    latest = select(func.max(CurrencyRate.rate_date)).where(*criteria)
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(
+            select(CurrencyRate.rate_date, *_ROW_COLUMNS).where(
+                CurrencyRate.rate_date == latest.scalar_subquery()
+            )
+        )
+        rows = res.tuples().all()
+    if not rows:
+        return None
+    return _table_from_rows(rows[0][0], [row[1:] for row in rows])
+
+
+async def _load_table(
+    day: date, *, exact: bool = False
+) -> tuple[RateTable, datetime] | None:
+    """Return the table MySQL holds for serving ``day``, with its fetch time.
+
+    That is the table effective on ``day`` or, unless ``exact``, the latest
+    earlier one that a fetch made on ``day`` returned: on weekends and
+    holidays the provider still serves the last business day's table.
     """
-    async with httpx.AsyncClient(timeout=5) as client:
-        resp = await client.get(CBR_URL)
-        resp.raise_for_status()
-        data = resp.json()
-    return Decimal(str(data["Valute"]["USD"]["Value"]))
+    served = CurrencyRate.rate_date == day
+    if not exact:
+        fetched_on_day = and_(
+            CurrencyRate.rate_date < day,
+            CurrencyRate.fetched_at >= datetime.combine(day, datetime.min.time()),
+        )
+        served = or_(served, fetched_on_day)
+    return await _load_latest_of(served)
 
 
-async def get_usd_rub_rate() -> Decimal:
-    """Return today's USD/RUB rate, cached in Redis by date.
+async def _load_latest_table() -> tuple[RateTable, datetime] | None:
+    """Return the most recent table stored in MySQL, with its fetch time."""
+    return await _load_latest_of()
+
 
-    Redis stores the rate as a string to preserve Decimal precision across
-    process boundaries.
+async def _write_through(fetched: RateTable, source: str) -> tuple[RateTable, datetime]:
+    """Store a fetched table in MySQL and return it as stored, with row IDs.
+
+    Rows are dated by the table's effective date. Rows already stored for
+    that date are kept, so every process prices with, and references, the
+    same rows even if two of them fetched the date; only their
+    ``fetched_at`` moves forward.
+    """
+    day = fetched.day
+    now = datetime.now(UTC)
+    stmt = insert(CurrencyRate).values(
+        [
+            {
+                "id": str(uuid4()),
+                "rate_date": day,
+                "pair": _pair(code),
+                "value": value,
+                "source": source,
+                "created_at": now,
+                "fetched_at": now,
+            }
+            for code, value in fetched.rates.items()
+            if code != BASE_CURRENCY
+        ]
+    )
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            stmt.on_duplicate_key_update(
+                id=CurrencyRate.id, fetched_at=stmt.inserted.fetched_at
+            )
+        )
+        await session.commit()
+    stored = await _load_table(day, exact=True)
+    if stored is None:
+        raise RateUnavailableError(f"Provider returned no rates for {day}")
+    return stored
+
+
+async def _store_table(table: RateTable, fetched_at: datetime, served_on: date) -> None:
+    """Cache a table for the date it is served on and keep it as last known good."""
+    fields: dict[EncodableT, EncodableT] = {
+        code: str(value) for code, value in table.rates.items()
+    }
+    fields.update({f"{_ID_PREFIX}{code}": row_id for code, row_id in table.ids.items()})
+    fields[_DATE_FIELD] = table.day.isoformat()
+    key = KEY_TMPL.format(date=served_on.isoformat())
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, settings.CACHE_TTL_RATE)
+        pipe.delete(LAST_GOOD_KEY)
+        pipe.hset(
+            LAST_GOOD_KEY,
+            mapping={**fields, _FETCHED_AT_FIELD: fetched_at.isoformat()},
+        )
+        await pipe.execute()
+
+
+async def _fetch_single_flight(rate_date: date, *, exact: bool = False) -> RateTable:
+    """Load or fetch the table for ``rate_date`` into Redis, once across processes.
+
+    The process that sets the date's fetch marker reads the rows served on
+    that date from MySQL, and only when there are none calls the provider
+    and writes the result through under the provider's own date; the others
+    poll the date's hash until the marker would expire. A failed fetch leaves
+    the marker to expire on its own, which also spaces out retries.
+
+    Args:
+        rate_date: UTC date the table will be served on.
+        exact: Only cache a table the provider publishes as effective on
+            ``rate_date``; used to fetch ahead, before that date begins.
+
+    Raises:
+        RateUnavailableError: If another process holds the marker and no table
+            appeared before it expired, or with ``exact``, if the provider has
+            not published rates for ``rate_date`` yet.
     """
     redis = get_redis()
-    today = datetime.now(UTC).date().isoformat()
-    key = KEY_TMPL.format(date=today)
+    key = KEY_TMPL.format(date=rate_date.isoformat())
+    marker = FETCH_LOCK_TMPL.format(date=rate_date.isoformat())
+    if await redis.set(marker, "1", nx=True, ex=settings.RATE_FETCH_LOCK_SEC):
+        if (stored := await _load_table(rate_date, exact=exact)) is None:
+            provider = get_rate_provider()
+            fetched = await provider.fetch_rates()
+            if exact and fetched.day != rate_date:
+                raise RateUnavailableError(
+                    f"Provider has no rates for {rate_date} yet, only {fetched.day}"
+                )
+            stored = await _write_through(fetched, provider.name)
+            log.info(
+                "rate_table_fetched: provider=%s, date=%s, currencies=%u",
+                provider.name,
+                fetched.day,
+                len(fetched.rates),
+            )
+        table, fetched_at = stored
+        await _store_table(table, fetched_at, rate_date)
+        return table
+    deadline = time.monotonic() + settings.RATE_FETCH_LOCK_SEC
+    while time.monotonic() < deadline:
+        await asyncio.sleep(_FETCH_WAIT_POLL_SEC)
+        if cached := await redis.hgetall(key):
+            return _decode_table(rate_date, cached)
+    raise RateUnavailableError(f"No rates for {rate_date} from other fetch")
+
+
+async def _last_known_good() -> tuple[RateTable, datetime] | None:
+    """Return the last fetched table with its fetch time, if any.
+
+    Redis holds it under ``LAST_GOOD_KEY``; after a flush, or while Redis is
+    unreachable, the latest date stored in MySQL stands in.
+    """
+    try:
+        stored = await get_redis().hgetall(LAST_GOOD_KEY)
+    except RedisError:
+        log.warning("rate_last_good_redis_error", exc_info=True)
+        stored = {}
+    if not stored:
+        return await _load_latest_table()
+    fields = {_text(field): _text(value) for field, value in stored.items()}
+    table = _decode_table(date.fromisoformat(fields[_DATE_FIELD]), stored)
+    return table, datetime.fromisoformat(fields[_FETCHED_AT_FIELD])
+
+
+async def _served_table(day: date) -> RateTable:
+    """Return the table for ``day`` from Redis, MySQL, or the provider.
 
-    if (cached := await redis.get(key)) is not None:
-        raw = cached.decode() if isinstance(cached, bytes | bytearray) else cached
-        return Decimal(raw)
+    Raises:
+        RedisError: If Redis is unreachable and MySQL has no table for ``day``.
+    """
+    try:
+        stored = await get_redis().hgetall(KEY_TMPL.format(date=day.isoformat()))
+    except RedisError:
+        log.warning("rate_table_redis_error: date=%s", day, exc_info=True)
+        if (loaded := await _load_table(day)) is None:
+            raise
+        return loaded[0]
+    if stored:
+        return _decode_table(day, stored)
+    return await _fetch_single_flight(day)
+
+
+async def get_rate_table() -> RateTable:
+    """Return the rate table to price with today.
+
+    The in-process memo answers every call of the same UTC day; the first
+    call of a day falls through to Redis, and to a single-flight load from
+    MySQL or the provider when Redis has no table for the date either. While
+    Redis is unreachable the date's table is read from MySQL directly. Redis
+    stores rates as strings to preserve Decimal precision across process
+    boundaries.
+
+    When the fetch fails, the last known good table is returned with its own,
+    earlier date, so prices stamped with it can be told apart and repriced.
+    That fallback is memoized for ``RATE_STALE_RETRY_SEC`` only, after which
+    the next call tries the provider again.
+
+    Raises:
+        Exception: The fetch error, when there is no last known good table.
+    """
+    global _memo
+    today = datetime.now(UTC).date()
+    if _memo is not None and _memo.serves(today):
+        return _memo.table
 
-    rate = await _fetch_rate_from_cbr()
-    await redis.set(key, str(rate), ex=settings.CACHE_TTL_RATE)
-    log.info("usd_rub_rate_fetched: rate=%r", float(rate))
+    try:
+        table = await _served_table(today)
+    except Exception:
+        last_good = await _last_known_good()
+        if last_good is None:
+            raise
+        table, fetched_at = last_good
+        staleness = (datetime.now(UTC) - fetched_at).total_seconds()
+        RATE_FALLBACKS.inc()
+        RATE_STALENESS.set(staleness)
+        log.warning(
+            "rate_table_stale: date=%s, age_sec=%.0f",
+            table.day,
+            staleness,
+            exc_info=True,
+        )
+        expires_at = time.monotonic() + settings.RATE_STALE_RETRY_SEC
+        _memo = _Memo(today, table, expires_at)
+        return table
+
+    RATE_STALENESS.set(0)
+    _memo = _Memo(today, table)
+    return table
+
+
+async def get_rate(base: str, quote: str = BASE_CURRENCY) -> tuple[Decimal, date]:
+    """Return the price of one ``base`` unit in ``quote`` and its rate date.
+
+    Raises:
+        KeyError: If the provider has no rate for either currency.
+    """
+    table = await get_rate_table()
+    return table.rate(base, quote), table.day
+
+
+async def get_usd_rub_quote() -> tuple[Decimal, date]:
+    """Return today's USD/RUB rate and the date it belongs to."""
+    return await get_rate("USD")
+
+
+async def get_usd_rub_rate() -> Decimal:
+    """Return the rate from ``get_usd_rub_quote`` without its date."""
+    rate, _ = await get_usd_rub_quote()
     return rate
+
+
+async def refresh_rate_ahead() -> None:
+    """Fetch tomorrow's table into Redis before the first lookup needs it.
+
+    Scheduled shortly before UTC midnight. A table already cached for
+    tomorrow is left alone, and so is a provider that has not published
+    rates effective tomorrow yet, instead of caching today's rates under
+    tomorrow's date. A failure is only logged: lookups after midnight then
+    fetch on demand, or fall back to the last known good table.
+    """
+    tomorrow = datetime.now(UTC).date() + timedelta(days=1)
+    if await get_redis().exists(KEY_TMPL.format(date=tomorrow.isoformat())):
+        return
+    try:
+        await _fetch_single_flight(tomorrow, exact=True)
+    except RateUnavailableError as exc:
+        log.info("rate_table_refresh_skipped: date=%s, reason=%s", tomorrow, exc)
+    except Exception:
+        log.warning("rate_table_refresh_failed: date=%s", tomorrow, exc_info=True)
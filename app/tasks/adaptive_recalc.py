@@ -0,0 +1,133 @@
+"""Backlog-driven scheduling of the delivery-cost recalculation.
+
+With ``DELIVERY_SCHEDULE=adaptive`` the scheduler process runs this loop
+instead of a fixed cron job. Each poll counts unpriced parcels, capped at
+``DELIVERY_BURST_BACKLOG`` so the count stays cheap, and decides:
+
+* ``idle``: nothing to price; the next poll waits twice as long, up to
+  ``DELIVERY_POLL_MAX_SEC``.
+* ``run``: a backlog below the burst threshold; one run is started.
+* ``burst``: a backlog at the threshold; runs are started until
+  ``DELIVERY_BURST_RUNS`` are going. Runs lease different shards, so they
+  split the work instead of repeating it.
+* ``busy``: a backlog the runs already in flight are working on.
+* ``error``: the count failed; the loop backs off as when idle.
+
+Any backlog resets the wait to ``DELIVERY_POLL_MIN_SEC``, and a finished run
+that priced parcels triggers the next poll at once, so a burst is worked off
+run after run. A run that priced nothing (shards leased elsewhere, a failure,
+or a spent budget) does not, so the loop never polls more often than every
+``DELIVERY_POLL_MIN_SEC`` without progress.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.metrics import (
+    DELIVERY_SCHEDULER_BACKLOG,
+    DELIVERY_SCHEDULER_DECISIONS,
+    DELIVERY_SCHEDULER_DELAY,
+    DELIVERY_SCHEDULER_RUNS,
+)
+from app.core.settings import settings
+from app.tasks.delivery import estimate_backlog, recalc_delivery_costs
+
+log = logging.getLogger(__name__)
+
+
+def _decide(backlog: int, in_flight: int, delay: float) -> tuple[str, int, float]:
+    """Choose what to do about a backlog.
+
+    Args:
+        backlog: Unpriced parcels, capped at ``DELIVERY_BURST_BACKLOG``.
+        in_flight: Runs started earlier and still running.
+        delay: Wait before the poll being decided.
+
+    Returns:
+        tuple[str, int, float]: Decision name, runs to start, and the wait
+        before the next poll.
+    """
+    if not backlog:
+        return "idle", 0, min(delay * 2, settings.DELIVERY_POLL_MAX_SEC)
+    wanted = 1
+    decision = "run"
+    if backlog >= settings.DELIVERY_BURST_BACKLOG:
+        wanted = settings.DELIVERY_BURST_RUNS
+        decision = "burst"
+    start = max(0, wanted - in_flight)
+    return decision if start else "busy", start, settings.DELIVERY_POLL_MIN_SEC
+
+
+async def _run_once() -> int:
+    """Run one recalculation, logging a failure instead of raising it.
+
+    Returns:
+        int: Parcels the run updated; 0 when it failed.
+    """
+    try:
+        return await recalc_delivery_costs()
+    except Exception:
+        log.exception("delivery_adaptive_run_failed")
+        return 0
+
+
+async def _poll(running: set[asyncio.Task[int]], delay: float) -> float:
+    """Count the backlog, start the runs it calls for, and record the decision.
+
+    Returns:
+        float: Seconds to wait before the next poll.
+    """
+    try:
+        backlog = await estimate_backlog(settings.DELIVERY_BURST_BACKLOG)
+    except SQLAlchemyError:
+        log.warning("delivery_backlog_poll_failed", exc_info=True)
+        decision, start = "error", 0
+        delay = min(delay * 2, settings.DELIVERY_POLL_MAX_SEC)
+    else:
+        DELIVERY_SCHEDULER_BACKLOG.set(backlog)
+        decision, start, delay = _decide(backlog, len(running), delay)
+
+    for _ in range(start):
+        task = asyncio.create_task(_run_once())
+        running.add(task)
+        task.add_done_callback(running.discard)
+    DELIVERY_SCHEDULER_DECISIONS.labels(decision=decision).inc()
+    DELIVERY_SCHEDULER_RUNS.set(len(running))
+    DELIVERY_SCHEDULER_DELAY.set(delay)
+    log.debug(
+        "delivery_schedule: decision=%s, started=%u, in_flight=%u, next_poll=%.1f",
+        decision,
+        start,
+        len(running),
+        delay,
+    )
+    return delay
+
+
+async def _wait(running: set[asyncio.Task[int]], delay: float) -> None:
+    """Wait ``delay`` seconds, or until a run finishes having priced parcels."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + delay
+    while running and (timeout := deadline - loop.time()) > 0:
+        done, _ = await asyncio.wait(
+            set(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        if any(not task.cancelled() and task.result() for task in done):
+            return
+    if (remaining := deadline - loop.time()) > 0:
+        await asyncio.sleep(remaining)
+
+
+async def schedule_recalc_adaptively() -> None:
+    """Poll the backlog and run recalculations as it calls for, until cancelled.
+
+    Between polls the loop waits for the chosen delay, or less when a run
+    finishes having made progress.
+    """
+    running: set[asyncio.Task[int]] = set()
+    delay = settings.DELIVERY_POLL_MIN_SEC
+    while True:
+        delay = await _poll(running, delay)
+        await _wait(running, delay)
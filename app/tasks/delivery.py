@@ -1,65 +1,223 @@
 """Delivery cost recalculation task and Redis run metadata.
 
-The scheduler and manual admin route both call this module. Redis is used for a
-coarse distributed lock plus lightweight "last run" metadata, while the
-database remains the source of truth for parcel prices.
+The scheduler and manual admin route both call this module. The parcel key
+space is split into ``DELIVERY_SHARDS`` primary-key ranges, each priced under
+its own Redis lease, so several scheduler replicas can share the backlog.
+Each run has a time budget; a run that stops at it, or at shutdown, leaves
+per-shard checkpoints in Redis for the next run to resume from.
+Redis also keeps lightweight "last run" metadata, while the database remains
+the source of truth for parcel prices.
 """
 
+import asyncio
 import logging
+import random
 import time
-from collections.abc import Sequence
-from datetime import UTC, datetime
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
 from decimal import Decimal
+from functools import partial
+from typing import Any, Final, cast
 
-from sqlalchemy import select
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    CursorResult,
+    Table,
+    bindparam,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.metrics import DELIVERY_RECALC_DURATION, DELIVERY_RECALC_PARCELS
+from app.core.jobs import update_job
+from app.core.metrics import (
+    DELIVERY_BACKLOG,
+    DELIVERY_BATCH_DURATION,
+    DELIVERY_BATCH_SIZE,
+    DELIVERY_OLDEST_UNPRICED_AGE,
+    DELIVERY_RECALC_DURATION,
+    DELIVERY_RECALC_PARCELS,
+    DELIVERY_RECALC_THROUGHPUT,
+    DELIVERY_SHARD_SKIPS,
+)
 from app.core.settings import settings
 from app.db.session import AsyncSessionLocal
 from app.models.parcel import Parcel
 from app.redis_client import get_redis
-from app.services.rates import get_usd_rub_rate
+from app.services.rates import get_rate_table
+from app.tasks.lock import RedisLock
+from app.tasks.pricing_kernel import (
+    COST_SCALE,
+    VALUE_SCALE,
+    WEIGHT_SCALE,
+    price_kopecks,
+)
 
 log = logging.getLogger(__name__)
 
+LOCK_KEY: Final[str] = "delivery_job_lock"
+CHECKPOINT_KEY: Final[str] = "delivery_checkpoint"
+# Checkpoints of passes no run comes back to, such as an old stale version,
+# expire on their own.
+CHECKPOINT_TTL_SEC: Final[int] = 86400
+_DRAIN_POLL_SEC: Final[float] = 0.1
+# Shard boundaries are cut on the first four hex digits of the UUID4 IDs.
+_PREFIX_SPACE: Final[int] = 0x10000
 
-async def _acquire_lock(ttl: int = settings.DELIVERY_LOCK_TTL) -> bool:
-    """Attempt to acquire a Redis NX-lock for job deduplication.
+# ``(id, weight in grams, declared value in cents, pricing version)``.
+PricingRow = tuple[str, int, int, str | None]
+# Saves the last committed ID of a pass.
+SaveCheckpoint = Callable[[str], Awaitable[None]]
 
-    Prevents concurrent delivery-cost recalculations from running at
-    the same time (e.g., in parallel containers or deployments).
+_PARCEL: Final = cast(Table, Parcel.__table__)
+# The database scales the columns to integers, so the driver never builds a
+# Decimal per row for the kernel to take apart again.
+_PRICING_COLUMNS: Final = (
+    Parcel.id,
+    (Parcel.weight_kg * 10**WEIGHT_SCALE).cast(BigInteger),
+    (Parcel.declared_value_usd * 10**VALUE_SCALE).cast(BigInteger),
+    Parcel.pricing_version,
+)
+# Written with executemany; bind names must differ from column names. MySQL
+# divides integers exactly, so kopecks land in the column unchanged. The
+# NULL-safe version check is a compare-and-set against the version read with
+# the row, so a parcel priced by someone else in the meantime keeps its price.
+_SET_COST: Final = (
+    update(_PARCEL)
+    .where(
+        _PARCEL.c.id == bindparam("b_id"),
+        _PARCEL.c.pricing_version.is_not_distinct_from(bindparam("b_seen")),
+    )
+    .values(
+        delivery_cost_rub=bindparam("b_kopecks", type_=BigInteger) / 10**COST_SCALE,
+        pricing_version=bindparam("b_version"),
+        currency_rate_id=bindparam("b_rate_id"),
+    )
+)
+_UNPRICED: Final = Parcel.delivery_cost_rub.is_(None)
 
-    Args:
-        ttl: Lock expiration time in seconds (default 330 sec.).
 
-    Returns:
-        bool: True if the lock was acquired successfully, False otherwise.
+@dataclass(frozen=True)
+class Pricing:
+    """Exchange rate and version stamp applied by one pricing run.
+
+    ``rate_id`` is the ``currency_rate`` row the rate was read from, recorded
+    on every parcel priced with it; None when the rate has no stored row.
     """
-    redis = get_redis()
-    return bool(await redis.set("delivery_job_lock", "1", ex=ttl, nx=True))
 
+    rate: Decimal
+    version: str
+    rate_id: str | None = None
+
+
+def pricing_version(rate_date: date) -> str:
+    """Return the version stamped on parcels priced with the given rate date.
+
+    The version names the rate date and both formula coefficients, so a new
+    day's rate or a coefficient change makes every earlier price stale.
+    """
+    return (
+        f"{rate_date.isoformat()}:{settings.DELIVERY_WEIGHT_COEFF}"
+        f":{settings.DELIVERY_VALUE_COEFF}"
+    )
+
+
+async def current_pricing() -> Pricing:
+    """Return today's USD/RUB rate with the version it stamps on parcels.
+
+    The version names the date the rate belongs to, which is earlier than
+    today when the last known good rate stands in for a failed fetch; those
+    parcels then show up as stale once today's rate is available. The rate's
+    ``currency_rate`` row comes along, so every parcel priced with it
+    references the row.
+    """
+    table = await get_rate_table()
+    return Pricing(table.rate("USD"), pricing_version(table.day), table.ids.get("USD"))
+
+
+def _priced_with(version: str | None) -> ColumnElement[bool]:
+    """Select parcels stamped with ``version``; None selects unstamped ones."""
+    if version is None:
+        return Parcel.pricing_version.is_(None)
+    return Parcel.pricing_version == version
+
+
+def _shard_bounds(shard: int, shards: int) -> tuple[str | None, str | None]:
+    """Return the ``(after, before)`` ID range covered by one shard.
+
+    Parcel IDs are UUID4 strings, so their leading hex digits are spread
+    evenly. A bare hex prefix sorts before every ID that starts with it, so
+    ``id > after AND id < before`` covers each shard with no gap or overlap
+    between neighbours. The first and last shards are open-ended.
+    """
+    after = f"{shard * _PREFIX_SPACE // shards:04x}" if shard else None
+    before = None
+    if shard + 1 < shards:
+        before = f"{(shard + 1) * _PREFIX_SPACE // shards:04x}"
+    return after, before
+
+
+async def _fetch_pending(
+    session: AsyncSession,
+    after: str | None = None,
+    batch: int = settings.DELIVERY_BATCH_SIZE,
+    before: str | None = None,
+    pending: ColumnElement[bool] = _UNPRICED,
+) -> Sequence[PricingRow]:
+    """Fetch the next batch of parcels that need a (new) delivery cost.
 
-async def _fetch_unpriced(
-    session: AsyncSession, batch: int = settings.DELIVERY_BATCH_SIZE
-) -> Sequence[Parcel]:
-    """Fetch a batch of parcels that do not yet have delivery costs.
+    The scan seeks past ``after`` in primary-key order on the
+    ``(delivery_cost_rub, id)`` index, or the ``(pricing_version, id)`` index
+    when repricing one stale version, so each batch starts where the previous
+    one ended instead of rescanning rows that are already priced.
 
     Args:
         session: Active SQLAlchemy session.
+        after: Last parcel ID of the previous batch, or None to start over.
         batch: Max number of rows to retrieve in a single fetch.
+        before: Exclusive upper ID bound of the shard, or None for no bound.
+        pending: Parcels to price; unpriced ones unless repricing.
 
     Returns:
-        Sequence[Parcel]: Parcels with ``delivery_cost_rub IS NULL``.
+        Sequence[PricingRow]: ``(id, grams, cents, version)`` of matching
+        parcels, ordered by ID.
     """
-    stmt = select(Parcel).where(Parcel.delivery_cost_rub.is_(None)).limit(batch)
-    res = await session.scalars(stmt)
-    return res.all()
+    stmt = select(*_PRICING_COLUMNS).where(pending).order_by(Parcel.id).limit(batch)
+    if after is not None:
+        stmt = stmt.where(Parcel.id > after)
+    if before is not None:
+        stmt = stmt.where(Parcel.id < before)
+    res = await session.execute(stmt)
+    return res.tuples().all()
 
 
-async def _formula(weight: Decimal, declared: Decimal, rate: Decimal) -> Decimal:
+def _next_batch_size(size: int, elapsed: float) -> int:
+    """Scale the batch size toward ``DELIVERY_BATCH_TARGET_SEC`` per batch.
+
+    Each step at most doubles or halves the size, so one unusually fast or
+    slow batch does not swing it, and the result stays within
+    ``DELIVERY_BATCH_MIN``..``DELIVERY_BATCH_MAX``.
+    """
+    factor = 2.0
+    if elapsed > 0:
+        factor = min(2.0, max(0.5, settings.DELIVERY_BATCH_TARGET_SEC / elapsed))
+    return max(
+        settings.DELIVERY_BATCH_MIN,
+        min(settings.DELIVERY_BATCH_MAX, int(size * factor)),
+    )
+
+
+def _formula(weight: Decimal, declared: Decimal, rate: Decimal) -> Decimal:
     """Calculate delivery cost based on weight, value, and currency rate.
 
+    This is the reference definition of the price. Jobs price in bulk with
+    ``price_kopecks`` or ``_cost_expression``, both tested against it.
+
     Args:
         weight: Parcel weight in kilograms.
         declared: Declared USD value of the parcel.
@@ -73,48 +231,562 @@ async def _formula(weight: Decimal, declared: Decimal, rate: Decimal) -> Decimal
     return cost * rate
 
 
-async def recalc_delivery_costs() -> int:
+def _cost_expression(rate: Decimal) -> ColumnElement[Decimal]:
+    """Build the SQL counterpart of ``_formula`` for set-based updates.
+
+    ``ROUND(x, 2)`` on exact DECIMAL values rounds half away from zero, as the
+    pricing kernel used by the Python mode does, so both modes persist the
+    same kopecks.
+    """
+    cost = (
+        Parcel.weight_kg * settings.DELIVERY_WEIGHT_COEFF
+        + Parcel.declared_value_usd * settings.DELIVERY_VALUE_COEFF
+    ) * rate
+    return func.round(cost, 2)
+
+
+def _cost_params(rows: Sequence[PricingRow], pricing: Pricing) -> list[dict[str, Any]]:
+    """Return executemany parameters for ``_SET_COST`` from pricing rows.
+
+    The whole batch is priced in one kernel call, already rounded to kopecks
+    the way the cost column would round ``_formula`` on insert.
+    """
+    ids, grams, cents, seen = zip(*rows, strict=True)
+    kopecks = price_kopecks(grams, cents, pricing.rate)
+    return [
+        {
+            "b_id": parcel_id,
+            "b_seen": version,
+            "b_kopecks": cost,
+            "b_version": pricing.version,
+            "b_rate_id": pricing.rate_id,
+        }
+        for parcel_id, version, cost in zip(ids, seen, kopecks, strict=True)
+    ]
+
+
+async def _next_chunk_end(
+    session: AsyncSession,
+    after: str | None,
+    batch: int,
+    before: str | None = None,
+    pending: ColumnElement[bool] = _UNPRICED,
+) -> str | None:
+    """Return the ID closing the next chunk of pending parcels.
+
+    Returns:
+        str | None: The ``batch``-th pending ID after ``after``, or None when
+        fewer than ``batch`` pending parcels remain before ``before``.
+    """
+    stmt = (
+        select(Parcel.id).where(pending).order_by(Parcel.id).offset(batch - 1).limit(1)
+    )
+    if after is not None:
+        stmt = stmt.where(Parcel.id > after)
+    if before is not None:
+        stmt = stmt.where(Parcel.id < before)
+    return await session.scalar(stmt)
+
+
+async def _commit_batch(
+    session: AsyncSession,
+    lock: RedisLock,
+    updated: int,
+    job_id: str | None = None,
+) -> None:
+    """Commit one batch if the job still holds its lock, else roll it back.
+
+    When the run belongs to a job record, the batch is then added to its
+    ``parcels`` and ``batches`` progress counters.
+
+    Raises:
+        LockLostError: If the lock expired or was taken over; the batch is
+            rolled back so a replaced run never overwrites the new holder.
+    """
+    try:
+        await lock.ensure_held()
+    except Exception:
+        await session.rollback()
+        raise
+    await session.commit()
+    lock.progress()
+    if job_id is not None:
+        await update_job(job_id, progress={"parcels": updated, "batches": 1})
+
+
+# Set by ``request_recalc_stop`` on shutdown; runs in flight stop at their next
+# batch boundary. ``_active_runs`` lets shutdown wait for them to get there.
+_stop_requested = False
+_active_runs = 0
+
+
+def request_recalc_stop() -> None:
+    """Ask running recalculations to stop after their current batch."""
+    global _stop_requested
+    _stop_requested = True
+
+
+async def wait_recalc_idle(timeout: float) -> bool:
+    """Wait until no recalculation is running, for at most ``timeout`` seconds.
+
+    Returns:
+        bool: True when every run has finished.
+    """
+    deadline = time.monotonic() + timeout
+    while _active_runs and time.monotonic() < deadline:
+        await asyncio.sleep(_DRAIN_POLL_SEC)
+    return not _active_runs
+
+
+def _out_of_time(deadline: float | None) -> bool:
+    """Return True when a run must not start another batch."""
+    return _stop_requested or (deadline is not None and time.monotonic() >= deadline)
+
+
+def _checkpoint_key(shard: int) -> str:
+    # The shard count is part of the key: other counts cut other ranges.
+    return f"{CHECKPOINT_KEY}:{settings.DELIVERY_SHARDS}:{shard}"
+
+
+async def _load_checkpoint(shard: int, name: str) -> str | None:
+    """Return the last ID committed by an interrupted pass, if any."""
+    return cast(str | None, await get_redis().hget(_checkpoint_key(shard), name))
+
+
+async def _save_checkpoint(shard: int, name: str, last_id: str) -> None:
+    """Record the last ID committed by a pass over one shard."""
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.hset(_checkpoint_key(shard), name, last_id)
+        pipe.expire(_checkpoint_key(shard), CHECKPOINT_TTL_SEC)
+        await pipe.execute()
+
+
+async def _clear_checkpoint(shard: int, name: str) -> None:
+    """Forget a pass's checkpoint once it has covered the whole shard."""
+    await get_redis().hdel(_checkpoint_key(shard), name)
+
+
+def _observe_batch(mode: str, parcels: int, started: float) -> float:
+    """Record one committed batch in the batch metrics.
+
+    Returns:
+        float: Seconds since ``started``, for sizing the next batch.
+    """
+    elapsed = time.monotonic() - started
+    DELIVERY_BATCH_DURATION.labels(mode=mode).observe(elapsed)
+    DELIVERY_BATCH_SIZE.labels(mode=mode).observe(parcels)
+    return elapsed
+
+
+async def _reprice_python(
+    session: AsyncSession,
+    pricing: Pricing,
+    lock: RedisLock,
+    batch: int = settings.DELIVERY_BATCH_SIZE,
+    after: str | None = None,
+    before: str | None = None,
+    job_id: str | None = None,
+    pending: ColumnElement[bool] = _UNPRICED,
+    deadline: float | None = None,
+    checkpoint: SaveCheckpoint | None = None,
+) -> int:
+    """Price pending parcels in Python, one executemany UPDATE per batch.
+
+    Only the pricing columns are loaded, and costs are written back by primary
+    key with a compare-and-set on the version read, so parcels priced
+    concurrently keep their value. ``after`` and ``before`` bound the scan to
+    one shard; ``pending`` picks unpriced parcels or one stale version. No
+    batch starts after ``deadline`` or a stop request, and ``checkpoint``
+    receives the last ID of every committed batch.
+    """
+    updated = 0
+    while not _out_of_time(deadline):
+        started = time.monotonic()
+        rows = await _fetch_pending(
+            session, after, batch, before=before, pending=pending
+        )
+        if not rows:
+            return updated
+        # Rows a concurrent writer priced since the fetch fail the
+        # compare-and-set, so only the rows actually written are counted.
+        result = cast(
+            CursorResult[Any],
+            await session.execute(_SET_COST, _cost_params(rows, pricing)),
+        )
+        # Commit per batch to keep transactions small and let another run
+        # resume from the next pending batch if this worker is interrupted.
+        await _commit_batch(session, lock, result.rowcount, job_id)
+        updated += result.rowcount
+        after = rows[-1][0]
+        if checkpoint is not None:
+            await checkpoint(after)
+        batch = _next_batch_size(batch, _observe_batch("python", len(rows), started))
+    return updated
+
+
+async def _reprice_sql(
+    session: AsyncSession,
+    pricing: Pricing,
+    lock: RedisLock,
+    batch: int = settings.DELIVERY_BATCH_SIZE,
+    after: str | None = None,
+    before: str | None = None,
+    job_id: str | None = None,
+    pending: ColumnElement[bool] = _UNPRICED,
+    deadline: float | None = None,
+    checkpoint: SaveCheckpoint | None = None,
+) -> int:
+    """Price pending parcels with one UPDATE per primary-key chunk.
+
+    Each chunk covers the next ``batch`` pending IDs, so rows never travel to
+    Python and every transaction stays small. The ``pending`` condition is
+    kept in the UPDATE so parcels priced by someone else in the meantime are
+    skipped. ``after`` and ``before`` bound the scan to one shard;
+    ``deadline`` and ``checkpoint`` work as in ``_reprice_python``.
+    """
+    updated = 0
+    while not _out_of_time(deadline):
+        started = time.monotonic()
+        end = await _next_chunk_end(
+            session, after, batch, before=before, pending=pending
+        )
+        conditions: list[ColumnElement[bool]] = [pending]
+        if after is not None:
+            conditions.append(Parcel.id > after)
+        if end is not None:
+            conditions.append(Parcel.id <= end)
+        elif before is not None:
+            conditions.append(Parcel.id < before)
+
+        result = cast(
+            CursorResult[Any],
+            await session.execute(
+                update(Parcel)
+                .where(*conditions)
+                .values(
+                    delivery_cost_rub=_cost_expression(pricing.rate),
+                    pricing_version=pricing.version,
+                    currency_rate_id=pricing.rate_id,
+                )
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        await _commit_batch(session, lock, result.rowcount, job_id)
+        updated += result.rowcount
+        elapsed = _observe_batch("sql", result.rowcount, started)
+        if end is None:
+            return updated
+        after = end
+        if checkpoint is not None:
+            await checkpoint(after)
+        batch = _next_batch_size(batch, elapsed)
+    return updated
+
+
+async def price_parcels(
+    session: AsyncSession,
+    parcel_ids: Sequence[str],
+    pricing: Pricing,
+) -> int:
+    """Price specific parcels that are still unpriced and commit.
+
+    The pricing stream consumer calls this for each micro-batch. Unknown or
+    already priced IDs are skipped, so a redelivered entry or a parcel the
+    sweep got to first costs nothing.
+
+    Returns:
+        int: Number of parcels priced, not counting rows a concurrent writer
+        priced between the read and the update.
+    """
+    res = await session.execute(
+        select(*_PRICING_COLUMNS).where(Parcel.id.in_(parcel_ids), _UNPRICED)
+    )
+    rows = res.tuples().all()
+    if not rows:
+        return 0
+    result = cast(
+        CursorResult[Any],
+        await session.execute(_SET_COST, _cost_params(rows, pricing)),
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def _observe_backlog() -> None:
+    """Set the backlog gauges from the unpriced parcels still in MySQL.
+
+    Both figures come from the ``(delivery_cost_rub, created_at)`` index: a
+    count over its NULL range and the first entry of that range. A failed
+    read is logged and leaves the previous values; it never fails the run.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(
+                select(func.count(), func.min(Parcel.created_at)).where(_UNPRICED)
+            )
+            backlog, oldest = res.tuples().one()
+    except SQLAlchemyError:
+        log.warning("delivery_backlog_read_failed", exc_info=True)
+        return
+    age = 0.0
+    if oldest is not None:
+        # DATETIME columns come back naive; parcels are stamped in UTC.
+        oldest = oldest.replace(tzinfo=oldest.tzinfo or UTC)
+        age = max(0.0, (datetime.now(UTC) - oldest).total_seconds())
+    DELIVERY_BACKLOG.set(backlog)
+    DELIVERY_OLDEST_UNPRICED_AGE.set(age)
+
+
+async def estimate_backlog(limit: int) -> int:
+    """Return the number of unpriced parcels, counting no further than ``limit``.
+
+    The count reads at most ``limit`` entries of the ``(delivery_cost_rub,
+    id)`` index, so a poll costs the same however large the backlog grows.
+    """
+    capped = select(Parcel.id).where(_UNPRICED).limit(limit).subquery()
+    async with AsyncSessionLocal() as session:
+        return int(await session.scalar(select(func.count()).select_from(capped)) or 0)
+
+
+async def _stale_versions(current: str) -> list[str | None]:
+    """Return the pricing versions other than ``current`` still on parcels.
+
+    None stands for parcels priced before versions were recorded. The
+    distinct values are read from the ``(pricing_version, id)`` index.
+    """
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(
+            select(Parcel.pricing_version)
+            .where(
+                or_(
+                    Parcel.pricing_version.is_(None),
+                    Parcel.pricing_version != current,
+                )
+            )
+            .distinct()
+        )
+        return list(res.scalars().all())
+
+
+async def pricing_version_counts(session: AsyncSession) -> list[tuple[str | None, int]]:
+    """Return how many parcels each pricing version covers, newest first.
+
+    Parcels with no version, unpriced or priced before versions were
+    recorded, are counted under None and listed last.
+    """
+    res = await session.execute(
+        select(Parcel.pricing_version, func.count())
+        .group_by(Parcel.pricing_version)
+        .order_by(Parcel.pricing_version.is_(None), Parcel.pricing_version.desc())
+    )
+    return list(res.tuples().all())
+
+
+async def _reprice_pass(
+    session: AsyncSession,
+    shard: int,
+    name: str,
+    pricing: Pricing,
+    lock: RedisLock,
+    job_id: str | None,
+    pending: ColumnElement[bool],
+    deadline: float | None,
+) -> int:
+    """Run one pass over a shard, resuming from the pass's checkpoint.
+
+    A resumed pass goes from the checkpoint to the end of the shard, then
+    wraps around to cover the start of the shard up to the checkpoint, where
+    parcels created since the checkpoint was written may be waiting. The
+    checkpoint is cleared once both legs finish within the budget.
+
+    Returns:
+        int: Number of parcels updated.
+    """
+    lower, upper = _shard_bounds(shard, settings.DELIVERY_SHARDS)
+    resume = await _load_checkpoint(shard, name)
+    reprice = _reprice_python
+    if settings.DELIVERY_RECALC_MODE == "sql":
+        reprice = _reprice_sql
+    legs = [(resume or lower, upper)]
+    if resume is not None:
+        legs.append((lower, resume))
+    updated = 0
+    for after, before in legs:
+        updated += await reprice(
+            session,
+            pricing,
+            lock,
+            after=after,
+            before=before,
+            job_id=job_id,
+            pending=pending,
+            deadline=deadline,
+            checkpoint=partial(_save_checkpoint, shard, name),
+        )
+        if _out_of_time(deadline):
+            return updated
+    await _clear_checkpoint(shard, name)
+    return updated
+
+
+async def _reprice_shard(
+    shard: int,
+    pricing: Pricing,
+    job_id: str | None = None,
+    stale: Sequence[str | None] = (),
+    deadline: float | None = None,
+) -> int | None:
+    """Price one shard while holding its lease.
+
+    Unpriced parcels go first; then, for each version in ``stale``, parcels
+    still carrying it are repriced in resumable primary-key chunks. Each pass
+    keeps its own checkpoint, so a run stopped by ``deadline`` or shutdown is
+    picked up by the next one where it left off.
+
+    Returns:
+        int | None: Number of parcels updated, or None when another worker
+        holds the shard's lease.
+    """
+    lock = RedisLock(f"{LOCK_KEY}:{shard}", settings.DELIVERY_LOCK_TTL)
+    async with lock.held() as acquired:
+        if not acquired:
+            DELIVERY_SHARD_SKIPS.inc()
+            return None
+        fence = lock.fence
+        if job_id is not None:
+            await update_job(job_id, progress={"shards": 1})
+        passes: list[tuple[str, ColumnElement[bool]]] = [("unpriced", _UNPRICED)]
+        passes += [(f"stale:{v or ''}", _priced_with(v)) for v in stale]
+        updated = 0
+        async with AsyncSessionLocal() as session:
+            for name, pending in passes:
+                if _out_of_time(deadline):
+                    break
+                updated += await _reprice_pass(
+                    session, shard, name, pricing, lock, job_id, pending, deadline
+                )
+
+    log.info(
+        "delivery_shard_done: shard=%u, updated=%u, fence=%s", shard, updated, fence
+    )
+    return updated
+
+
+async def recalc_delivery_costs(
+    job_id: str | None = None,
+    reprice_stale: bool = False,
+) -> int:
     """Recalculate delivery costs for all unprocessed parcels.
 
     This function:
-    - Acquires a Redis lock to avoid race conditions;
-    - Fetches parcels in batches where ``delivery_cost_rub`` is null;
-    - Applies a pricing formula using the current USD/RUB rate;
-    - Commits updates to the database;
+    - Splits parcels into ``DELIVERY_SHARDS`` primary-key ranges and visits
+      them in random order with up to ``DELIVERY_SHARD_CONCURRENCY`` shards in
+      flight, so replicas started on the same tick spread over the shards;
+    - Prices each shard under its own Redis lease, extended while batches make
+      progress; shards leased by another replica are skipped, and a replica
+      that finishes early simply claims more of the remaining shards;
+    - Prices parcels where ``delivery_cost_rub`` is null using the current
+      USD/RUB rate, row by row or set-based per ``DELIVERY_RECALC_MODE``, and
+      stamps them with the current pricing version;
+    - With ``reprice_stale``, also reprices parcels stamped with any other
+      version, one version at a time;
+    - Commits updates batch by batch after checking the lease's fencing token,
+      and records each shard's progress in a Redis checkpoint;
+    - Stops starting new batches after ``DELIVERY_RUN_BUDGET_SEC`` or when
+      ``request_recalc_stop`` is called, leaving the rest of the work to the
+      next run, which resumes from the checkpoints;
     - Logs completion and stores metadata in Redis.
 
+    Args:
+        job_id: Job record to report the rate and per-batch progress to, for
+            runs queued through ``POST /tasks/recalc-delivery``.
+        reprice_stale: Also reprice parcels priced with older coefficients
+            or an earlier rate date.
+
     Returns:
-        int: Number of parcels successfully updated.
+        int: Number of parcels successfully updated, or 0 when other workers
+        hold every shard.
+
+    Raises:
+        LockLostError: If a shard's lease was lost mid-run; batches already
+            committed stay, and the other shards still run to completion.
     """
-    if not await _acquire_lock():
-        log.info("delivery_job_skip: reason=lock_exists")
-        return 0
+    global _active_runs
+    _active_runs += 1
+    try:
+        return await _recalc(job_id, reprice_stale)
+    finally:
+        _active_runs -= 1
+
 
+async def _recalc(job_id: str | None, reprice_stale: bool) -> int:
+    """Run ``recalc_delivery_costs`` within the run budget."""
     start = time.monotonic()
-    # Fetch one rate per run. All parcels updated in the same run use the same
-    # exchange rate, which makes the job easier to reason about and test.
-    rate = await get_usd_rub_rate()
-    updated = 0
+    deadline = start + settings.DELIVERY_RUN_BUDGET_SEC
+    # Fetch one rate per run. All parcels updated in the same run use the
+    # same exchange rate, which makes the job easier to reason about.
+    pricing = await current_pricing()
+    if job_id is not None:
+        await update_job(
+            job_id, info={"rate": str(pricing.rate), "version": pricing.version}
+        )
+    stale = await _stale_versions(pricing.version) if reprice_stale else []
 
-    async with AsyncSessionLocal() as session:
-        while parcels := await _fetch_unpriced(session):
-            # Commit per batch to keep transactions small and let another run
-            # resume from the next unpriced batch if this worker is interrupted.
-            for parcel in parcels:
-                parcel.delivery_cost_rub = await _formula(
-                    parcel.weight_kg,
-                    parcel.declared_value_usd,
-                    rate,
+    pending = list(range(settings.DELIVERY_SHARDS))
+    random.shuffle(pending)
+    claimed: list[int] = []
+    errors: list[Exception] = []
+
+    async def worker() -> None:
+        while pending and not _out_of_time(deadline):
+            shard = pending.pop()
+            try:
+                updated = await _reprice_shard(
+                    shard, pricing, job_id, stale, deadline=deadline
                 )
-            await session.commit()
-            updated += len(parcels)
+            except Exception as exc:
+                log.exception("delivery_shard_failed: shard=%u", shard)
+                errors.append(exc)
+                continue
+            if updated is not None:
+                claimed.append(updated)
+
+    workers = min(settings.DELIVERY_SHARD_CONCURRENCY, len(pending))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    # Every replica reports the backlog, even one that found all shards leased.
+    await _observe_backlog()
+    stopped = _out_of_time(deadline)
+    if stopped and job_id is not None:
+        await update_job(
+            job_id,
+            message="Stopped at the run budget or shutdown; "
+            "the next run resumes from the checkpoints",
+        )
+    if errors:
+        raise errors[0]
+    if not claimed:
+        log.info("delivery_job_skip: reason=lock_exists")
+        return 0
 
-    DELIVERY_RECALC_DURATION.observe(time.monotonic() - start)
+    updated = sum(claimed)
+    duration = time.monotonic() - start
+    DELIVERY_RECALC_DURATION.observe(duration)
     DELIVERY_RECALC_PARCELS.inc(updated)
+    DELIVERY_RECALC_THROUGHPUT.set(updated / duration if duration > 0 else 0.0)
 
     # Keep machine-readable task metadata in Redis for simple health/debug views.
     redis = get_redis()
     await redis.set("delivery_last_run_updated", str(updated))
     await redis.set("delivery_last_run_at", datetime.now(UTC).isoformat())
-    log.info("delivery_job_done: updated=%u, rate=%r", updated, float(rate))
+    log.info(
+        "delivery_job_done: updated=%u, shards=%u, rate=%r, mode=%s, "
+        "version=%s, stale_versions=%u, stopped=%s",
+        updated,
+        len(claimed),
+        float(pricing.rate),
+        settings.DELIVERY_RECALC_MODE,
+        pricing.version,
+        len(stale),
+        stopped,
+    )
     return updated
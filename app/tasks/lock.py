@@ -0,0 +1,184 @@
+"""Redis lock for background jobs that may run in several processes.
+
+The lock value is a random owner token, so only the holder can extend or
+release it; both are compare-and-set Lua scripts. Every successful acquire
+also increments a fencing counter next to the lock. A holder checks the lock
+and its fence just before each commit, so a run that stalled past its TTL and
+was replaced stops writing instead of racing the new holder.
+
+While held, a heartbeat task extends the TTL, but only as long as the job
+keeps reporting progress: a job stuck inside one batch lets the lock expire
+and another worker take over. A Redis error while extending is retried until
+the TTL since the last successful extend has run out.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Final
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+
+from app.redis_client import get_redis
+
+log = logging.getLogger(__name__)
+
+# KEYS[1] lock, KEYS[2] fence counter; ARGV[1] token, ARGV[2] TTL in ms.
+# Returns the new fence on success and 0 when the lock is taken.
+_ACQUIRE: Final[str] = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+
+# KEYS[1] lock; ARGV[1] token, ARGV[2] TTL in ms.
+_EXTEND: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1] lock; ARGV[1] token.
+_RELEASE: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# KEYS[1] lock, KEYS[2] fence counter; ARGV[1] token, ARGV[2] fence.
+_IS_HELD: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] and redis.call('GET', KEYS[2]) == ARGV[2] then
+    return 1
+end
+return 0
+"""
+
+
+class LockLostError(RuntimeError):
+    """Raised when a job finds it no longer holds its lock."""
+
+
+class RedisLock:
+    """Owner-tokened Redis lock with a progress-driven heartbeat.
+
+    Attributes:
+        name: Redis key of the lock.
+        ttl_sec: Lock lifetime without a heartbeat.
+        token: Random value identifying this holder.
+        fence: Fencing number of the current hold, or None when not held.
+    """
+
+    def __init__(self, name: str, ttl_sec: int) -> None:
+        """Create an unacquired lock handle with a fresh owner token."""
+        self.name = name
+        self.ttl_sec = ttl_sec
+        self.token = str(uuid4())
+        self.fence: int | None = None
+        self._last_progress = time.monotonic()
+        self._extended_at = time.monotonic()
+
+    @property
+    def _fence_key(self) -> str:
+        return f"{self.name}:fence"
+
+    async def acquire(self) -> bool:
+        """Take the lock if it is free and record the new fencing number."""
+        script = get_redis().register_script(_ACQUIRE)
+        fence = int(
+            await script(
+                keys=[self.name, self._fence_key],
+                args=[self.token, self.ttl_sec * 1000],
+            )
+        )
+        if not fence:
+            return False
+        self.fence = fence
+        self._last_progress = self._extended_at = time.monotonic()
+        return True
+
+    async def extend(self) -> bool:
+        """Reset the TTL if this handle still owns the lock."""
+        script = get_redis().register_script(_EXTEND)
+        return bool(
+            await script(keys=[self.name], args=[self.token, self.ttl_sec * 1000])
+        )
+
+    async def release(self) -> bool:
+        """Delete the lock if this handle still owns it."""
+        script = get_redis().register_script(_RELEASE)
+        released = bool(await script(keys=[self.name], args=[self.token]))
+        self.fence = None
+        return released
+
+    def progress(self) -> None:
+        """Record that the job finished a unit of work, keeping the heartbeat on."""
+        self._last_progress = time.monotonic()
+
+    async def ensure_held(self) -> None:
+        """Check ownership and fence right before a write is committed.
+
+        Raises:
+            LockLostError: If the lock expired or another holder acquired it.
+        """
+        script = get_redis().register_script(_IS_HELD)
+        held = self.fence is not None and await script(
+            keys=[self.name, self._fence_key],
+            args=[self.token, self.fence],
+        )
+        if not held:
+            raise LockLostError(f"Lock {self.name} lost (fence={self.fence})")
+
+    async def _heartbeat(self) -> None:
+        """Extend the TTL every third of it while progress keeps coming.
+
+        A Redis error is logged and the extend retried on the next beat. Once
+        a full TTL has passed without a successful extend, the lock must have
+        expired, so it is marked lost and the next ``ensure_held`` fails.
+        """
+        interval = self.ttl_sec / 3
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self._last_progress > self.ttl_sec:
+                log.warning("lock_heartbeat_stalled: name=%s", self.name)
+                return
+            try:
+                extended = await self.extend()
+            except RedisError:
+                if time.monotonic() - self._extended_at >= self.ttl_sec:
+                    log.warning("lock_heartbeat_expired: name=%s", self.name)
+                    self.fence = None
+                    return
+                log.warning("lock_heartbeat_redis_error: name=%s", self.name)
+                continue
+            if not extended:
+                log.warning("lock_heartbeat_lost: name=%s", self.name)
+                return
+            self._extended_at = time.monotonic()
+
+    @asynccontextmanager
+    async def held(self) -> AsyncIterator[bool]:
+        """Hold the lock for the duration of the block.
+
+        Yields:
+            bool: False when another holder has the lock; the block should
+            then skip its work. On True, a heartbeat runs until the block exits
+            and the lock is released afterwards.
+        """
+        if not await self.acquire():
+            yield False
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            yield True
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+            await self.release()
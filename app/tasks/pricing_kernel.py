@@ -0,0 +1,156 @@
+"""Batch delivery pricing in scaled integers.
+
+``_formula`` in ``app.tasks.delivery`` prices one parcel with ``Decimal``
+arithmetic. This kernel prices a whole batch at once from integers: weights
+in grams and declared values in cents, which the database returns directly
+so no ``Decimal`` is built per row. The formula coefficients and the rate are
+scaled to integers once per batch, the formula runs in exact integer math,
+and each cost comes back in kopecks, rounded half-up the way MySQL rounds an
+unrounded ``Decimal`` stored in the ``Numeric(12, 2)`` cost column.
+
+NumPy is used when installed and the batch is large enough to amortise array
+setup; otherwise the same math runs on Python ints. The NumPy path is only
+taken when the largest intermediate value fits in int64, so both paths always
+agree with ``_formula``.
+"""
+
+from collections.abc import Sequence
+from decimal import Decimal
+from functools import cache
+from types import ModuleType
+from typing import Any, Final
+
+from app.core.settings import settings
+
+# Column scales of ``parcel.weight_kg``, ``parcel.declared_value_usd`` and
+# ``parcel.delivery_cost_rub``.
+WEIGHT_SCALE: Final[int] = 3
+VALUE_SCALE: Final[int] = 2
+COST_SCALE: Final[int] = 2
+# Below this size NumPy array setup costs more than it saves.
+NUMPY_MIN_BATCH: Final[int] = 256
+_INT64_MAX: Final[int] = 2**63 - 1
+
+
+@cache
+def _numpy() -> ModuleType | None:
+    """Return the ``numpy`` module, or None when it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    module: ModuleType = numpy
+    return module
+
+
+def _scaled(value: Decimal) -> tuple[int, int]:
+    """Return ``(digits, scale)`` with ``value == digits / 10**scale`` exactly.
+
+    Raises:
+        ValueError: If ``value`` is negative, infinite, or NaN.
+    """
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int) or value < 0:
+        raise ValueError(f"Cannot price with {value}")
+    scale = max(0, -exponent)
+    return int(value.scaleb(scale)), scale
+
+
+class _Terms:
+    """Integer form of the formula for one rate, shared by both backends.
+
+    ``kopecks == ((w * weight_factor + v * value_factor) * rate + half) //
+    divisor``, where ``w`` is grams and ``v`` is cents. Every term is
+    non-negative, so adding ``half`` before the floor rounds half-up.
+    """
+
+    def __init__(self, rate: Decimal) -> None:
+        weight_coeff, weight_coeff_scale = _scaled(settings.DELIVERY_WEIGHT_COEFF)
+        value_coeff, value_coeff_scale = _scaled(settings.DELIVERY_VALUE_COEFF)
+        rate_digits, rate_scale = _scaled(rate)
+        self.rate: int = rate_digits
+
+        inner_scale = max(
+            WEIGHT_SCALE + weight_coeff_scale, VALUE_SCALE + value_coeff_scale
+        )
+        self.weight_factor: int = weight_coeff * 10 ** (
+            inner_scale - WEIGHT_SCALE - weight_coeff_scale
+        )
+        self.value_factor: int = value_coeff * 10 ** (
+            inner_scale - VALUE_SCALE - value_coeff_scale
+        )
+        excess = inner_scale + rate_scale - COST_SCALE
+        # A negative excess means the exact cost has fewer places than
+        # kopecks; scaling the rate up keeps the division exact.
+        if excess < 0:
+            self.rate *= 10**-excess
+            excess = 0
+        self.divisor: int = 10**excess
+        self.half: int = self.divisor // 2
+
+
+def _kopecks_python(
+    weights: Sequence[int], values: Sequence[int], terms: _Terms
+) -> list[int]:
+    """Price grams and cents with Python ints."""
+    wf, vf, rate = terms.weight_factor, terms.value_factor, terms.rate
+    divisor, half = terms.divisor, terms.half
+    return [
+        ((w * wf + v * vf) * rate + half) // divisor
+        for w, v in zip(weights, values, strict=True)
+    ]
+
+
+def _fits_int64(weights: Sequence[int], values: Sequence[int], terms: _Terms) -> bool:
+    """Return True when every intermediate of the NumPy path fits in int64."""
+    bound = max(weights) * terms.weight_factor + max(values) * terms.value_factor
+    return bound * terms.rate + terms.half <= _INT64_MAX
+
+
+def _kopecks_numpy(
+    np: ModuleType, weights: Sequence[int], values: Sequence[int], terms: _Terms
+) -> list[int]:
+    """Price grams and cents as int64 arrays."""
+    weight_arr: Any = np.asarray(weights, dtype=np.int64)
+    value_arr: Any = np.asarray(values, dtype=np.int64)
+    scaled = weight_arr * terms.weight_factor + value_arr * terms.value_factor
+    scaled *= terms.rate
+    scaled += terms.half
+    scaled //= terms.divisor
+    kopecks: list[int] = scaled.tolist()
+    return kopecks
+
+
+def price_kopecks(
+    weights: Sequence[int],
+    values: Sequence[int],
+    rate: Decimal,
+) -> list[int]:
+    """Return delivery costs in kopecks for a batch of parcels.
+
+    Args:
+        weights: Parcel weights in grams (``weight_kg`` scaled by 10**3).
+        values: Declared values in US cents (``declared_value_usd`` * 10**2).
+        rate: USD to RUB conversion rate.
+
+    Returns:
+        list[int]: ``_formula(weight_kg, declared_value_usd, rate)`` per
+        parcel, in kopecks, rounded half-up.
+
+    Raises:
+        ValueError: If any input or coefficient is negative; the column
+            constraints and settings rule that out.
+    """
+    if not weights:
+        return []
+    if min(weights) < 0 or min(values) < 0:
+        raise ValueError("Cannot price negative weights or values")
+    terms = _Terms(rate)
+    np = _numpy()
+    if (
+        np is not None
+        and len(weights) >= NUMPY_MIN_BATCH
+        and _fits_int64(weights, values, terms)
+    ):
+        return _kopecks_numpy(np, weights, values, terms)
+    return _kopecks_python(weights, values, terms)
@@ -0,0 +1,134 @@
+"""Redis Stream consumer that prices parcels right after they are created.
+
+``app.services.pricing_events`` appends each new parcel ID to a stream. Every
+scheduler process joins one consumer group on it, reads new entries in
+micro-batches, prices them with the cached USD/RUB rate, and acknowledges
+them. Entries stuck in the pending list of a consumer that crashed are
+reclaimed with ``XAUTOCLAIM`` once idle for ``PRICING_STREAM_CLAIM_IDLE_MS``.
+
+Pricing goes through the same ``IS NULL``-guarded UPDATE as the periodic
+sweep, so an entry delivered twice, or a parcel the sweep priced first, is
+simply acknowledged. The sweep still covers anything the stream never saw.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Final, cast
+
+from redis.exceptions import RedisError, ResponseError
+
+from app.core.metrics import DELIVERY_RECALC_PARCELS, PRICING_STREAM_LAG
+from app.core.settings import settings
+from app.db.session import AsyncSessionLocal
+from app.redis_client import get_redis
+from app.services.pricing_events import GROUP, STREAM
+from app.tasks.delivery import current_pricing, price_parcels
+
+log = logging.getLogger(__name__)
+
+RETRY_DELAY_SEC: Final[float] = 1.0
+
+# Fields are None for entries trimmed from the stream while still pending.
+StreamEntry = tuple[str, dict[str, str] | None]
+
+
+async def _ensure_group() -> None:
+    """Create the consumer group, and the stream with it, if missing.
+
+    The group starts at the beginning of the stream so IDs published before
+    the first consumer ever started are priced too.
+    """
+    try:
+        await get_redis().xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+    except ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+async def _claim_stale(consumer: str) -> list[StreamEntry]:
+    """Take over entries left pending by consumers that stopped acknowledging."""
+    reply = await get_redis().xautoclaim(
+        STREAM,
+        GROUP,
+        consumer,
+        min_idle_time=settings.PRICING_STREAM_CLAIM_IDLE_MS,
+        start_id="0-0",
+        count=settings.PRICING_STREAM_BATCH,
+    )
+    return cast(list[StreamEntry], reply[1])
+
+
+async def _read_new(consumer: str) -> list[StreamEntry]:
+    """Block for up to ``PRICING_STREAM_BLOCK_MS`` waiting for new entries."""
+    reply = await get_redis().xreadgroup(
+        GROUP,
+        consumer,
+        {STREAM: ">"},
+        count=settings.PRICING_STREAM_BATCH,
+        block=settings.PRICING_STREAM_BLOCK_MS,
+    )
+    if not reply:
+        return []
+    streams = cast(list[tuple[str, list[StreamEntry]]], reply)
+    return streams[0][1]
+
+
+def _entry_age(entry_id: str) -> float:
+    """Return seconds since an entry was added, from its millisecond ID."""
+    return max(0.0, time.time() - int(entry_id.split("-", 1)[0]) / 1000)
+
+
+async def _price_entries(entries: list[StreamEntry]) -> int:
+    """Price the parcels named by ``entries`` and acknowledge them.
+
+    Entries are acknowledged only after the prices are committed; on failure
+    they stay pending and are reclaimed later.
+    """
+    parcel_ids = [fields["id"] for _, fields in entries if fields and "id" in fields]
+    priced = 0
+    if parcel_ids:
+        pricing = await current_pricing()
+        async with AsyncSessionLocal() as session:
+            priced = await price_parcels(session, parcel_ids, pricing)
+
+    await get_redis().xack(STREAM, GROUP, *(entry_id for entry_id, _ in entries))
+    for entry_id, _ in entries:
+        PRICING_STREAM_LAG.observe(_entry_age(entry_id))
+    DELIVERY_RECALC_PARCELS.inc(priced)
+    log.info("pricing_stream_batch: entries=%u, priced=%u", len(entries), priced)
+    return priced
+
+
+async def consume_pricing_stream(consumer: str | None = None) -> None:
+    """Price parcels announced on the stream until cancelled.
+
+    Args:
+        consumer: Consumer name within the group; defaults to host and PID so
+            every scheduler process gets its own pending list.
+    """
+    consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+    next_claim = 0.0
+    while True:
+        try:
+            await _ensure_group()
+            while True:
+                entries: list[StreamEntry] = []
+                if time.monotonic() >= next_claim:
+                    entries = await _claim_stale(consumer)
+                    # A full page may mean more are waiting; claim again soon.
+                    if len(entries) < settings.PRICING_STREAM_BATCH:
+                        idle_sec = settings.PRICING_STREAM_CLAIM_IDLE_MS / 1000
+                        next_claim = time.monotonic() + idle_sec
+                if not entries:
+                    entries = await _read_new(consumer)
+                if entries:
+                    await _price_entries(entries)
+        except RedisError:
+            log.warning("pricing_stream_redis_error", exc_info=True)
+        except Exception:
+            # Unacknowledged entries stay pending and are reclaimed later.
+            log.exception("pricing_stream_batch_failed")
+        await asyncio.sleep(RETRY_DELAY_SEC)
@@ -0,0 +1,210 @@
+"""Queued manual runs of the delivery-cost recalculation.
+
+``POST /tasks/recalc-delivery`` no longer runs the job inside the request. It
+creates a job record, pushes its ID onto a Redis list, and returns at once.
+The scheduler process pops queued IDs and runs ``recalc_delivery_costs`` for
+each, which writes the rate and per-batch progress to the job record as it
+goes, so ``GET /tasks/{job_id}`` can report on a run while it is still busy.
+
+A popped ID is moved, not removed, into a processing list owned by the
+consumer, and only dropped once its run has finished, while a short-lived
+"alive" key marks the consumer as running. A consumer starting up settles
+the leftovers in its own processing list and takes over those of consumers
+that are no longer alive: jobs that never
+started are queued again, and jobs left running are marked failed, so no job
+stays "running" after its process died.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Final, cast
+
+from redis.exceptions import RedisError
+
+from app.core.exceptions import NotFoundError
+from app.core.jobs import Job, create_job, get_job, start_job, update_job
+from app.redis_client import get_redis
+from app.schemas import DeliveryRecalcJobRead, JobRead
+from app.tasks.delivery import recalc_delivery_costs
+
+log = logging.getLogger(__name__)
+
+JOB_KIND: Final[str] = "delivery_recalc"
+# Stored in the job's ``info`` to ask the worker to reprice stale versions.
+REPRICE_STALE_MODE: Final[str] = "reprice_stale"
+QUEUE_KEY: Final[str] = "delivery_recalc:queue"
+PROCESSING_KEY_TMPL: Final[str] = "delivery_recalc:processing:{consumer}"
+ALIVE_KEY_TMPL: Final[str] = "delivery_recalc:alive:{consumer}"
+ALIVE_TTL_SEC: Final[int] = 30
+POP_TIMEOUT_SEC: Final[int] = 5
+RETRY_DELAY_SEC: Final[float] = 1.0
+ABANDONED_MESSAGE: Final[str] = (
+    "Scheduler stopped during the run; committed batches are kept, "
+    "queue a new run to finish"
+)
+
+
+async def enqueue_recalc(owner_id: str, reprice_stale: bool = False) -> str:
+    """Create a pending recalculation job and queue it for the scheduler.
+
+    Args:
+        owner_id: Caller allowed to read the job.
+        reprice_stale: Also reprice parcels stamped with an outdated pricing
+            version, not only unpriced ones.
+
+    Returns:
+        str: ID of the new job.
+    """
+    job_id = await create_job(JOB_KIND, owner_id)
+    if reprice_stale:
+        await update_job(job_id, info={"mode": REPRICE_STALE_MODE})
+    await get_redis().lpush(QUEUE_KEY, job_id)
+    return job_id
+
+
+async def get_recalc_job(job_id: str) -> DeliveryRecalcJobRead:
+    """Return a recalculation job with its derived throughput figures.
+
+    Raises:
+        NotFoundError: If the job does not exist, has expired, or is not a
+            recalculation job.
+    """
+    job = await get_job(job_id)
+    if job is None or job.kind != JOB_KIND:
+        raise NotFoundError("Recalculation job not found")
+    return recalc_job_read(job, datetime.now(UTC))
+
+
+def recalc_job_read(job: Job, now: datetime) -> DeliveryRecalcJobRead:
+    """Build the API view of a recalculation job as of ``now``."""
+    elapsed = 0.0
+    if job.started_at is not None:
+        end = now if job.status == "running" else job.updated_at
+        elapsed = max(0.0, (end - job.started_at).total_seconds())
+    batches = job.progress.get("batches", 0)
+    rate = job.info.get("rate")
+    return DeliveryRecalcJobRead(
+        **JobRead.model_validate(job).model_dump(),
+        parcels_done=job.progress.get("parcels", 0),
+        rate=Decimal(rate) if rate is not None else None,
+        elapsed_sec=round(elapsed, 3),
+        batches_per_sec=round(batches / elapsed, 2) if elapsed else 0.0,
+    )
+
+
+async def run_recalc_job(job_id: str) -> None:
+    """Run one queued recalculation and record its outcome on the job.
+
+    A job that was already started, for example by a replica that popped the
+    same ID after a Redis failover, is left alone.
+    """
+    if not await start_job(job_id):
+        log.warning("delivery_recalc_job_already_started: job_id=%s", job_id)
+        return
+    job = await get_job(job_id)
+    reprice_stale = job is not None and job.info.get("mode") == REPRICE_STALE_MODE
+    try:
+        updated = await recalc_delivery_costs(
+            job_id=job_id, reprice_stale=reprice_stale
+        )
+    except Exception as exc:
+        log.exception("delivery_recalc_job_failed: job_id=%s", job_id)
+        await update_job(job_id, status="failed", message=str(exc))
+        return
+    await update_job(job_id, status="completed")
+    log.info("delivery_recalc_job_done: job_id=%s updated=%s", job_id, updated)
+
+
+async def _keep_alive(consumer: str) -> None:
+    """Refresh the consumer's alive key until cancelled."""
+    key = ALIVE_KEY_TMPL.format(consumer=consumer)
+    while True:
+        try:
+            await get_redis().set(key, "1", ex=ALIVE_TTL_SEC)
+        except RedisError:
+            log.warning("delivery_recalc_alive_redis_error", exc_info=True)
+        await asyncio.sleep(ALIVE_TTL_SEC / 3)
+
+
+async def _settle_abandoned(own: str, job_id: str) -> None:
+    """Requeue or fail one job taken over from a dead consumer's list."""
+    redis = get_redis()
+    job = await get_job(job_id)
+    if job is not None and job.status == "pending":
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(QUEUE_KEY, job_id)
+            pipe.lrem(own, 1, job_id)
+            await pipe.execute()
+        log.warning("delivery_recalc_job_requeued: job_id=%s", job_id)
+        return
+    if job is not None and job.status == "running":
+        await update_job(job_id, status="failed", message=ABANDONED_MESSAGE)
+        log.warning("delivery_recalc_job_abandoned: job_id=%s", job_id)
+    await redis.lrem(own, 1, job_id)
+
+
+async def recover_abandoned_jobs(consumer: str) -> int:
+    """Take over the processing lists of consumers that are no longer alive.
+
+    The consumer's own list is settled first: under Docker the scheduler
+    restarts as PID 1 in the same container, so a restarted process gets the
+    name, and the leftovers, of the one that crashed. Entries of other
+    consumers are first moved into ``consumer``'s own processing list, so two
+    consumers starting together never handle the same job twice. A job that
+    never started goes back to the queue; one left running is marked failed,
+    since its process died mid-run; finished or expired jobs are dropped.
+
+    Returns:
+        int: Number of abandoned entries handled.
+    """
+    redis = get_redis()
+    own = PROCESSING_KEY_TMPL.format(consumer=consumer)
+    prefix = PROCESSING_KEY_TMPL.format(consumer="")
+    handled = 0
+    for job_id in await redis.lrange(own, 0, -1):
+        await _settle_abandoned(own, cast(str, job_id))
+        handled += 1
+    async for key in redis.scan_iter(match=f"{prefix}*"):
+        owner = key.removeprefix(prefix)
+        if key == own or await redis.exists(ALIVE_KEY_TMPL.format(consumer=owner)):
+            continue
+        while (moved := await redis.lmove(key, own, "RIGHT", "LEFT")) is not None:
+            await _settle_abandoned(own, cast(str, moved))
+            handled += 1
+    return handled
+
+
+async def consume_recalc_requests(consumer: str | None = None) -> None:
+    """Run queued recalculation jobs one at a time until cancelled.
+
+    Args:
+        consumer: Name of this consumer's processing list; defaults to host
+            and PID so every scheduler process gets its own.
+    """
+    consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+    processing = PROCESSING_KEY_TMPL.format(consumer=consumer)
+    alive = asyncio.create_task(_keep_alive(consumer))
+    recovered = False
+    try:
+        while True:
+            try:
+                redis = get_redis()
+                if not recovered:
+                    await recover_abandoned_jobs(consumer)
+                    recovered = True
+                moved = await redis.blmove(
+                    QUEUE_KEY, processing, POP_TIMEOUT_SEC, "RIGHT", "LEFT"
+                )
+                if moved is not None:
+                    job_id = cast(str, moved)
+                    await run_recalc_job(job_id)
+                    await redis.lrem(processing, 1, job_id)
+            except RedisError:
+                log.warning("delivery_recalc_queue_redis_error", exc_info=True)
+                await asyncio.sleep(RETRY_DELAY_SEC)
+    finally:
+        alive.cancel()
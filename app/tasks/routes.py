@@ -6,15 +6,27 @@ exposed publicly, protect this router at the gateway or add an auth dependency.
 
 import logging
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_task_admin_token
-from app.api.examples import FORBIDDEN_ERROR_EXAMPLE, TASK_RECALC_RESPONSE_EXAMPLE
+from app.api.examples import (
+    FORBIDDEN_ERROR_EXAMPLE,
+    TASK_PRICING_VERSIONS_EXAMPLE,
+    TASK_RECALC_JOB_EXAMPLE,
+    TASK_RECALC_RESPONSE_EXAMPLE,
+)
 from app.core.rate_limit import limiter
 from app.core.settings import settings
-from app.redis_client import get_redis
-from app.schemas import ErrorResponse
-from app.tasks.delivery import recalc_delivery_costs
+from app.db.deps import get_db
+from app.schemas import (
+    DeliveryRecalcJobRead,
+    ErrorResponse,
+    JobCreateResponse,
+    PricingVersionRead,
+)
+from app.tasks.delivery import current_pricing, pricing_version_counts
+from app.tasks.recalc_jobs import enqueue_recalc, get_recalc_job
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -25,10 +37,10 @@ log = logging.getLogger(__name__)
     "/recalc-delivery",
     status_code=status.HTTP_202_ACCEPTED,
     summary="Trigger delivery-cost recalculation manually",
-    response_model=dict[str, int],
+    response_model=JobCreateResponse,
     responses={
         202: {
-            "description": "Delivery-cost recalculation completed.",
+            "description": "Recalculation queued; poll GET /tasks/{job_id}.",
             "content": {"application/json": {"example": TASK_RECALC_RESPONSE_EXAMPLE}},
         },
         403: {
@@ -41,18 +53,86 @@ log = logging.getLogger(__name__)
 @limiter.limit(settings.RATE_LIMIT_RECALC)
 async def manual_recalc(
     request: Request,
+    reprice_stale: bool = Query(
+        False,
+        description=(
+            "Also reprice parcels priced with other coefficients or an earlier "
+            "rate date; see GET /tasks/pricing-versions."
+        ),
+    ),
     _admin: None = Depends(require_task_admin_token),
-) -> dict[str, int]:
-    """Manually trigger the delivery cost recalculation task.
+) -> JobCreateResponse:
+    """Queue a delivery cost recalculation and return its job ID.
 
     Intended for operators and local development. The admin-token dependency is
     independent from user auth because this action affects all parcels.
     """
-    # This endpoint is an operational escape hatch. The admin-token dependency
-    # protects it independently from user/session authentication.
-    # Clear a stale lock before running manually; the task will acquire a fresh
-    # lock immediately and still deduplicate concurrent invocations.
-    await get_redis().delete("delivery_job_lock")
-    updated = await recalc_delivery_costs()
-    log.info("manual_recalc called")
-    return {"updated": updated}
+    # The run happens in the scheduler process, so a large backlog never holds
+    # an API worker or its DB connection. It goes through the same shard
+    # leases as the scheduled sweep and never breaks a run already in progress.
+    job_id = await enqueue_recalc("admin", reprice_stale=reprice_stale)
+    log.info("manual_recalc_queued: job_id=%s reprice_stale=%s", job_id, reprice_stale)
+    return JobCreateResponse(job_id=job_id, status="pending")
+
+
+@router.get(
+    "/pricing-versions",
+    response_model=list[PricingVersionRead],
+    summary="Count parcels per pricing version",
+    responses={
+        200: {
+            "description": "Parcels per version, current version first.",
+            "content": {"application/json": {"example": TASK_PRICING_VERSIONS_EXAMPLE}},
+        },
+        403: {
+            "model": ErrorResponse,
+            "description": "Manual trigger is disabled or admin token is invalid.",
+            "content": {"application/json": {"example": FORBIDDEN_ERROR_EXAMPLE}},
+        },
+    },
+)
+async def get_pricing_versions(
+    db: AsyncSession = Depends(get_db),
+    _admin: None = Depends(require_task_admin_token),
+) -> list[PricingVersionRead]:
+    """Return how many parcels each pricing version still covers.
+
+    The current version is the one the recalculation job stamps right now,
+    which during a rate fallback carries the last known good table's date.
+    Every other version is stale and is repriced by
+    ``POST /tasks/recalc-delivery?reprice_stale=true``.
+    """
+    current = (await current_pricing()).version
+    counts = await pricing_version_counts(db)
+    return [
+        PricingVersionRead(version=version, parcels=parcels, current=version == current)
+        for version, parcels in counts
+    ]
+
+
+@router.get(
+    "/{job_id}",
+    response_model=DeliveryRecalcJobRead,
+    summary="Get the state of a queued delivery-cost recalculation",
+    responses={
+        200: {
+            "description": "Run state, progress, rate used, and throughput.",
+            "content": {"application/json": {"example": TASK_RECALC_JOB_EXAMPLE}},
+        },
+        403: {
+            "model": ErrorResponse,
+            "description": "Manual trigger is disabled or admin token is invalid.",
+            "content": {"application/json": {"example": FORBIDDEN_ERROR_EXAMPLE}},
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Recalculation job not found or expired.",
+        },
+    },
+)
+async def get_recalc_status(
+    job_id: str,
+    _admin: None = Depends(require_task_admin_token),
+) -> DeliveryRecalcJobRead:
+    """Return the state and progress of a recalculation job."""
+    return await get_recalc_job(job_id)
@@ -10,14 +10,19 @@ from asyncio import AbstractEventLoop
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from app.core.settings import settings
+from app.services.rates import refresh_rate_ahead
 from app.tasks.delivery import recalc_delivery_costs
 
 
 def init_scheduler(loop: AbstractEventLoop) -> AsyncIOScheduler:
-    """Initialize and configure the APScheduler with a recurring job.
+    """Initialize and configure the APScheduler with recurring jobs.
 
     Binds the scheduler to the provided asyncio event loop and schedules
-    the ``recalc_delivery_costs`` task according to DELIVERY_JOB_INTERVAL_MIN.
+    ``refresh_rate_ahead`` RATE_REFRESH_LEAD_MIN minutes before UTC midnight,
+    so the next day's rate table is cached before it is first needed. With
+    ``DELIVERY_SCHEDULE=cron`` it schedules the ``recalc_delivery_costs`` task
+    according to DELIVERY_JOB_INTERVAL_MIN; the adaptive schedule runs in
+    ``app.tasks.adaptive_recalc`` instead and adds no job here.
 
     Args:
         loop: AsyncIO event loop that will drive scheduled job execution.
@@ -26,6 +31,18 @@ def init_scheduler(loop: AbstractEventLoop) -> AsyncIOScheduler:
         AsyncIOScheduler: Configured scheduler instance, not yet started.
     """
     scheduler = AsyncIOScheduler(timezone="UTC", event_loop=loop)
+    scheduler.add_job(
+        refresh_rate_ahead,
+        trigger="cron",
+        hour=23,
+        minute=60 - settings.RATE_REFRESH_LEAD_MIN,
+        id="refresh_rate_ahead",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+    )
+    if settings.DELIVERY_SCHEDULE != "cron":
+        return scheduler
     scheduler.add_job(
         recalc_delivery_costs,
         trigger="cron",  # Run on a recurring schedule.
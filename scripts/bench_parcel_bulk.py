@@ -0,0 +1,110 @@
+"""Compare parcel registration throughput: POST /parcels vs POST /parcels/bulk.
+
+Run against a local stack whose rate limits are raised far enough not to
+interfere, for example::
+
+    RATE_LIMIT_CREATE=1000000/minute RATE_LIMIT_BULK_ITEMS=1000000/minute \
+        docker compose up -d
+    python scripts/bench_parcel_bulk.py --parcels 2000 --concurrency 8
+
+The script registers a throwaway user, then creates the same number of parcels
+through each endpoint and prints rows per second for both.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from uuid import uuid4
+
+import httpx
+
+Job = tuple[str, object]
+
+
+def _payload(parcel_type_id: str, index: int) -> dict[str, str]:
+    """Return one valid parcel payload."""
+    return {
+        "name": f"bench-{index}",
+        "weightKg": "1.250",
+        "declaredValueUsd": "42.00",
+        "parcelTypeId": parcel_type_id,
+    }
+
+
+async def _auth_headers(client: httpx.AsyncClient) -> dict[str, str]:
+    """Register a throwaway user and return its bearer header."""
+    resp = await client.post(
+        "/auth/register",
+        json={"email": f"bench-{uuid4()}@example.com", "password": "benchpass123"},
+    )
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+async def _first_parcel_type_id(client: httpx.AsyncClient) -> str:
+    """Return the ID of any seeded parcel type."""
+    resp = await client.get("/parcel-types", params={"limit": 1})
+    resp.raise_for_status()
+    return str(resp.json()["items"][0]["id"])
+
+
+async def _run_workers(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    jobs: list[Job],
+    concurrency: int,
+) -> float:
+    """Send every ``(path, json)`` job with bounded concurrency.
+
+    Returns:
+        float: Wall-clock seconds spent sending the jobs.
+    """
+    queue: asyncio.Queue[Job] = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async def worker() -> None:
+        while not queue.empty():
+            path, body = queue.get_nowait()
+            resp = await client.post(path, json=body, headers=headers)
+            resp.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    """Parse arguments, run both benchmarks, and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--base-url", default=os.getenv("BASE_URL", "http://localhost:8000")
+    )
+    parser.add_argument("--parcels", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        headers = await _auth_headers(client)
+        parcel_type_id = await _first_parcel_type_id(client)
+        payloads = [_payload(parcel_type_id, i) for i in range(args.parcels)]
+        single_jobs: list[Job] = [("/parcels", payload) for payload in payloads]
+        bulk_jobs: list[Job] = [
+            ("/parcels/bulk", payloads[start : start + args.batch_size])
+            for start in range(0, args.parcels, args.batch_size)
+        ]
+        single = args.parcels / await _run_workers(
+            client, headers, single_jobs, args.concurrency
+        )
+        bulk = args.parcels / await _run_workers(
+            client, headers, bulk_jobs, args.concurrency
+        )
+
+    print(f"POST /parcels       {single:10.1f} rows/sec")
+    print(f"POST /parcels/bulk  {bulk:10.1f} rows/sec  (x{bulk / single:.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""Compare CPU cost of encoding a parcel list page: ORM path vs Core-row path.
+
+No database is needed: both paths start from in-memory data so the numbers
+isolate object construction, validation, and JSON encoding. Run from the
+repository root with the app environment loaded, for example::
+
+    set -a; . ./.env.test; set +a
+    PYTHONPATH=. python scripts/bench_parcel_list.py --rows 100
+
+The ORM path mirrors the previous handler: build ``Parcel`` instances, wrap
+them in ``PaginatedResponse[ParcelRead]``, let the response model validate and
+render them, and ``jsonable_encoder`` the page again for the cache. The Core
+path encodes column tuples with the precompiled page serializer.
+"""
+
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.parcel import Parcel
+from app.models.parcel_type import ParcelType
+from app.schemas import PaginatedResponse, ParcelRead
+from app.services.parcel import PARCEL_PAGE_JSON, ParcelRow, parcel_record
+from app.services.parcel_type_registry import ParcelTypeRegistry
+
+PAGE_ADAPTER = TypeAdapter(PaginatedResponse[ParcelRead])
+
+
+def _rows(count: int, parcel_type_id: str) -> list[ParcelRow]:
+    """Return ``count`` rows shaped like the list query result."""
+    return [
+        (
+            str(uuid4()),
+            f"bench-{index}",
+            Decimal("1.250"),
+            Decimal("42.00"),
+            Decimal("512.75") if index % 2 else None,
+            parcel_type_id,
+        )
+        for index in range(count)
+    ]
+
+
+def orm_path(rows: list[ParcelRow], registry: ParcelTypeRegistry) -> bytes:
+    """Encode a page the way the ORM-backed handler did."""
+    parcels = [
+        Parcel(
+            id=id_,
+            name=name,
+            weight_kg=weight_kg,
+            declared_value_usd=value_usd,
+            delivery_cost_rub=cost_rub,
+            parcel_type_id=type_id,
+        )
+        for id_, name, weight_kg, value_usd, cost_rub, type_id in rows
+    ]
+    page = PaginatedResponse[ParcelRead](
+        items=[
+            ParcelRead(
+                id=parcel.id,
+                name=parcel.name,
+                weight_kg=parcel.weight_kg,
+                declared_value_usd=parcel.declared_value_usd,
+                delivery_cost_rub=parcel.delivery_cost_rub,
+                parcel_type=registry.by_id[parcel.parcel_type_id],
+            )
+            for parcel in parcels
+        ],
+        total=len(rows),
+        limit=len(rows),
+        offset=0,
+    )
+    json.dumps(jsonable_encoder(page))  # what the cache decorator stored
+    validated = PAGE_ADAPTER.validate_python(page, from_attributes=True)
+    return PAGE_ADAPTER.dump_json(validated, by_alias=True)
+
+
+def core_path(rows: list[ParcelRow], registry: ParcelTypeRegistry) -> bytes:
+    """Encode a page from Core rows with the precompiled serializer."""
+    return PARCEL_PAGE_JSON.dump_json(
+        {
+            "items": [parcel_record(row, registry) for row in rows],
+            "total": len(rows),
+            "limit": len(rows),
+            "offset": 0,
+        }
+    )
+
+
+def _best_us(fn: Callable[[], bytes], number: int, repeat: int) -> float:
+    """Return the best per-call time in microseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    """Parse arguments, check both paths agree, and print timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    parcel_type_id = str(uuid4())
+    registry = ParcelTypeRegistry.build(
+        [ParcelType(id=parcel_type_id, name="electronics")], version=0
+    )
+    rows = _rows(args.rows, parcel_type_id)
+    if orm_path(rows, registry) != core_path(rows, registry):
+        raise SystemExit("ORM and Core paths produced different JSON")
+
+    orm = _best_us(lambda: orm_path(rows, registry), args.number, args.repeat)
+    core = _best_us(lambda: core_path(rows, registry), args.number, args.repeat)
+    print(f"{'ORM + response model':24}{orm:10.1f} us/page")
+    print(f"{'Core rows + serializer':24}{core:10.1f} us/page  (x{orm / core:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare CPU cost of pricing a batch: per-row ``Decimal`` vs the kernel.
+
+No database is needed: both paths price the same in-memory rows, so the
+numbers isolate the work done for one ``python``-mode batch after the fetch.
+Run from the repository root with the app environment loaded, for example::
+
+    set -a; . ./.env.test; set +a
+    PYTHONPATH=. python scripts/bench_pricing_kernel.py --rows 5000
+
+The ``Decimal`` path mirrors the previous ``_cost_params``: ``_formula`` per
+row on the ``Decimal`` columns the driver used to return. The kernel path
+prices the integer columns the fetch now returns with ``price_kopecks``,
+which uses NumPy when installed. Neither includes the driver's own cost of
+parsing DECIMAL columns into ``Decimal`` objects, which the kernel also saves.
+"""
+
+import argparse
+import random
+import timeit
+from decimal import Decimal
+
+from app.tasks.delivery import _formula
+from app.tasks.pricing_kernel import _numpy, price_kopecks
+
+RATE = Decimal("90.1234")
+
+
+def _columns(count: int) -> tuple[list[int], list[int]]:
+    """Return ``count`` weights in grams and declared values in cents."""
+    rng = random.Random(0)  # nosec B311
+    grams = [rng.randint(1, 50_000) for _ in range(count)]
+    cents = [rng.randint(1, 500_000) for _ in range(count)]
+    return grams, cents
+
+
+def decimal_path(weights: list[Decimal], values: list[Decimal]) -> list[Decimal]:
+    """Price each row with ``_formula``."""
+    return [_formula(w, v, RATE) for w, v in zip(weights, values, strict=True)]
+
+
+def kernel_path(grams: list[int], cents: list[int]) -> list[int]:
+    """Price the whole batch with the scaled-integer kernel."""
+    return price_kopecks(grams, cents, RATE)
+
+
+def main() -> None:
+    """Run both paths and print per-batch timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    grams, cents = _columns(args.rows)
+    weights = [Decimal(g).scaleb(-3) for g in grams]
+    values = [Decimal(c).scaleb(-2) for c in cents]
+    print(f"numpy: {'yes' if _numpy() is not None else 'no'}")
+    for name, seconds in (
+        (
+            "decimal",
+            timeit.timeit(lambda: decimal_path(weights, values), number=args.repeat),
+        ),
+        (
+            "kernel",
+            timeit.timeit(lambda: kernel_path(grams, cents), number=args.repeat),
+        ),
+    ):
+        per_batch = seconds / args.repeat * 1000
+        print(f"{name:8s} {per_batch:8.3f} ms/batch of {args.rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Compare CPU cost of validating an access token with and without the cache.
+
+No server is needed: both paths validate the same signed token in process, so
+the numbers isolate the per-request work done by the auth dependencies. Run
+from the repository root with the app environment loaded, for example::
+
+    set -a; . ./.env.test; set +a
+    PYTHONPATH=. python scripts/bench_token_decode.py --repeat 20000
+
+``decode`` verifies the signature and registered claims on every call, as
+every authenticated request used to. ``cached`` goes through
+``decode_token_cached`` with a warm cache, which is what repeat requests with
+the same token now cost: one SHA-256 of the token and an LRU lookup.
+"""
+
+import argparse
+import timeit
+
+from app.core.security import create_access_token, decode_token, decode_token_cached
+
+
+def main() -> None:
+    """Run both paths and print per-decode timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token("bench-user")
+    decode_token_cached(token)
+    for name, seconds in (
+        ("decode", timeit.timeit(lambda: decode_token(token), number=args.repeat)),
+        (
+            "cached",
+            timeit.timeit(lambda: decode_token_cached(token), number=args.repeat),
+        ),
+    ):
+        per_call = seconds / args.repeat * 1_000_000
+        print(f"{name:8s} {per_call:8.2f} µs/decode")
+
+
+if __name__ == "__main__":
+    main()
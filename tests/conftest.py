@@ -79,6 +79,7 @@ def parcel_factory() -> ParcelFactory:
         session_id: str = "test-session",
         user_id: str | None = None,
         delivery_cost_rub: Decimal | None = None,
+        pricing_version: str | None = None,
     ) -> Parcel:
         return Parcel(
             id=id_ or str(uuid4()),
@@ -89,6 +90,7 @@ def parcel_factory() -> ParcelFactory:
             session_id=session_id,
             user_id=user_id,
             delivery_cost_rub=delivery_cost_rub,
+            pricing_version=pricing_version,
         )
 
     return _factory
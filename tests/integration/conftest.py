@@ -167,8 +167,10 @@ async def _close_integration_clients() -> AsyncIterator[None]:
     yield
 
     from app.db.session import engine
+    from app.http_client import close_http_client
     from app.redis_client import close_redis
 
+    await close_http_client()
     await close_redis()
     await engine.dispose()
 
@@ -196,6 +198,9 @@ async def _flush_stores() -> None:
             __import__("sqlalchemy").text("DELETE FROM refresh_token")
         )
         await session.execute(__import__("sqlalchemy").text("DELETE FROM parcel"))
+        await session.execute(
+            __import__("sqlalchemy").text("DELETE FROM currency_rate")
+        )
         await session.execute(__import__("sqlalchemy").text("DELETE FROM user"))
         await session.commit()
 
@@ -1,5 +1,7 @@
 """Integration tests for authentication endpoints."""
 
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 
@@ -158,6 +160,29 @@ async def test_refresh_rejects_reused_token(isolated_client: AsyncClient) -> Non
     assert reuse_resp.status_code == 401
 
 
+async def test_concurrent_refreshes_rotate_token_once(
+    isolated_client: AsyncClient,
+) -> None:
+    """Only one of two concurrent refreshes with the same token should win."""
+    # Arrange
+    client = isolated_client
+    register_resp = await client.post(
+        "/auth/register",
+        json={"email": "race@example.com", "password": "securepass123"},
+    )
+    assert register_resp.status_code == 201
+    csrf = client.cookies["refresh_csrf"]
+
+    # Act
+    responses = await asyncio.gather(
+        client.post("/auth/refresh", headers={"X-CSRF-Token": csrf}),
+        client.post("/auth/refresh", headers={"X-CSRF-Token": csrf}),
+    )
+
+    # Assert
+    assert sorted(resp.status_code for resp in responses) == [200, 401]
+
+
 async def test_refresh_rejects_missing_csrf(isolated_client: AsyncClient) -> None:
     """Refresh should require the double-submit CSRF header."""
     # Arrange
@@ -0,0 +1,120 @@
+"""Integration tests for the persistent exchange-rate history."""
+
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.currency_rate import CurrencyRate
+from app.models.parcel import Parcel
+from app.redis_client import get_redis
+from app.services import rate_providers, rates
+from app.services.rate_providers import STUB_RATES, StubRateProvider
+from app.tasks.delivery import current_pricing, price_parcels
+
+ParcelFactory = Callable[..., Parcel]
+
+
+@pytest.fixture(autouse=True)
+def stub_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Price with the built-in stub table and no memo from earlier tests."""
+    monkeypatch.setattr(rate_providers, "_provider", StubRateProvider())
+    monkeypatch.setattr(rates, "_memo", None)
+
+
+async def test_rates_are_written_through_and_survive_a_redis_flush(
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """After a flush the table should come back from MySQL, not the provider."""
+    # Arrange
+    fetched = await rates.get_rate_table()
+    await get_redis().flushdb()
+    monkeypatch.setattr(rates, "_memo", None)
+    provider = MagicMock(fetch_rates=AsyncMock(side_effect=RuntimeError("down")))
+    monkeypatch.setattr(rate_providers, "_provider", provider)
+
+    # Act
+    reloaded = await rates.get_rate_table()
+
+    # Assert
+    stored = await db_session.scalar(select(func.count()).select_from(CurrencyRate))
+    assert stored == len(STUB_RATES)
+    assert reloaded == fetched
+    assert set(reloaded.ids) == set(STUB_RATES)
+    provider.fetch_rates.assert_not_called()
+
+
+async def test_a_weekend_is_served_with_rows_fetched_on_it(
+    db_session: AsyncSession,
+) -> None:
+    """An older table counts for a date only if a fetch on that date returned it."""
+    # Arrange
+    now = datetime.now(UTC)
+    today = now.date()
+    friday = today - timedelta(days=2)
+    thursday = today - timedelta(days=3)
+    db_session.add_all(
+        [
+            CurrencyRate(
+                rate_date=thursday,
+                pair="USD/RUB",
+                value=Decimal("88"),
+                source="stub",
+                fetched_at=now,
+            ),
+            CurrencyRate(
+                rate_date=friday,
+                pair="EUR/RUB",
+                value=Decimal("97"),
+                source="stub",
+                fetched_at=now - timedelta(days=1),
+            ),
+        ]
+    )
+    await db_session.commit()
+
+    # Act
+    served = await rates._load_table(today)
+    exact = await rates._load_table(today, exact=True)
+    yesterday = await rates._load_table(today - timedelta(days=1))
+
+    # Assert
+    assert served is not None
+    assert (served[0].day, served[0].rates["USD"]) == (thursday, Decimal("88"))
+    assert exact is None
+    assert yesterday is not None
+    assert yesterday[0].day == friday
+
+
+async def test_priced_parcels_reference_the_rate_row(
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+) -> None:
+    """A priced parcel should point at the USD/RUB row it was priced with."""
+    # Arrange
+    parcel = parcel_factory(parcel_type_id=parcel_type_id)
+    db_session.add(parcel)
+    await db_session.commit()
+    pricing = await current_pricing()
+
+    # Act
+    priced = await price_parcels(db_session, [parcel.id], pricing)
+
+    # Assert
+    row = await db_session.scalar(
+        select(CurrencyRate).where(
+            CurrencyRate.id
+            == select(Parcel.currency_rate_id)
+            .where(Parcel.id == parcel.id)
+            .scalar_subquery()
+        )
+    )
+    assert priced == 1
+    assert row is not None
+    assert (row.pair, row.value, row.source) == ("USD/RUB", pricing.rate, "stub")
@@ -0,0 +1,210 @@
+"""Integration tests comparing Python and set-based SQL delivery pricing."""
+
+from collections.abc import AsyncIterator, Callable
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.models.parcel import Parcel
+from app.tasks.delivery import (
+    _UNPRICED,
+    LOCK_KEY,
+    Pricing,
+    _formula,
+    _load_checkpoint,
+    _priced_with,
+    _reprice_pass,
+    _reprice_python,
+    _reprice_sql,
+    _save_checkpoint,
+    pricing_version_counts,
+)
+from app.tasks.lock import RedisLock
+
+ParcelFactory = Callable[..., Parcel]
+
+# Weights and values chosen so several costs land exactly on half a kopeck,
+# where half-up and half-even rounding disagree.
+CASES = [
+    (Decimal("0.010"), Decimal("0.00")),
+    (Decimal("0.030"), Decimal("0.00")),
+    (Decimal("0.001"), Decimal("0.50")),
+    (Decimal("2.000"), Decimal("100.00")),
+    (Decimal("1.234"), Decimal("999.99")),
+    (Decimal("9999999.999"), Decimal("9999999999.99")),
+    (Decimal("0.125"), Decimal("12.50")),
+]
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def lock() -> AsyncIterator[RedisLock]:
+    """Hold the delivery job lock for the duration of a test."""
+    redis_lock = RedisLock(LOCK_KEY, ttl_sec=60)
+    assert await redis_lock.acquire()
+    yield redis_lock
+    await redis_lock.release()
+
+
+async def _costs_by_name(session: AsyncSession) -> dict[str, Decimal | None]:
+    rows = await session.execute(select(Parcel.name, Parcel.delivery_cost_rub))
+    return dict(rows.tuples().all())
+
+
+async def test_sql_mode_matches_python_mode_and_formula(
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+    lock: RedisLock,
+) -> None:
+    """Both modes should store the half-up rounded Python formula result."""
+    # Arrange
+    rate = Decimal("1")
+    pricing = Pricing(rate, "v1")
+    db_session.add_all(
+        parcel_factory(
+            name=f"case-{index}",
+            weight_kg=weight,
+            declared_value_usd=value,
+            parcel_type_id=parcel_type_id,
+        )
+        for index, (weight, value) in enumerate(CASES)
+    )
+    await db_session.commit()
+    expected = {
+        f"case-{index}": _formula(weight, value, rate).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
+        for index, (weight, value) in enumerate(CASES)
+    }
+
+    # Act
+    python_updated = await _reprice_python(db_session, pricing, lock, batch=3)
+    python_costs = await _costs_by_name(db_session)
+    await db_session.execute(update(Parcel).values(delivery_cost_rub=None))
+    await db_session.commit()
+    sql_updated = await _reprice_sql(db_session, pricing, lock, batch=3)
+    sql_costs = await _costs_by_name(db_session)
+
+    # Assert
+    assert python_updated == sql_updated == len(CASES)
+    assert python_costs == expected
+    assert sql_costs == expected
+
+
+async def test_sql_mode_skips_priced_parcels(
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+    lock: RedisLock,
+) -> None:
+    """Already priced parcels should keep their cost."""
+    # Arrange
+    db_session.add_all(
+        [
+            parcel_factory(
+                name="priced",
+                delivery_cost_rub=Decimal("1.00"),
+                parcel_type_id=parcel_type_id,
+            ),
+            parcel_factory(name="pending", parcel_type_id=parcel_type_id),
+        ]
+    )
+    await db_session.commit()
+
+    # Act
+    updated = await _reprice_sql(db_session, Pricing(Decimal("90"), "v1"), lock)
+
+    # Assert
+    costs = await _costs_by_name(db_session)
+    assert updated == 1
+    assert costs["priced"] == Decimal("1.00")
+    assert costs["pending"] is not None
+
+
+async def test_repricing_touches_only_the_stale_version(
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+    lock: RedisLock,
+) -> None:
+    """Parcels of the stale version get the new price; others are untouched."""
+    # Arrange
+    db_session.add_all(
+        parcel_factory(
+            name=name,
+            weight_kg=Decimal("2.000"),
+            declared_value_usd=Decimal("100.00"),
+            delivery_cost_rub=Decimal("1.00"),
+            pricing_version=version,
+            parcel_type_id=parcel_type_id,
+        )
+        for name, version in (("old-1", "v1"), ("old-2", "v1"), ("current", "v2"))
+    )
+    await db_session.commit()
+
+    # Act
+    updated = await _reprice_python(
+        db_session,
+        Pricing(Decimal("90"), "v2"),
+        lock,
+        batch=1,
+        pending=_priced_with("v1"),
+    )
+    counts = await pricing_version_counts(db_session)
+
+    # Assert
+    costs = await _costs_by_name(db_session)
+    assert updated == 2
+    assert costs == {
+        "old-1": Decimal("180.00"),
+        "old-2": Decimal("180.00"),
+        "current": Decimal("1.00"),
+    }
+    assert counts == [("v2", 3)]
+
+
+async def test_resumed_pass_wraps_around_to_the_shard_start(
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+    lock: RedisLock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Parcels before the checkpoint are priced after the rest of the shard."""
+    # Arrange
+    monkeypatch.setattr(settings, "DELIVERY_SHARDS", 1)
+    ids = [f"{digit}0000000-0000-4000-8000-000000000000" for digit in "159"]
+    db_session.add_all(
+        parcel_factory(
+            id_=parcel_id,
+            name=parcel_id,
+            parcel_type_id=parcel_type_id,
+            # The checkpoint names the last parcel an earlier run committed.
+            delivery_cost_rub=Decimal("1.00") if parcel_id == ids[1] else None,
+        )
+        for parcel_id in ids
+    )
+    await db_session.commit()
+    await _save_checkpoint(0, "unpriced", ids[1])
+
+    # Act
+    updated = await _reprice_pass(
+        db_session,
+        0,
+        "unpriced",
+        Pricing(Decimal("90"), "v1"),
+        lock,
+        None,
+        _UNPRICED,
+        None,
+    )
+
+    # Assert
+    costs = await _costs_by_name(db_session)
+    assert updated == 2
+    assert None not in costs.values()
+    assert await _load_checkpoint(0, "unpriced") is None
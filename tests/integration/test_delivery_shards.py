@@ -0,0 +1,74 @@
+"""Integration test running the sharded delivery job in several processes."""
+
+import asyncio
+import os
+import sys
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.parcel import Parcel
+from app.redis_client import get_redis
+from app.services.rates import KEY_TMPL
+
+ParcelFactory = Callable[..., Parcel]
+
+PROCESSES = 3
+PARCELS = 300
+RUN_JOB = (
+    "import asyncio\n"
+    "from app.tasks.delivery import recalc_delivery_costs\n"
+    "print(asyncio.run(recalc_delivery_costs()))\n"
+)
+
+
+async def _run_replica() -> int:
+    """Run one job in a fresh interpreter and return its update count."""
+    env = {
+        **os.environ,
+        "DELIVERY_SHARDS": "12",
+        "DELIVERY_SHARD_CONCURRENCY": "2",
+        "DELIVERY_BATCH_SIZE": "10",
+        "DELIVERY_BATCH_MIN": "10",
+        "DELIVERY_BATCH_MAX": "10",
+    }
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        RUN_JOB,
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    assert proc.returncode == 0, stderr.decode()
+    # SQL echo also goes to stdout; the job result is the last line.
+    return int(stdout.decode().strip().splitlines()[-1])
+
+
+async def test_replicas_share_shards_without_double_pricing(
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+) -> None:
+    """Concurrent replicas should price every parcel exactly once between them."""
+    # Arrange
+    db_session.add_all(
+        parcel_factory(name=f"shard-{index}", parcel_type_id=parcel_type_id)
+        for index in range(PARCELS)
+    )
+    await db_session.commit()
+    today = datetime.now(UTC).date().isoformat()
+    await get_redis().hset(KEY_TMPL.format(date=today), "USD", "90")
+
+    # Act
+    counts = await asyncio.gather(*(_run_replica() for _ in range(PROCESSES)))
+
+    # Assert
+    unpriced = await db_session.scalar(
+        select(func.count()).where(Parcel.delivery_cost_rub.is_(None))
+    )
+    assert sum(counts) == PARCELS
+    assert unpriced == 0
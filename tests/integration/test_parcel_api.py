@@ -1,5 +1,6 @@
 """Integration tests for parcel endpoints."""
 
+import json
 from collections.abc import Callable
 from uuid import uuid4
 
@@ -82,6 +83,56 @@ async def test_create_parcel_invalid_type(
     assert "Unknown parcel type" in data["message"]
 
 
+async def test_create_parcels_bulk_reports_per_item_results(
+    client: AsyncClient,
+    auth_context: AuthContext,
+    parcel_type_id: str,
+    parcel_payload_factory: ParcelPayloadFactory,
+) -> None:
+    """Bulk creation should save valid items and report rejected ones."""
+    # Arrange
+    payload = [
+        parcel_payload_factory(parcel_type_id, name="first"),
+        parcel_payload_factory(parcel_type_id, weight_kg="-1"),
+        parcel_payload_factory(str(uuid4())),
+        parcel_payload_factory(parcel_type_id, name="second"),
+    ]
+    headers, user_id = auth_context
+
+    # Act
+    resp = await client.post("/parcels/bulk", json=payload, headers=headers)
+    listed = await client.get("/parcels", headers=headers)
+
+    # Assert
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["owner_id"] == user_id
+    assert (data["created"], data["failed"]) == (2, 2)
+    items = data["items"]
+    assert [item["index"] for item in items] == [0, 1, 2, 3]
+    assert items[0]["id"] is not None
+    assert items[1]["errors"][0]["loc"] == ["weightKg"]
+    assert items[2]["errors"][0]["type"] == "unknown_parcel_type"
+    assert items[3]["id"] is not None
+    listed_ids = {parcel["id"] for parcel in listed.json()["items"]}
+    assert {items[0]["id"], items[3]["id"]} <= listed_ids
+
+
+async def test_create_parcels_bulk_rejects_empty_list(
+    client: AsyncClient,
+    auth_context: AuthContext,
+) -> None:
+    """Bulk creation should require at least one item."""
+    # Arrange
+    headers, _user_id = auth_context
+
+    # Act
+    resp = await client.post("/parcels/bulk", json=[], headers=headers)
+
+    # Assert
+    assert resp.status_code == 422
+
+
 async def test_create_parcel_negative_weight(
     client: AsyncClient,
     auth_context: AuthContext,
@@ -176,6 +227,105 @@ async def test_list_parcels_rejects_invalid_pagination(
     assert resp.status_code == 422
 
 
+async def test_export_parcels_streams_ndjson_and_csv(
+    client: AsyncClient,
+    auth_context: AuthContext,
+    parcel_type_id: str,
+    parcel_payload_factory: ParcelPayloadFactory,
+) -> None:
+    """Export should return every owned parcel in both supported formats."""
+    # Arrange
+    headers, _user_id = auth_context
+    bulk_resp = await client.post(
+        "/parcels/bulk",
+        json=[
+            parcel_payload_factory(parcel_type_id, name=f"Export {index}")
+            for index in range(3)
+        ],
+        headers=headers,
+    )
+    created_ids = {item["id"] for item in bulk_resp.json()["items"]}
+
+    # Act
+    ndjson_resp = await client.get("/parcels/export", headers=headers)
+    csv_resp = await client.get("/parcels/export?format=csv", headers=headers)
+
+    # Assert
+    assert ndjson_resp.status_code == 200
+    assert ndjson_resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in ndjson_resp.text.splitlines()]
+    assert created_ids <= {record["id"] for record in records}
+    assert records[0]["parcelType"]["id"] == parcel_type_id
+    assert csv_resp.status_code == 200
+    assert csv_resp.headers["content-type"].startswith("text/csv")
+    csv_lines = csv_resp.text.splitlines()
+    assert csv_lines[0].startswith("id,name,weightKg")
+    assert len(csv_lines) == len(records) + 1
+
+
+async def test_import_parcels_streams_file_and_reports_progress(
+    client: AsyncClient,
+    auth_context: AuthContext,
+    parcel_type_id: str,
+    parcel_payload_factory: ParcelPayloadFactory,
+) -> None:
+    """A file import should create valid rows and report bad lines."""
+    # Arrange
+    headers, _user_id = auth_context
+    body = "\n".join(
+        [
+            json.dumps(parcel_payload_factory(parcel_type_id, name="Imported 1")),
+            "{broken",
+            json.dumps(parcel_payload_factory(parcel_type_id, weight_kg="-1")),
+            json.dumps(parcel_payload_factory(parcel_type_id, name="Imported 2")),
+        ]
+    )
+    create_resp = await client.post("/parcels/imports", headers=headers)
+    job_id = create_resp.json()["job_id"]
+
+    # Act
+    upload_resp = await client.put(
+        f"/parcels/imports/{job_id}",
+        content=body.encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    status_resp = await client.get(f"/parcels/imports/{job_id}", headers=headers)
+    retry_resp = await client.put(
+        f"/parcels/imports/{job_id}", content=b"", headers=headers
+    )
+
+    # Assert
+    assert create_resp.status_code == 201
+    assert upload_resp.status_code == 200
+    job = status_resp.json()
+    assert job["status"] == "completed"
+    assert job["progress"] == {"processed": 4, "created": 2, "failed": 2}
+    assert [error["line"] for error in job["errors"]] == [2, 3]
+    assert retry_resp.status_code == 400
+
+
+async def test_import_job_is_hidden_from_other_owners(
+    client: AsyncClient,
+    auth_context: AuthContext,
+) -> None:
+    """Import jobs should only be visible to the caller that created them."""
+    # Arrange
+    headers, _user_id = auth_context
+    create_resp = await client.post("/parcels/imports", headers=headers)
+    job_id = create_resp.json()["job_id"]
+    register_resp = await client.post(
+        "/auth/register",
+        json={"email": f"{uuid4()}@example.com", "password": "securepass123"},
+    )
+    other_headers = {"Authorization": f"Bearer {register_resp.json()['access_token']}"}
+
+    # Act
+    resp = await client.get(f"/parcels/imports/{job_id}", headers=other_headers)
+
+    # Assert
+    assert resp.status_code == 404
+
+
 async def test_get_parcel_by_id(
     client: AsyncClient,
     auth_context: AuthContext,
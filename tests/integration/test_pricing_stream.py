@@ -0,0 +1,52 @@
+"""Integration test for pricing new parcels through the Redis Stream."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.parcel import Parcel
+from app.redis_client import get_redis
+from app.services.pricing_events import GROUP, STREAM, publish_parcels_created
+from app.services.rates import KEY_TMPL
+from app.tasks.pricing_stream import consume_pricing_stream
+
+ParcelFactory = Callable[..., Parcel]
+
+
+async def test_new_parcel_is_priced_within_a_second(
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+) -> None:
+    """A published parcel should be priced and acknowledged almost at once."""
+    # Arrange
+    today = datetime.now(UTC).date().isoformat()
+    await get_redis().hset(KEY_TMPL.format(date=today), "USD", "90")
+    consumer = asyncio.create_task(consume_pricing_stream("test-consumer"))
+    parcel = parcel_factory(parcel_type_id=parcel_type_id)
+    db_session.add(parcel)
+    await db_session.commit()
+
+    # Act
+    started = time.monotonic()
+    await publish_parcels_created([parcel.id])
+    cost = None
+    while cost is None and time.monotonic() - started < 5:
+        await asyncio.sleep(0.05)
+        await db_session.commit()  # end the snapshot to see other writers
+        cost = await db_session.scalar(
+            select(Parcel.delivery_cost_rub).where(Parcel.id == parcel.id)
+        )
+    elapsed = time.monotonic() - started
+    await asyncio.sleep(0.2)  # the ack follows the commit
+    consumer.cancel()
+
+    # Assert
+    assert cost is not None
+    assert elapsed < 1.0
+    pending = await get_redis().xpending(STREAM, GROUP)
+    assert pending["pending"] == 0
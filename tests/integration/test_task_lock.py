@@ -0,0 +1,58 @@
+"""Integration tests for the owner-tokened Redis job lock."""
+
+import pytest
+
+from app.redis_client import get_redis
+from app.tasks.lock import LockLostError, RedisLock
+
+
+async def test_second_holder_is_refused_until_release() -> None:
+    """Only one handle may hold the lock; release frees it for the next."""
+    # Arrange
+    first = RedisLock("test_lock", ttl_sec=60)
+    second = RedisLock("test_lock", ttl_sec=60)
+
+    # Act
+    first_acquired = await first.acquire()
+    second_refused = not await second.acquire()
+    await first.release()
+    second_acquired = await second.acquire()
+
+    # Assert
+    assert first_acquired
+    assert second_refused
+    assert second_acquired
+    assert first.fence is None
+    assert second.fence == 2
+
+
+async def test_release_leaves_other_holders_lock() -> None:
+    """A stale holder must not delete a lock someone else now owns."""
+    # Arrange
+    stale = RedisLock("test_lock", ttl_sec=60)
+    await stale.acquire()
+    await get_redis().delete("test_lock")
+    current = RedisLock("test_lock", ttl_sec=60)
+    await current.acquire()
+
+    # Act
+    released = await stale.release()
+
+    # Assert
+    assert released is False
+    assert await get_redis().get("test_lock") == current.token
+
+
+async def test_replaced_holder_fails_fencing_check() -> None:
+    """After expiry and re-acquire, the old holder should stop writing."""
+    # Arrange
+    stale = RedisLock("test_lock", ttl_sec=60)
+    await stale.acquire()
+    await get_redis().delete("test_lock")
+    current = RedisLock("test_lock", ttl_sec=60)
+    await current.acquire()
+
+    # Act / Assert
+    with pytest.raises(LockLostError):
+        await stale.ensure_held()
+    await current.ensure_held()
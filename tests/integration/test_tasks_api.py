@@ -0,0 +1,108 @@
+"""Integration tests for queued manual delivery recalculation."""
+
+from collections.abc import Callable
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.parcel import Parcel
+from app.redis_client import get_redis
+from app.services.rates import KEY_TMPL
+from app.tasks.delivery import pricing_version
+from app.tasks.recalc_jobs import QUEUE_KEY, run_recalc_job
+
+ParcelFactory = Callable[..., Parcel]
+
+
+async def test_recalc_is_queued_then_reports_progress(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+) -> None:
+    """POST should return a job at once; GET should show the finished run."""
+    # Arrange
+    db_session.add_all(
+        parcel_factory(name=f"queued-{index}", parcel_type_id=parcel_type_id)
+        for index in range(3)
+    )
+    await db_session.commit()
+    today = datetime.now(UTC).date().isoformat()
+    await get_redis().hset(KEY_TMPL.format(date=today), "USD", "90")
+
+    # Act
+    queued = await client.post("/tasks/recalc-delivery", headers=admin_headers)
+    job_id = queued.json()["job_id"]
+    pending = await client.get(f"/tasks/{job_id}", headers=admin_headers)
+    popped = await get_redis().rpop(QUEUE_KEY)
+    assert popped == job_id
+    await run_recalc_job(job_id)
+    done = await client.get(f"/tasks/{job_id}", headers=admin_headers)
+
+    # Assert
+    assert queued.status_code == 202
+    assert queued.json()["status"] == "pending"
+    assert pending.json()["status"] == "pending"
+    body = done.json()
+    assert body["status"] == "completed"
+    assert body["parcels_done"] == 3
+    assert body["rate"] == "90"
+    assert body["progress"]["batches"] >= 1
+
+
+async def test_unknown_recalc_job_is_not_found(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+) -> None:
+    """Unknown job IDs should return 404."""
+    # Act
+    resp = await client.get("/tasks/missing", headers=admin_headers)
+
+    # Assert
+    assert resp.status_code == 404
+
+
+async def test_repricing_job_clears_stale_pricing_versions(
+    client: AsyncClient,
+    admin_headers: dict[str, str],
+    db_session: AsyncSession,
+    parcel_type_id: str,
+    parcel_factory: ParcelFactory,
+) -> None:
+    """A reprice_stale run should move every parcel to the current version."""
+    # Arrange
+    db_session.add_all(
+        parcel_factory(
+            name=f"stale-{index}",
+            delivery_cost_rub=Decimal("1.00"),
+            pricing_version=version,
+            parcel_type_id=parcel_type_id,
+        )
+        for index, version in enumerate(["2020-01-01:0.5:0.01", None, None])
+    )
+    await db_session.commit()
+    today = datetime.now(UTC).date()
+    await get_redis().hset(KEY_TMPL.format(date=today.isoformat()), "USD", "90")
+
+    # Act
+    before = await client.get("/tasks/pricing-versions", headers=admin_headers)
+    queued = await client.post(
+        "/tasks/recalc-delivery",
+        params={"reprice_stale": "true"},
+        headers=admin_headers,
+    )
+    await get_redis().rpop(QUEUE_KEY)
+    await run_recalc_job(queued.json()["job_id"])
+    after = await client.get("/tasks/pricing-versions", headers=admin_headers)
+
+    # Assert
+    assert before.json() == [
+        {"version": "2020-01-01:0.5:0.01", "parcels": 1, "current": False},
+        {"version": None, "parcels": 2, "current": False},
+    ]
+    assert after.json() == [
+        {"version": pricing_version(today), "parcels": 3, "current": True}
+    ]
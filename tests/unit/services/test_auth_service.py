@@ -21,11 +21,11 @@ async def test_register_creates_user_and_token(
     """Registration should persist a user and return an access token."""
     # Arrange
     mock_session.scalar.return_value = None
-    hash_password = MagicMock(return_value="hashed-password")
+    hash_password = AsyncMock(return_value="hashed-password")
     create_access_token = MagicMock(return_value="access-token")
     create_refresh_token = MagicMock(return_value=("refresh-token", "refresh-jti"))
     create_csrf_token = MagicMock(return_value="csrf-token")
-    monkeypatch.setattr(auth_module, "hash_password", hash_password)
+    monkeypatch.setattr(auth_module, "hash_password_async", hash_password)
     monkeypatch.setattr(auth_module, "create_access_token", create_access_token)
     monkeypatch.setattr(auth_module, "create_refresh_token", create_refresh_token)
     monkeypatch.setattr(auth_module, "create_csrf_token", create_csrf_token)
@@ -42,7 +42,7 @@ async def test_register_creates_user_and_token(
     assert result.access_token == "access-token"
     assert result.refresh_token == "refresh-token"
     assert result.csrf_token == "csrf-token"
-    hash_password.assert_called_once_with("secret-password")
+    hash_password.assert_awaited_once_with("secret-password")
     assert mock_session.add.call_count == 2
     assert mock_session.add.call_args_list[0].args == (user,)
     assert mock_session.commit.await_count == 2
@@ -83,11 +83,11 @@ async def test_login_returns_user_and_token(
     # Arrange
     user = User(email="user@example.com", hashed_password="hashed-password")
     mock_session.scalar.return_value = user
-    verify_password = MagicMock(return_value=True)
+    verify_password = AsyncMock(return_value=True)
     create_access_token = MagicMock(return_value="access-token")
     create_refresh_token = MagicMock(return_value=("refresh-token", "refresh-jti"))
     create_csrf_token = MagicMock(return_value="csrf-token")
-    monkeypatch.setattr(auth_module, "verify_password", verify_password)
+    monkeypatch.setattr(auth_module, "verify_password_async", verify_password)
     monkeypatch.setattr(auth_module, "create_access_token", create_access_token)
     monkeypatch.setattr(auth_module, "create_refresh_token", create_refresh_token)
     monkeypatch.setattr(auth_module, "create_csrf_token", create_csrf_token)
@@ -101,7 +101,7 @@ async def test_login_returns_user_and_token(
     assert result.access_token == "access-token"
     assert result.refresh_token == "refresh-token"
     assert result.csrf_token == "csrf-token"
-    verify_password.assert_called_once_with("secret-password", "hashed-password")
+    verify_password.assert_awaited_once_with("secret-password", "hashed-password")
     create_access_token.assert_called_once_with(
         subject=user.id,
         role="user",
@@ -126,8 +126,8 @@ async def test_login_rejects_invalid_credentials(
     """Login should reject missing users and wrong passwords."""
     # Arrange
     mock_session.scalar.return_value = user
-    verify_password = MagicMock(return_value=password_matches)
-    monkeypatch.setattr(auth_module, "verify_password", verify_password)
+    verify_password = AsyncMock(return_value=password_matches)
+    monkeypatch.setattr(auth_module, "verify_password_async", verify_password)
     service = AuthService(mock_session)
 
     # Act / Assert
@@ -135,9 +135,37 @@ async def test_login_rejects_invalid_credentials(
         await service.login("user@example.com", "secret-password")
 
     if user is None:
-        verify_password.assert_not_called()
+        verify_password.assert_not_awaited()
     else:
-        verify_password.assert_called_once_with("secret-password", "hashed-password")
+        verify_password.assert_awaited_once_with("secret-password", "hashed-password")
+
+
+def _refresh_token(
+    expires_in: timedelta = timedelta(days=1),
+    revoked_at: datetime | None = None,
+) -> RefreshToken:
+    now = datetime.now(UTC).replace(tzinfo=None)
+    return RefreshToken(
+        jti="old-jti",
+        user_id="user-123",
+        token_hash=hash_token("old-refresh"),
+        family_id="family-123",
+        expires_at=now + expires_in,
+        revoked_at=revoked_at,
+        created_at=now,
+    )
+
+
+def _lookup(token: RefreshToken, user: User | None) -> MagicMock:
+    """Return the result of the joined token/user read."""
+    result = MagicMock()
+    result.first.return_value.tuple.return_value = (token, user)
+    return result
+
+
+def _claim(rowcount: int) -> MagicMock:
+    """Return the result of the conditional claim UPDATE."""
+    return MagicMock(rowcount=rowcount)
 
 
 @pytest.mark.asyncio
@@ -145,18 +173,11 @@ async def test_refresh_rotates_valid_token(
     mock_session: AsyncMock,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    """Refresh should revoke the old token and persist a replacement."""
+    """Refresh should claim the old token and persist a replacement."""
     # Arrange
-    old = RefreshToken(
-        jti="old-jti",
-        user_id="user-123",
-        token_hash=hash_token("old-refresh"),
-        family_id="family-123",
-        expires_at=datetime.now(UTC).replace(tzinfo=None) + timedelta(days=1),
-        created_at=datetime.now(UTC).replace(tzinfo=None),
-    )
+    old = _refresh_token()
     user = User(id="user-123", email="user@example.com", hashed_password="hash")
-    mock_session.scalar.side_effect = [old, user]
+    mock_session.execute.side_effect = [_lookup(old, user), _claim(1)]
     create_refresh_token = MagicMock(return_value=("new-refresh", "new-jti"))
     create_csrf_token = MagicMock(return_value="new-csrf")
     create_access_token = MagicMock(return_value="new-access")
@@ -173,80 +194,94 @@ async def test_refresh_rotates_valid_token(
     assert result.access_token == "new-access"
     assert result.refresh_token == "new-refresh"
     assert result.csrf_token == "new-csrf"
-    assert old.revoked_at is not None
-    assert old.replaced_by_jti == "new-jti"
+    lookup, claim = (call.args[0] for call in mock_session.execute.await_args_list)
+    assert "LEFT OUTER JOIN" in str(lookup)
+    assert "refresh_token.revoked_at IS NULL" in str(claim)
+    assert claim.compile().params["replaced_by_jti"] == "new-jti"
+    mock_session.scalar.assert_not_awaited()
     mock_session.add.assert_called_once()
     mock_session.commit.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_refresh_lost_claim_revokes_family(mock_session: AsyncMock) -> None:
+    """A token rotated concurrently after the read should count as reuse."""
+    # Arrange
+    old = _refresh_token()
+    user = User(id="user-123", email="user@example.com", hashed_password="hash")
+    mock_session.execute.side_effect = [_lookup(old, user), _claim(0), MagicMock()]
+    service = AuthService(mock_session)
+
+    # Act / Assert
+    with pytest.raises(UnauthorizedError, match="Invalid refresh token"):
+        await service.refresh("old-refresh")
+
+    revoke = mock_session.execute.await_args_list[2].args[0]
+    assert "refresh_token.family_id" in str(revoke)
+    mock_session.add.assert_not_called()
+    mock_session.commit.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_refresh_reuse_revokes_family(mock_session: AsyncMock) -> None:
     """Refresh reuse should revoke the whole token family."""
     # Arrange
-    old = RefreshToken(
-        jti="old-jti",
-        user_id="user-123",
-        token_hash=hash_token("old-refresh"),
-        family_id="family-123",
-        expires_at=datetime.now(UTC).replace(tzinfo=None) + timedelta(days=1),
-        revoked_at=datetime.now(UTC).replace(tzinfo=None),
-        created_at=datetime.now(UTC).replace(tzinfo=None),
-    )
-    mock_session.scalar.return_value = old
+    old = _refresh_token(revoked_at=datetime.now(UTC).replace(tzinfo=None))
+    mock_session.execute.side_effect = [_lookup(old, None), MagicMock()]
     service = AuthService(mock_session)
 
     # Act / Assert
     with pytest.raises(UnauthorizedError, match="Invalid refresh token"):
         await service.refresh("old-refresh")
 
-    mock_session.execute.assert_awaited_once()
+    assert mock_session.execute.await_count == 2
     mock_session.commit.assert_awaited_once()
 
 
+@pytest.mark.parametrize(
+    ("expires_in", "user"),
+    [
+        (-timedelta(seconds=1), User(id="user-123", email="u@example.com")),
+        (timedelta(days=1), None),
+    ],
+    ids=["expired", "missing-user"],
+)
 @pytest.mark.asyncio
-async def test_refresh_rejects_expired_token(mock_session: AsyncMock) -> None:
-    """Refresh should revoke an expired token before rejecting it."""
+async def test_refresh_revokes_unusable_token(
+    mock_session: AsyncMock,
+    expires_in: timedelta,
+    user: User | None,
+) -> None:
+    """Refresh should revoke an expired or orphaned token before rejecting it."""
     # Arrange
-    old = RefreshToken(
-        jti="old-jti",
-        user_id="user-123",
-        token_hash=hash_token("old-refresh"),
-        family_id="family-123",
-        expires_at=datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=1),
-        created_at=datetime.now(UTC).replace(tzinfo=None),
-    )
-    mock_session.scalar.return_value = old
+    old = _refresh_token(expires_in=expires_in)
+    mock_session.execute.side_effect = [_lookup(old, user), _claim(1)]
     service = AuthService(mock_session)
 
     # Act / Assert
     with pytest.raises(UnauthorizedError, match="Invalid refresh token"):
         await service.refresh("old-refresh")
 
-    assert old.revoked_at is not None
+    claim = mock_session.execute.await_args_list[1].args[0]
+    assert "refresh_token.revoked_at IS NULL" in str(claim)
+    mock_session.add.assert_not_called()
     mock_session.commit.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_refresh_rejects_token_for_missing_user(mock_session: AsyncMock) -> None:
-    """Refresh should revoke a token whose owner no longer exists."""
+async def test_refresh_rejects_unknown_token(mock_session: AsyncMock) -> None:
+    """Refresh should reject a token that is not stored."""
     # Arrange
-    old = RefreshToken(
-        jti="old-jti",
-        user_id="user-123",
-        token_hash=hash_token("old-refresh"),
-        family_id="family-123",
-        expires_at=datetime.now(UTC).replace(tzinfo=None) + timedelta(days=1),
-        created_at=datetime.now(UTC).replace(tzinfo=None),
-    )
-    mock_session.scalar.side_effect = [old, None]
+    result = MagicMock()
+    result.first.return_value = None
+    mock_session.execute.return_value = result
     service = AuthService(mock_session)
 
     # Act / Assert
     with pytest.raises(UnauthorizedError, match="Invalid refresh token"):
         await service.refresh("old-refresh")
 
-    assert old.revoked_at is not None
-    mock_session.commit.assert_awaited_once()
+    mock_session.commit.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -74,6 +74,21 @@ async def test_commit_adds_commits_and_refreshes_instances(
     ]
 
 
+@pytest.mark.asyncio
+async def test_commit_can_skip_refresh(mock_session: AsyncMock) -> None:
+    """_commit should skip the reload when the caller opts out of refresh."""
+    # Arrange
+    row = ParcelType(id="type-1", name="clothes")
+    service = ParcelTypeCRUD(mock_session)
+
+    # Act
+    await service._commit(row, refresh=False)
+
+    # Assert
+    mock_session.commit.assert_awaited_once_with()
+    mock_session.refresh.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_create_commits_and_returns_instance(mock_session: AsyncMock) -> None:
     """Create should persist and return the same model instance."""
@@ -1,26 +1,66 @@
-"""Unit tests for the USD/RUB rate fetcher."""
+"""Unit tests for the exchange-rate service."""
 
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from redis.exceptions import RedisError
 
+from app.core.settings import settings
+from app.services import rates
+from app.services.rate_providers import RateTable
 from app.services.rates import (  # noqa
-    CBR_URL,
+    FETCH_LOCK_TMPL,
     KEY_TMPL,
-    _fetch_rate_from_cbr,
+    LAST_GOOD_KEY,
+    RateUnavailableError,
+    _fetch_single_flight,
+    _Memo,
+    get_rate,
+    get_usd_rub_quote,
     get_usd_rub_rate,
+    refresh_rate_ahead,
 )
 
+TODAY = datetime.now(UTC).date()
+
+
+@pytest.fixture(autouse=True)
+def _empty_memo(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every test without a table memoized by an earlier one."""
+    monkeypatch.setattr(rates, "_memo", None)
+
+
+def _redis_with_pipeline() -> AsyncMock:
+    """Return a Redis stand-in whose pipeline records queued commands."""
+    redis = AsyncMock()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    redis.pipeline = MagicMock(return_value=pipe)
+    return redis
+
+
+def _provider(table: RateTable | Exception) -> MagicMock:
+    """Return a rate provider stand-in answering with a table or an error."""
+    provider = MagicMock()
+    provider.name = "test"
+    if isinstance(table, Exception):
+        provider.fetch_rates = AsyncMock(side_effect=table)
+    else:
+        provider.fetch_rates = AsyncMock(return_value=table)
+    return provider
+
 
 @pytest.mark.asyncio
 @patch("app.services.rates.get_redis")
 async def test_get_usd_rub_rate_from_cache(mock_get_redis: MagicMock) -> None:
-    """USD/RUB rate should be returned from Redis cache when available."""
+    """USD/RUB rate should be read from the date's cached rate table."""
     # Arrange
     mock_redis = AsyncMock()
-    mock_redis.get.return_value = b"89.1234"
+    mock_redis.hgetall.return_value = {b"USD": b"89.1234", b"EUR": b"97.5"}
     mock_get_redis.return_value = mock_redis
 
     # Act
@@ -28,74 +68,462 @@ async def test_get_usd_rub_rate_from_cache(mock_get_redis: MagicMock) -> None:
 
     # Assert
     assert result == Decimal("89.1234")
-    mock_redis.get.assert_called_once()
+    mock_redis.hgetall.assert_awaited_once_with(KEY_TMPL.format(date=TODAY))
     mock_redis.set.assert_not_called()
 
 
 @pytest.mark.asyncio
+@patch("app.services.rates._write_through")
+@patch("app.services.rates._load_table", return_value=None)
+@patch("app.services.rates.get_rate_provider")
 @patch("app.services.rates.get_redis")
-@patch("app.services.rates._fetch_rate_from_cbr")
 async def test_get_usd_rub_rate_fetch_and_cache(
-    mock_fetch: MagicMock,
     mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,
+    mock_write_through: AsyncMock,
 ) -> None:
-    """USD/RUB rate should be fetched and cached when Redis misses."""
+    """The whole table should be fetched, stored, cached, and kept as last good."""
     # Arrange
-    mock_redis = AsyncMock()
-    mock_redis.get.return_value = None
+    mock_redis = _redis_with_pipeline()
+    mock_redis.hgetall.return_value = {}
+    mock_redis.set.return_value = True
     mock_get_redis.return_value = mock_redis
-
-    mock_fetch.return_value = Decimal("90.5678")
+    rates_by_code = {"USD": Decimal("90.5678"), "EUR": Decimal("98.1")}
+    fetched = RateTable.build(TODAY, rates_by_code)
+    mock_get_provider.return_value = _provider(fetched)
+    fetched_at = datetime.now(UTC)
+    mock_write_through.return_value = (
+        RateTable.build(TODAY, rates_by_code, {"USD": "rate-usd", "EUR": "rate-eur"}),
+        fetched_at,
+    )
 
     # Act
     result = await get_usd_rub_rate()
 
     # Assert
-    today = datetime.now(UTC).date().isoformat()
+    today = TODAY.isoformat()
     expected_key = KEY_TMPL.format(date=today)
+    table = {
+        "USD": "90.5678",
+        "EUR": "98.1",
+        "RUB": "1",
+        "id:USD": "rate-usd",
+        "id:EUR": "rate-eur",
+        "date": today,
+    }
 
     assert result == Decimal("90.5678")
-    mock_fetch.assert_called_once()
-    mock_redis.set.assert_called_once_with(expected_key, "90.5678", ex=600)
+    mock_redis.set.assert_awaited_once_with(
+        FETCH_LOCK_TMPL.format(date=today), "1", nx=True, ex=20
+    )
+    mock_load_table.assert_awaited_once_with(TODAY, exact=False)
+    mock_write_through.assert_awaited_once_with(fetched, "test")
+    pipe = mock_redis.pipeline.return_value
+    pipe.hset.assert_any_call(expected_key, mapping=table)
+    pipe.expire.assert_called_once_with(expected_key, 172800)
+    last_good = pipe.hset.call_args
+    assert last_good.args == (LAST_GOOD_KEY,)
+    assert last_good.kwargs["mapping"] == {
+        **table,
+        "fetched_at": fetched_at.isoformat(),
+    }
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.get")
-async def test_fetch_rate_from_cbr_success(mock_http_get: MagicMock) -> None:
-    """CBR response should be parsed into Decimal."""
+@patch("app.services.rates._load_table")
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_get_rate_table_reads_mysql_after_a_redis_flush(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,
+) -> None:
+    """A table stored in MySQL should refill Redis without a provider call."""
     # Arrange
+    mock_redis = _redis_with_pipeline()
+    mock_redis.hgetall.return_value = {}
+    mock_redis.set.return_value = True
+    mock_get_redis.return_value = mock_redis
+    stored = RateTable.build(TODAY, {"USD": Decimal("90")}, {"USD": "rate-usd"})
+    mock_load_table.return_value = (stored, datetime.now(UTC))
 
-    class MockResponse:
-        """Minimal httpx response double for a successful CBR call."""
+    # Act
+    table = await rates.get_rate_table()
 
-        def raise_for_status(self) -> None:
-            pass
+    # Assert
+    assert table == stored
+    assert table.ids["USD"] == "rate-usd"
+    mock_get_provider.assert_not_called()
+    pipe = mock_redis.pipeline.return_value
+    pipe.hset.assert_any_call(
+        KEY_TMPL.format(date=TODAY),
+        mapping={
+            "USD": "90",
+            "RUB": "1",
+            "id:USD": "rate-usd",
+            "date": TODAY.isoformat(),
+        },
+    )
 
-        def json(self) -> dict[str, dict[str, dict[str, float]]]:
-            return {"Valute": {"USD": {"Value": 92.3456}}}
 
-    mock_http_get.return_value = MockResponse()
+@pytest.mark.asyncio
+@patch("app.services.rates.get_redis")
+async def test_get_rate_answers_any_pair_from_one_table(
+    mock_get_redis: MagicMock,
+) -> None:
+    """Every pair should come from the memoized table without another read."""
+    # Arrange
+    mock_redis = AsyncMock()
+    mock_redis.hgetall.return_value = {"USD": "90", "EUR": "99", "JPY": "0.6"}
+    mock_get_redis.return_value = mock_redis
 
     # Act
-    result = await _fetch_rate_from_cbr()
+    usd_rub = await get_rate("USD")
+    eur_usd = await get_rate("EUR", "USD")
+    rub_jpy = await get_rate("RUB", "JPY")
 
     # Assert
-    assert result == Decimal("92.3456")
-    mock_http_get.assert_called_once_with(CBR_URL)
+    assert usd_rub == (Decimal("90"), TODAY)
+    assert eur_usd == (Decimal("1.1"), TODAY)
+    assert rub_jpy[0] == Decimal(1) / Decimal("0.6")
+    mock_redis.hgetall.assert_awaited_once()
+    with pytest.raises(KeyError):
+        await get_rate("XXX")
 
 
 @pytest.mark.asyncio
-@patch("httpx.AsyncClient.get")
-async def test_fetch_rate_from_cbr_http_error(mock_http_get: MagicMock) -> None:
-    """CBR HTTP errors should be propagated after retries fail."""
+@patch("app.services.rates.get_redis")
+async def test_get_usd_rub_rate_memoizes_per_utc_date(
+    mock_get_redis: MagicMock,
+) -> None:
+    """Repeat calls on one UTC day should not touch Redis; a new day should."""
     # Arrange
-    from httpx import HTTPStatusError, Request, Response
+    mock_redis = AsyncMock()
+    mock_redis.hgetall.side_effect = [{"USD": "89.1"}, {"USD": "91.2"}]
+    mock_get_redis.return_value = mock_redis
+
+    # Act
+    first = await get_usd_rub_rate()
+    repeat = await get_usd_rub_rate()
+    old_day = date(2000, 1, 1)
+    rates._memo = _Memo(old_day, RateTable.build(old_day, {"USD": Decimal("1")}))
+    next_day = await get_usd_rub_rate()
 
-    mock_response = Response(status_code=500, request=Request("GET", CBR_URL))
-    mock_http_get.side_effect = HTTPStatusError(
-        "Server Error", request=mock_response.request, response=mock_response
+    # Assert
+    assert (first, repeat, next_day) == (
+        Decimal("89.1"),
+        Decimal("89.1"),
+        Decimal("91.2"),
     )
+    assert mock_redis.hgetall.await_count == 2
+    assert rates._memo == _Memo(TODAY, RateTable.build(TODAY, {"USD": Decimal("91.2")}))
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates.RATE_STALENESS")
+@patch("app.services.rates._load_table", return_value=None)
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_get_usd_rub_quote_falls_back_to_last_known_good(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,  # noqa
+    mock_staleness: MagicMock,
+) -> None:
+    """A failed fetch should serve the last good table with its own date."""
+    # Arrange
+    yesterday = TODAY - timedelta(days=1)
+    fetched_at = datetime.now(UTC) - timedelta(hours=2)
+    provider = _provider(RuntimeError("down"))
+    mock_get_provider.return_value = provider
+    mock_redis = AsyncMock()
+    mock_redis.set.return_value = True
+    mock_redis.hgetall.side_effect = lambda key: (
+        {
+            "USD": "88.5",
+            "date": yesterday.isoformat(),
+            "fetched_at": fetched_at.isoformat(),
+        }
+        if key == LAST_GOOD_KEY
+        else {}
+    )
+    mock_get_redis.return_value = mock_redis
+
+    # Act
+    first = await get_usd_rub_quote()
+    repeat = await get_usd_rub_quote()
+
+    # Assert
+    assert first == repeat == (Decimal("88.5"), yesterday)
+    # The fallback is memoized briefly instead of hammering the upstream.
+    provider.fetch_rates.assert_awaited_once()
+    staleness = mock_staleness.set.call_args.args[0]
+    assert 7190 < staleness < 7300
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._load_latest_table")
+@patch("app.services.rates._load_table", return_value=None)
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_get_usd_rub_quote_falls_back_to_mysql_after_a_redis_flush(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,  # noqa
+    mock_load_latest: AsyncMock,
+) -> None:
+    """Without a last good hash, the latest table in MySQL should be served."""
+    # Arrange
+    yesterday = TODAY - timedelta(days=1)
+    mock_get_provider.return_value = _provider(RuntimeError("down"))
+    mock_redis = AsyncMock()
+    mock_redis.hgetall.return_value = {}
+    mock_redis.set.return_value = True
+    mock_get_redis.return_value = mock_redis
+    mock_load_latest.return_value = (
+        RateTable.build(yesterday, {"USD": Decimal("88")}),
+        datetime.now(UTC),
+    )
+
+    # Act
+    quote = await get_usd_rub_quote()
+
+    # Assert
+    assert quote == (Decimal("88"), yesterday)
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._load_table")
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_get_rate_table_reads_mysql_while_redis_is_down(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,
+) -> None:
+    """An unreachable Redis should not fail the lookup when MySQL has the date."""
+    # Arrange
+    stored = RateTable.build(TODAY, {"USD": Decimal("90")}, {"USD": "rate-usd"})
+    mock_load_table.return_value = (stored, datetime.now(UTC))
+    mock_redis = AsyncMock()
+    mock_redis.hgetall.side_effect = RedisError("down")
+    mock_get_redis.return_value = mock_redis
+
+    # Act
+    table = await rates.get_rate_table()
+
+    # Assert
+    assert table == stored
+    mock_load_table.assert_awaited_once_with(TODAY)
+    mock_get_provider.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._load_latest_table")
+@patch("app.services.rates._load_table", return_value=None)
+@patch("app.services.rates.get_redis")
+async def test_get_rate_table_falls_back_to_mysql_while_redis_is_down(
+    mock_get_redis: MagicMock,
+    mock_load_table: AsyncMock,  # noqa
+    mock_load_latest: AsyncMock,
+) -> None:
+    """Without the date in MySQL either, the latest stored table is served."""
+    # Arrange
+    yesterday = TODAY - timedelta(days=1)
+    mock_load_latest.return_value = (
+        RateTable.build(yesterday, {"USD": Decimal("88")}),
+        datetime.now(UTC),
+    )
+    mock_redis = AsyncMock()
+    mock_redis.hgetall.side_effect = RedisError("down")
+    mock_get_redis.return_value = mock_redis
+
+    # Act
+    table = await rates.get_rate_table()
+
+    # Assert
+    assert (table.day, table.rates["USD"]) == (yesterday, Decimal("88"))
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._load_latest_table", return_value=None)
+@patch("app.services.rates._load_table", return_value=None)
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_get_usd_rub_quote_raises_without_last_known_good(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,  # noqa
+    mock_load_latest: AsyncMock,  # noqa
+) -> None:
+    """With nothing to fall back on, the fetch error should surface."""
+    # Arrange
+    mock_get_provider.return_value = _provider(RuntimeError("down"))
+    mock_redis = AsyncMock()
+    mock_redis.hgetall.return_value = {}
+    mock_redis.set.return_value = True
+    mock_get_redis.return_value = mock_redis
 
     # Act / Assert
-    with pytest.raises(HTTPStatusError):
-        await _fetch_rate_from_cbr()
+    with pytest.raises(RuntimeError, match="down"):
+        await get_usd_rub_quote()
+    assert rates._memo is None
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._FETCH_WAIT_POLL_SEC", 0)
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_single_flight_waits_for_the_other_fetch(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A process that loses the marker should read the winner's table."""
+    # Arrange
+    mock_redis = AsyncMock()
+    mock_redis.set.return_value = None
+    mock_redis.hgetall.side_effect = [{}, {"USD": "90.1"}]
+    mock_get_redis.return_value = mock_redis
+
+    # Act
+    table = await _fetch_single_flight(TODAY)
+
+    # Assert
+    assert table.rate("USD") == Decimal("90.1")
+    mock_get_provider.assert_not_called()
+
+    # Arrange: the winner never delivers
+    monkeypatch.setattr(settings, "RATE_FETCH_LOCK_SEC", 0)
+
+    # Act / Assert
+    with pytest.raises(RateUnavailableError):
+        await _fetch_single_flight(TODAY)
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._fetch_single_flight")
+@patch("app.services.rates.get_redis")
+async def test_refresh_rate_ahead_fetches_tomorrow_once(
+    mock_get_redis: MagicMock,
+    mock_fetch: AsyncMock,
+) -> None:
+    """The refresh should fill tomorrow's table only when it is missing."""
+    # Arrange
+    mock_redis = AsyncMock()
+    mock_redis.exists.side_effect = [0, 1]
+    mock_get_redis.return_value = mock_redis
+    tomorrow = datetime.now(UTC).date() + timedelta(days=1)
+
+    # Act
+    await refresh_rate_ahead()
+    await refresh_rate_ahead()
+
+    # Assert
+    mock_fetch.assert_awaited_once_with(tomorrow, exact=True)
+    mock_redis.exists.assert_awaited_with(KEY_TMPL.format(date=tomorrow.isoformat()))
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._load_table")
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_fetch_single_flight_serves_a_weekend_from_mysql(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,
+) -> None:
+    """After a flush, a Sunday should reuse Friday's rows fetched on Sunday."""
+    # Arrange
+    sunday = date(2026, 10, 18)
+    friday = date(2026, 10, 16)
+    stored = RateTable.build(friday, {"USD": Decimal("89")}, {"USD": "rate-usd"})
+    mock_load_table.return_value = (stored, datetime(2026, 10, 18, 6, tzinfo=UTC))
+    mock_redis = _redis_with_pipeline()
+    mock_redis.set.return_value = True
+    mock_get_redis.return_value = mock_redis
+
+    # Act
+    table = await _fetch_single_flight(sunday)
+
+    # Assert
+    assert table == stored
+    mock_load_table.assert_awaited_once_with(sunday, exact=False)
+    mock_get_provider.assert_not_called()
+    pipe = mock_redis.pipeline.return_value
+    pipe.hset.assert_any_call(
+        KEY_TMPL.format(date=sunday.isoformat()),
+        mapping={
+            "USD": "89",
+            "RUB": "1",
+            "id:USD": "rate-usd",
+            "date": friday.isoformat(),
+        },
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._write_through")
+@patch("app.services.rates._load_table", return_value=None)
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_get_rate_table_keeps_the_provider_effective_date(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,  # noqa
+    mock_write_through: AsyncMock,
+) -> None:
+    """A table effective on another day is served today under its own date."""
+    # Arrange
+    yesterday = TODAY - timedelta(days=1)
+    fetched = RateTable.build(yesterday, {"USD": Decimal("89")})
+    mock_redis = _redis_with_pipeline()
+    mock_redis.hgetall.return_value = {}
+    mock_redis.set.return_value = True
+    mock_get_redis.return_value = mock_redis
+    mock_get_provider.return_value = _provider(fetched)
+    mock_write_through.return_value = (fetched, datetime.now(UTC))
+
+    # Act
+    quote = await get_usd_rub_quote()
+
+    # Assert
+    assert quote == (Decimal("89"), yesterday)
+    mock_write_through.assert_awaited_once_with(fetched, "test")
+    pipe = mock_redis.pipeline.return_value
+    pipe.hset.assert_any_call(
+        KEY_TMPL.format(date=TODAY),
+        mapping={"USD": "89", "RUB": "1", "date": yesterday.isoformat()},
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.services.rates._write_through")
+@patch("app.services.rates._load_table", return_value=None)
+@patch("app.services.rates.get_rate_provider")
+@patch("app.services.rates.get_redis")
+async def test_refresh_rate_ahead_skips_rates_not_effective_tomorrow(
+    mock_get_redis: MagicMock,
+    mock_get_provider: MagicMock,
+    mock_load_table: AsyncMock,
+    mock_write_through: AsyncMock,
+) -> None:
+    """Today's rates must not be stored or cached under tomorrow's date."""
+    # Arrange
+    mock_redis = _redis_with_pipeline()
+    mock_redis.exists.return_value = 0
+    mock_redis.set.return_value = True
+    mock_get_redis.return_value = mock_redis
+    mock_get_provider.return_value = _provider(
+        RateTable.build(TODAY, {"USD": Decimal("90")})
+    )
+
+    # Act
+    await refresh_rate_ahead()
+
+    # Assert
+    tomorrow = TODAY + timedelta(days=1)
+    mock_load_table.assert_awaited_once_with(tomorrow, exact=True)
+    mock_write_through.assert_not_awaited()
+    mock_redis.pipeline.assert_not_called()
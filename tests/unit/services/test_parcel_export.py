@@ -0,0 +1,102 @@
+"""Unit tests for incremental parcel export encoding."""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.parcel_type import ParcelType
+from app.schemas.parcel import ParcelFilterParams
+from app.services import parcel_export as export_module
+from app.services.parcel import ParcelRow
+from app.services.parcel_export import (
+    CSV_HEADER,
+    encode_csv,
+    encode_ndjson,
+    export_owned_parcels,
+)
+from app.services.parcel_type_registry import ParcelTypeRegistry
+
+REGISTRY = ParcelTypeRegistry.build(
+    [ParcelType(id="type-1", name="electronics")], version=1
+)
+ROWS: list[ParcelRow] = [
+    ("p-1", "Phone", Decimal("1.200"), Decimal("999.99"), Decimal("123.45"), "type-1"),
+    ("p-2", "Кабель, 2m", Decimal("0.100"), Decimal("5.00"), None, "type-1"),
+]
+
+
+def test_encode_ndjson_matches_parcel_read_shape() -> None:
+    """NDJSON lines should use the camelCase API shape with string decimals."""
+    # Act
+    chunk = encode_ndjson(ROWS, REGISTRY)
+
+    # Assert
+    lines = chunk.decode().splitlines()
+    assert len(lines) == 2
+    assert chunk.endswith(b"\n")
+    assert json.loads(lines[0]) == {
+        "id": "p-1",
+        "name": "Phone",
+        "weightKg": "1.200",
+        "declaredValueUsd": "999.99",
+        "deliveryCostRub": "123.45",
+        "parcelType": {"id": "type-1", "name": "electronics"},
+    }
+    assert json.loads(lines[1])["deliveryCostRub"] is None
+    assert "Кабель" in lines[1]
+
+
+def test_encode_csv_quotes_values_and_leaves_pending_cost_empty() -> None:
+    """CSV records should round-trip through a CSV reader under CSV_HEADER."""
+    # Act
+    chunk = encode_csv(ROWS, REGISTRY)
+
+    # Assert
+    records = list(csv.DictReader(io.StringIO(chunk.decode()), CSV_HEADER))
+    assert records[0]["deliveryCostRub"] == "123.45"
+    assert records[1]["name"] == "Кабель, 2m"
+    assert records[1]["deliveryCostRub"] == ""
+    assert records[1]["parcelTypeName"] == "electronics"
+
+
+@pytest.mark.asyncio
+async def test_export_owned_parcels_yields_header_then_one_chunk_per_batch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Export should stream a CSV header followed by one chunk per cursor batch."""
+
+    # Arrange
+    async def stream_owned(
+        _owner_id: str, _filters: ParcelFilterParams
+    ) -> AsyncIterator[list[ParcelRow]]:
+        yield ROWS[:1]
+        yield ROWS[1:]
+
+    service = MagicMock()
+    service.return_value.stream_owned = stream_owned
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = AsyncMock()
+    monkeypatch.setattr(export_module, "ParcelService", service)
+    monkeypatch.setattr(export_module, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(
+        export_module, "registry_covering", AsyncMock(return_value=REGISTRY)
+    )
+
+    # Act
+    chunks = [
+        chunk
+        async for chunk in export_owned_parcels(
+            "owner", ParcelFilterParams(type_id=None, has_cost=None), "csv"
+        )
+    ]
+
+    # Assert
+    assert len(chunks) == 3
+    assert chunks[0] == (",".join(CSV_HEADER) + "\n").encode()
+    assert chunks[1].startswith(b"p-1,")
+    assert chunks[2].startswith(b"p-2,")
@@ -0,0 +1,156 @@
+"""Unit tests for streaming parcel import."""
+
+import json
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.exceptions import BusinessError
+from app.core.settings import settings
+from app.schemas import ParcelBulkItemResult
+from app.services import parcel_import as import_module
+from app.services.parcel_import import ParcelImportService, iter_lines
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def update_job(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Stub job storage and let every job start."""
+    update = AsyncMock()
+    monkeypatch.setattr(import_module, "update_job", update)
+    monkeypatch.setattr(import_module, "start_job", AsyncMock(return_value=True))
+    return update
+
+
+@pytest.fixture
+def create_bulk(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Stub bulk creation: items named "bad" fail, everything else succeeds."""
+
+    async def _create_bulk(
+        payload: Sequence[dict[str, Any]], _owner_id: str
+    ) -> list[ParcelBulkItemResult]:
+        return [
+            ParcelBulkItemResult(index=index, errors=[{"msg": "invalid"}])
+            if item.get("name") == "bad"
+            else ParcelBulkItemResult(index=index, id=f"id-{index}")
+            for index, item in enumerate(payload)
+        ]
+
+    service = MagicMock()
+    service.return_value.create_bulk = AsyncMock(side_effect=_create_bulk)
+    monkeypatch.setattr(import_module, "ParcelService", service)
+    create_bulk_mock: AsyncMock = service.return_value.create_bulk
+    return create_bulk_mock
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_splits_across_chunk_boundaries() -> None:
+    """Lines split across chunks and CRLF endings should be reassembled."""
+    # Act
+    lines = [line async for line in iter_lines(_chunks(b"ab", b"c\r\nd", b"e\nf"), 10)]
+
+    # Assert
+    assert lines == [b"abc", b"de", b"f"]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_rejects_lines_over_the_limit() -> None:
+    """A line longer than the limit should stop the import."""
+    # Act / Assert
+    with pytest.raises(BusinessError, match="Line exceeds 10 bytes"):
+        _ = [line async for line in iter_lines(_chunks(b"x" * 6, b"y" * 6), 10)]
+
+
+@pytest.mark.asyncio
+async def test_run_imports_ndjson_in_batches_with_line_errors(
+    monkeypatch: pytest.MonkeyPatch,
+    update_job: AsyncMock,
+    create_bulk: AsyncMock,
+) -> None:
+    """Rows should be inserted per batch and errors reported by line number."""
+    # Arrange
+    monkeypatch.setattr(settings, "PARCEL_IMPORT_CHUNK_SIZE", 2)
+    body = b"\n".join(
+        [
+            json.dumps({"name": "a"}).encode(),
+            b"{not json",
+            json.dumps({"name": "bad"}).encode(),
+            json.dumps({"name": "b"}).encode(),
+        ]
+    )
+    svc = ParcelImportService(AsyncMock())
+
+    # Act
+    await svc.run("job-1", "owner", _chunks(body), "ndjson")
+
+    # Assert
+    assert create_bulk.await_count == 2
+    progress_calls = [
+        c.kwargs for c in update_job.await_args_list if "progress" in c.kwargs
+    ]
+    assert progress_calls[0]["progress"] == {"processed": 2, "created": 1, "failed": 1}
+    assert progress_calls[0]["errors"][0]["line"] == 2
+    assert progress_calls[1]["progress"] == {"processed": 2, "created": 1, "failed": 1}
+    assert progress_calls[1]["errors"] == [{"line": 3, "msg": "invalid"}]
+    assert update_job.await_args_list[-1].kwargs == {"status": "completed"}
+
+
+@pytest.mark.asyncio
+async def test_run_maps_csv_rows_by_header(
+    update_job: AsyncMock,
+    create_bulk: AsyncMock,
+) -> None:
+    """CSV rows should become dicts keyed by the header line."""
+    # Arrange
+    body = b'name,weightKg\r\n"Lamp, big",1.5\r\nshort\r\n'
+    svc = ParcelImportService(AsyncMock())
+
+    # Act
+    await svc.run("job-1", "owner", _chunks(body), "csv")
+
+    # Assert
+    [payload, _owner] = create_bulk.await_args_list[0].args
+    assert payload == [{"name": "Lamp, big", "weightKg": "1.5"}]
+    [progress] = [
+        c.kwargs for c in update_job.await_args_list if "progress" in c.kwargs
+    ]
+    assert progress["errors"][0]["line"] == 3
+    assert progress["errors"][0]["type"] == "parse_error"
+
+
+@pytest.mark.asyncio
+async def test_run_marks_job_failed_when_upload_breaks(
+    update_job: AsyncMock,
+    create_bulk: AsyncMock,
+) -> None:
+    """A fatal error should be recorded on the job and re-raised."""
+    # Arrange
+    svc = ParcelImportService(AsyncMock())
+    body = b"x" * (settings.PARCEL_IMPORT_MAX_LINE_BYTES + 1)
+
+    # Act / Assert
+    with pytest.raises(BusinessError):
+        await svc.run("job-1", "owner", _chunks(body), "ndjson")
+
+    assert update_job.await_args_list[-1].kwargs["status"] == "failed"
+    create_bulk.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_run_refuses_a_job_that_already_started(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A second upload into the same job should be rejected."""
+    # Arrange
+    monkeypatch.setattr(import_module, "start_job", AsyncMock(return_value=False))
+    svc = ParcelImportService(AsyncMock())
+
+    # Act / Assert
+    with pytest.raises(BusinessError, match="already started"):
+        await svc.run("job-1", "owner", _chunks(b""), "ndjson")
@@ -1,20 +1,26 @@
 """Unit tests for parcel service behavior."""
 
-from collections.abc import Callable, Sequence
+from collections.abc import AsyncIterator, Callable, Sequence
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
+from sqlalchemy.exc import IntegrityError
 
 from app.core.exceptions import BusinessError, NotFoundError, UnauthorizedError
 from app.core.settings import settings
 from app.models.parcel import Parcel
+from app.models.parcel_type import ParcelType
+from app.schemas import PaginatedResponse, ParcelRead
 from app.schemas.parcel import ParcelCreate, ParcelFilterParams
-from app.services.parcel import ParcelService
+from app.services import parcel as parcel_module
+from app.services.parcel import ParcelRow, ParcelService
+from app.services.parcel_type_registry import ParcelTypeRegistry
 
 ParcelCreateFactory = Callable[..., ParcelCreate]
 ParcelFactory = Callable[..., Parcel]
+RegistryFactory = Callable[..., ParcelTypeRegistry]
 
 
 @pytest.fixture(autouse=True)
@@ -23,17 +29,57 @@ def legacy_auth_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(settings, "AUTH_REQUIRED", False)
 
 
+@pytest.fixture(autouse=True)
+def publish_created(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Capture pricing stream publishes instead of talking to Redis."""
+    publish = AsyncMock()
+    monkeypatch.setattr(parcel_module, "publish_parcels_created", publish)
+    return publish
+
+
+@pytest.fixture
+def use_registry(monkeypatch: pytest.MonkeyPatch) -> RegistryFactory:
+    """Install an in-memory parcel-type registry holding the given type IDs."""
+
+    def _factory(*type_ids: str, version: int = 1) -> ParcelTypeRegistry:
+        registry = ParcelTypeRegistry.build(
+            [ParcelType(id=type_id, name=f"type-{type_id}") for type_id in type_ids],
+            version=version,
+        )
+        monkeypatch.setattr(
+            parcel_module,
+            "get_parcel_type_registry",
+            AsyncMock(return_value=registry),
+        )
+        return registry
+
+    return _factory
+
+
+def _as_row(parcel: Parcel) -> ParcelRow:
+    """Return the columns the list query selects for a parcel."""
+    return (
+        parcel.id,
+        parcel.name,
+        parcel.weight_kg,
+        parcel.declared_value_usd,
+        parcel.delivery_cost_rub,
+        parcel.parcel_type_id,
+    )
+
+
 def _set_list_result(
     mock_session: AsyncMock,
     total: int,
     parcels: Sequence[Parcel],
-) -> MagicMock:
-    """Configure mocked SQLAlchemy list query results."""
+) -> list[ParcelRow]:
+    """Configure mocked SQLAlchemy count and row queries for a parcel page."""
+    rows = [_as_row(parcel) for parcel in parcels]
     mock_session.scalar.return_value = total
-    mock_scalars_result = MagicMock()
-    mock_scalars_result.all.return_value = list(parcels)
-    mock_session.scalars.return_value = mock_scalars_result
-    return mock_scalars_result
+    mock_result = MagicMock()
+    mock_result.tuples.return_value.all.return_value = rows
+    mock_session.execute.return_value = mock_result
+    return rows
 
 
 @pytest.mark.asyncio
@@ -44,12 +90,12 @@ class TestParcelService:
         self,
         mock_session: AsyncMock,
         parcel_create_factory: ParcelCreateFactory,
+        publish_created: AsyncMock,
     ) -> None:
-        """Should create a parcel when input is valid and type exists."""
+        """Should create a parcel with one commit and no post-commit refresh."""
         # Arrange
         dto = parcel_create_factory()
         session_id = "test-session"
-        mock_session.scalar.return_value = dto.parcel_type_id
         svc = ParcelService(mock_session)
 
         # Act
@@ -61,7 +107,12 @@ class TestParcelService:
         assert parcel.session_id == session_id
         assert parcel.declared_value_usd == dto.declared_value_usd
         assert parcel.user_id is None
+        assert parcel.id
+        assert parcel.delivery_cost_rub is None
         mock_session.commit.assert_awaited_once()
+        mock_session.scalar.assert_not_awaited()
+        mock_session.refresh.assert_not_awaited()
+        publish_created.assert_awaited_once_with([parcel.id])
 
     async def test_create_valid_parcel_in_auth_required_mode(
         self,
@@ -76,7 +127,6 @@ class TestParcelService:
         monkeypatch.setattr(settings, "AUTH_REQUIRED", True)
         dto = parcel_create_factory()
         user_id = str(uuid4())
-        mock_session.scalar.return_value = dto.parcel_type_id
         svc = ParcelService(mock_session)
 
         # Act
@@ -90,17 +140,46 @@ class TestParcelService:
         self,
         mock_session: AsyncMock,
         parcel_create_factory: ParcelCreateFactory,
+        publish_created: AsyncMock,
     ) -> None:
-        """Should raise BusinessError if parcel type doesn't exist."""
+        """Should map the parcel-type foreign key violation to BusinessError."""
         # Arrange
         dto = parcel_create_factory()
-        mock_session.scalar.return_value = None
+        mock_session.commit.side_effect = IntegrityError(
+            "INSERT INTO parcel ...",
+            {},
+            Exception("foreign key constraint fails (`parcel_type_id`)"),
+        )
         svc = ParcelService(mock_session)
 
         # Act / Assert
         with pytest.raises(BusinessError, match="Unknown parcel type"):
             await svc.create_from_dto(dto, "session")
 
+        mock_session.rollback.assert_awaited_once_with()
+        publish_created.assert_not_awaited()
+
+    async def test_create_reraises_other_integrity_errors(
+        self,
+        mock_session: AsyncMock,
+        parcel_create_factory: ParcelCreateFactory,
+    ) -> None:
+        """Should not disguise unrelated constraint failures as unknown types."""
+        # Arrange
+        dto = parcel_create_factory()
+        mock_session.commit.side_effect = IntegrityError(
+            "INSERT INTO parcel ...",
+            {},
+            Exception("foreign key constraint fails (`user_id`)"),
+        )
+        svc = ParcelService(mock_session)
+
+        # Act / Assert
+        with pytest.raises(IntegrityError):
+            await svc.create_from_dto(dto, "session")
+
+        mock_session.rollback.assert_awaited_once_with()
+
     async def test_get_owned_found_and_authorized(
         self,
         mock_session: AsyncMock,
@@ -179,7 +258,7 @@ async def test_list_owned_no_filters(
         parcel_factory(name="Parcel 2", session_id="s1"),
         parcel_factory(name="Parcel 3", session_id="s1"),
     ]
-    _set_list_result(mock_session, total=3, parcels=parcels)
+    rows = _set_list_result(mock_session, total=3, parcels=parcels)
 
     # Act
     total, result = await svc.list_owned(
@@ -191,8 +270,8 @@ async def test_list_owned_no_filters(
 
     # Assert
     assert total == 3
-    assert result == parcels
-    assert all(p.session_id == "s1" for p in result)
+    assert result == rows
+    mock_session.scalars.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -224,8 +303,8 @@ async def test_list_owned_with_type_and_has_cost_filters(
 
     # Assert
     assert total == 1
-    assert result[0].parcel_type_id == parcel_type_id
-    assert result[0].delivery_cost_rub is not None
+    assert result[0][5] == parcel_type_id
+    assert result[0][4] is not None
 
 
 @pytest.mark.asyncio
@@ -249,7 +328,7 @@ async def test_list_owned_with_has_cost_false_filter(
 
     # Assert
     assert total == 1
-    assert result[0].delivery_cost_rub is None
+    assert result[0][4] is None
 
 
 @pytest.mark.asyncio
@@ -274,7 +353,7 @@ async def test_list_owned_with_type_filter_only(
 
     # Assert
     assert total == 1
-    assert result[0].parcel_type_id == parcel_type_id
+    assert result[0][5] == parcel_type_id
 
 
 @pytest.mark.asyncio
@@ -291,7 +370,7 @@ async def test_list_owned_uses_user_ownership_in_auth_required_mode(
     user_id = str(uuid4())
     svc = ParcelService(mock_session)
     parcels = [parcel_factory(session_id="", user_id=user_id)]
-    _set_list_result(mock_session, total=1, parcels=parcels)
+    rows = _set_list_result(mock_session, total=1, parcels=parcels)
 
     # Act
     total, result = await svc.list_owned(
@@ -303,8 +382,8 @@ async def test_list_owned_uses_user_ownership_in_auth_required_mode(
 
     # Assert
     assert total == 1
-    assert result[0].user_id == user_id
-    mock_session.scalars.assert_awaited_once()
+    assert result == rows
+    mock_session.execute.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -325,3 +404,204 @@ async def test_list_owned_returns_empty_result(mock_session: AsyncMock) -> None:
     # Assert
     assert total == 0
     assert result == []
+
+
+@pytest.mark.asyncio
+async def test_list_owned_json_matches_paginated_read_model(
+    mock_session: AsyncMock,
+    parcel_factory: ParcelFactory,
+    use_registry: RegistryFactory,
+) -> None:
+    """Core rows should encode to the same bytes as the response model."""
+    # Arrange
+    parcel_type_id = str(uuid4())
+    registry = use_registry(parcel_type_id)
+    parcels = [
+        parcel_factory(name="Посылка", parcel_type_id=parcel_type_id),
+        parcel_factory(
+            parcel_type_id=parcel_type_id, delivery_cost_rub=Decimal("150.50")
+        ),
+    ]
+    _set_list_result(mock_session, total=7, parcels=parcels)
+    expected = PaginatedResponse[ParcelRead](
+        items=[
+            ParcelRead(
+                id=parcel.id,
+                name=parcel.name,
+                weight_kg=parcel.weight_kg,
+                declared_value_usd=parcel.declared_value_usd,
+                delivery_cost_rub=parcel.delivery_cost_rub,
+                parcel_type=registry.by_id[parcel_type_id],
+            )
+            for parcel in parcels
+        ],
+        total=7,
+        limit=2,
+        offset=4,
+    )
+    svc = ParcelService(mock_session)
+
+    # Act
+    body = await svc.list_owned_json(
+        owner_id="s1",
+        filters=ParcelFilterParams(type_id=None, has_cost=None),
+        limit=2,
+        offset=4,
+    )
+
+    # Assert
+    assert body == expected.model_dump_json(by_alias=True).encode()
+
+
+@pytest.mark.asyncio
+async def test_to_read_models_embeds_registry_types(
+    mock_session: AsyncMock,
+    parcel_factory: ParcelFactory,
+    use_registry: RegistryFactory,
+) -> None:
+    """Read models should embed parcel types without querying the database."""
+    # Arrange
+    parcel_type_id = str(uuid4())
+    registry = use_registry(parcel_type_id)
+    parcel = parcel_factory(parcel_type_id=parcel_type_id)
+    svc = ParcelService(mock_session)
+
+    # Act
+    [result] = await svc.to_read_models([parcel])
+
+    # Assert
+    assert result.id == parcel.id
+    assert result.weight_kg == parcel.weight_kg
+    assert result.parcel_type is registry.by_id[parcel_type_id]
+    mock_session.scalar.assert_not_awaited()
+    mock_session.scalars.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_to_read_models_reloads_registry_on_unknown_type(
+    mock_session: AsyncMock,
+    monkeypatch: pytest.MonkeyPatch,
+    parcel_factory: ParcelFactory,
+    use_registry: RegistryFactory,
+) -> None:
+    """A type missing from a stale snapshot should trigger one registry reload."""
+    # Arrange
+    new_type_id = str(uuid4())
+    use_registry(str(uuid4()))
+    fresh = ParcelTypeRegistry.build(
+        [ParcelType(id=new_type_id, name="fragile")], version=2
+    )
+    reload = AsyncMock(return_value=fresh)
+    monkeypatch.setattr(parcel_module, "reload_parcel_type_registry_on_miss", reload)
+    svc = ParcelService(mock_session)
+
+    # Act
+    [result] = await svc.to_read_models([parcel_factory(parcel_type_id=new_type_id)])
+
+    # Assert
+    assert result.parcel_type.name == "fragile"
+    reload.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_create_bulk_inserts_valid_items_in_one_statement(
+    mock_session: AsyncMock,
+    monkeypatch: pytest.MonkeyPatch,
+    use_registry: RegistryFactory,
+    publish_created: AsyncMock,
+) -> None:
+    """Valid items share one INSERT and commit; bad items are reported."""
+    # Arrange
+    parcel_type_id = str(uuid4())
+    reload = AsyncMock(return_value=use_registry(parcel_type_id))
+    monkeypatch.setattr(parcel_module, "reload_parcel_type_registry_on_miss", reload)
+    valid = {
+        "name": "Book",
+        "weightKg": "1.000",
+        "declaredValueUsd": "10.00",
+        "parcelTypeId": parcel_type_id,
+    }
+    payload: list[object] = [
+        valid,
+        {**valid, "weightKg": "-1"},
+        {**valid, "parcelTypeId": str(uuid4())},
+        {**valid, "name": "Lamp"},
+    ]
+    svc = ParcelService(mock_session)
+
+    # Act
+    results = await svc.create_bulk(payload, "session")
+
+    # Assert
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert results[0].id is not None
+    assert results[3].id is not None
+    assert results[1].errors is not None
+    assert results[1].errors[0]["loc"] == ("weightKg",)
+    assert results[2].errors is not None
+    assert results[2].errors[0]["type"] == "unknown_parcel_type"
+    mock_session.execute.assert_awaited_once()
+    _stmt, rows = mock_session.execute.await_args.args
+    assert [row["id"] for row in rows] == [results[0].id, results[3].id]
+    assert rows[0]["session_id"] == "session"
+    assert rows[0]["user_id"] is None
+    mock_session.commit.assert_awaited_once_with()
+    reload.assert_awaited_once_with()
+    publish_created.assert_awaited_once_with([results[0].id, results[3].id])
+
+
+@pytest.mark.asyncio
+async def test_create_bulk_skips_insert_when_every_item_fails(
+    mock_session: AsyncMock,
+    use_registry: RegistryFactory,
+) -> None:
+    """A batch without valid items should not touch the database."""
+    # Arrange
+    use_registry(str(uuid4()))
+    svc = ParcelService(mock_session)
+
+    # Act
+    results = await svc.create_bulk([{}, {"name": "x"}], "session")
+
+    # Assert
+    assert all(result.id is None and result.errors for result in results)
+    mock_session.execute.assert_not_awaited()
+    mock_session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stream_owned_yields_cursor_partitions_as_tuples(
+    mock_session: AsyncMock,
+) -> None:
+    """Export rows should come from a streamed result, one partition at a time."""
+    # Arrange
+    row_1 = ("p-1", "Book", Decimal("1.000"), Decimal("10.00"), None, "type-1")
+    row_2 = ("p-2", "Lamp", Decimal("2.000"), Decimal("20.00"), None, "type-1")
+    first = MagicMock()
+    first._tuple.return_value = row_1
+    second = MagicMock()
+    second._tuple.return_value = row_2
+
+    async def partitions() -> AsyncIterator[list[MagicMock]]:
+        yield [first]
+        yield [second]
+
+    stream_result = MagicMock()
+    stream_result.partitions = partitions
+    mock_session.stream = AsyncMock(return_value=stream_result)
+    svc = ParcelService(mock_session)
+
+    # Act
+    batches = [
+        batch
+        async for batch in svc.stream_owned(
+            "s1", ParcelFilterParams(type_id=None, has_cost=None)
+        )
+    ]
+
+    # Assert
+    assert batches == [[row_1], [row_2]]
+    [stmt] = mock_session.stream.await_args.args
+    assert stmt.get_execution_options()["yield_per"] == (
+        settings.PARCEL_EXPORT_BATCH_SIZE
+    )
@@ -0,0 +1,241 @@
+"""Unit tests for the in-process parcel-type registry."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.models.parcel_type import ParcelType
+from app.services import parcel_type_registry as registry_module
+from app.services.parcel_type_registry import (
+    CHANNEL,
+    VERSION_KEY,
+    ParcelTypeRegistry,
+    get_parcel_type_registry,
+    publish_parcel_types_changed,
+    reload_parcel_type_registry_on_miss,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every test without a loaded registry snapshot."""
+    monkeypatch.setattr(registry_module, "_registry", None)
+    monkeypatch.setattr(registry_module, "_loaded_at", float("-inf"))
+
+
+@pytest.fixture
+def redis_mock(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Replace the Redis singleton used by the registry module."""
+    redis = AsyncMock()
+    monkeypatch.setattr(registry_module, "get_redis", lambda: redis)
+    return redis
+
+
+@pytest.fixture
+def list_all(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Stub DB access so reloads return two seeded parcel types."""
+    rows = [
+        ParcelType(id="type-1", name="clothes"),
+        ParcelType(id="type-2", name="electronics"),
+    ]
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = AsyncMock()
+    service = MagicMock()
+    service.return_value.list_all = AsyncMock(return_value=rows)
+    monkeypatch.setattr(registry_module, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(registry_module, "ParcelTypeService", service)
+    list_all_mock: AsyncMock = service.return_value.list_all
+    return list_all_mock
+
+
+def test_build_keeps_order_and_indexes_by_id() -> None:
+    """Snapshots should keep row order and expose O(1) ID lookups."""
+    # Arrange
+    rows = [
+        ParcelType(id="type-1", name="clothes"),
+        ParcelType(id="type-2", name="electronics"),
+    ]
+
+    # Act
+    registry = ParcelTypeRegistry.build(rows, version=3)
+
+    # Assert
+    assert [item.name for item in registry.items] == ["clothes", "electronics"]
+    assert "type-2" in registry
+    assert "missing" not in registry
+    assert registry.get("type-1") is registry.items[0]
+    assert registry.get("missing") is None
+    with pytest.raises(TypeError):
+        registry.by_id["type-3"] = registry.items[0]  # type: ignore[index]
+
+
+@pytest.mark.asyncio
+async def test_get_registry_loads_once(
+    redis_mock: AsyncMock,
+    list_all: AsyncMock,
+) -> None:
+    """The first call should load from MySQL and later calls reuse the snapshot."""
+    # Arrange
+    redis_mock.get.return_value = "5"
+
+    # Act
+    first = await get_parcel_type_registry()
+    second = await get_parcel_type_registry()
+
+    # Assert
+    assert first is second
+    assert first.version == 5
+    assert len(first.items) == 2
+    list_all.assert_awaited_once_with()
+    redis_mock.get.assert_awaited_once_with(VERSION_KEY)
+
+
+@pytest.mark.asyncio
+async def test_reload_loads_from_mysql_when_redis_is_down(
+    redis_mock: AsyncMock,
+    list_all: AsyncMock,
+) -> None:
+    """An unreachable Redis should leave the version unknown, not fail the load."""
+    # Arrange
+    redis_mock.get.side_effect = RedisConnectionError("down")
+
+    # Act
+    registry = await get_parcel_type_registry()
+
+    # Assert
+    assert registry.version == 0
+    assert len(registry.items) == 2
+    list_all.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_publish_bumps_version_and_notifies(redis_mock: AsyncMock) -> None:
+    """Publishing should increment the version and broadcast it."""
+    # Arrange
+    redis_mock.incr.return_value = 7
+
+    # Act
+    version = await publish_parcel_types_changed()
+
+    # Assert
+    assert version == 7
+    redis_mock.incr.assert_awaited_once_with(VERSION_KEY)
+    redis_mock.publish.assert_awaited_once_with(CHANNEL, "7")
+
+
+@pytest.mark.parametrize(
+    ("current_version", "published_version", "should_reload"),
+    [(2, 2, False), (2, 1, False), (2, 3, True)],
+)
+@pytest.mark.asyncio
+async def test_reload_if_stale_compares_versions(
+    monkeypatch: pytest.MonkeyPatch,
+    current_version: int,
+    published_version: int,
+    should_reload: bool,
+) -> None:
+    """Only a newer published version should replace the active snapshot."""
+    # Arrange
+    monkeypatch.setattr(
+        registry_module,
+        "_registry",
+        ParcelTypeRegistry.build([], version=current_version),
+    )
+    reload = AsyncMock()
+    monkeypatch.setattr(registry_module, "reload_parcel_type_registry", reload)
+
+    # Act
+    await registry_module._reload_if_stale(published_version)
+
+    # Assert
+    assert reload.await_count == int(should_reload)
+
+
+@pytest.mark.asyncio
+async def test_reload_if_stale_keeps_previous_snapshot_on_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A failed reload should be logged without breaking the listener."""
+    # Arrange
+    previous = ParcelTypeRegistry.build([], version=1)
+    monkeypatch.setattr(registry_module, "_registry", previous)
+    monkeypatch.setattr(
+        registry_module,
+        "reload_parcel_type_registry",
+        AsyncMock(side_effect=RuntimeError("db down")),
+    )
+
+    # Act
+    await registry_module._reload_if_stale(2)
+
+    # Assert
+    assert registry_module._registry is previous
+
+
+@pytest.mark.asyncio
+async def test_reload_on_miss_is_throttled_without_a_newer_version(
+    redis_mock: AsyncMock,
+    list_all: AsyncMock,
+) -> None:
+    """Repeated misses for unknown IDs should reload MySQL only once."""
+    # Arrange
+    redis_mock.get.return_value = "4"
+
+    # Act
+    first = await reload_parcel_type_registry_on_miss()
+    second = await reload_parcel_type_registry_on_miss()
+
+    # Assert
+    assert second is first
+    list_all.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reload_on_miss_follows_a_newer_published_version(
+    redis_mock: AsyncMock,
+    list_all: AsyncMock,
+) -> None:
+    """A version bumped since the last load should reload right away."""
+    # Arrange
+    redis_mock.get.return_value = "4"
+    first = await reload_parcel_type_registry_on_miss()
+    redis_mock.get.return_value = "5"
+
+    # Act
+    second = await reload_parcel_type_registry_on_miss()
+
+    # Assert
+    assert (first.version, second.version) == (4, 5)
+    assert list_all.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_listener_skips_malformed_messages(
+    monkeypatch: pytest.MonkeyPatch,
+    redis_mock: AsyncMock,
+) -> None:
+    """A message that is not a version number should not stop the listener."""
+
+    # Arrange
+    async def listen() -> AsyncIterator[dict[str, object]]:
+        yield {"type": "subscribe", "data": 1}
+        yield {"type": "message", "data": "not-a-version"}
+        yield {"type": "message", "data": "3"}
+        raise asyncio.CancelledError
+
+    pubsub = MagicMock(subscribe=AsyncMock(), aclose=AsyncMock(), listen=listen)
+    redis_mock.pubsub = MagicMock(return_value=pubsub)
+    redis_mock.get.return_value = "2"
+    reload_if_stale = AsyncMock()
+    monkeypatch.setattr(registry_module, "_reload_if_stale", reload_if_stale)
+
+    # Act
+    with pytest.raises(asyncio.CancelledError):
+        await registry_module.listen_for_parcel_type_changes()
+
+    # Assert
+    assert [c.args for c in reload_if_stale.await_args_list] == [(2,), (3,)]
+    pubsub.aclose.assert_awaited_once_with()
@@ -0,0 +1,72 @@
+"""Unit tests for parcel-created events on the pricing stream."""
+
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.settings import settings
+from app.services.pricing_events import STREAM, publish_parcels_created
+
+
+def _redis() -> tuple[MagicMock, MagicMock]:
+    """Return a Redis stand-in and the pipeline it hands out."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    redis = MagicMock()
+    redis.pipeline.return_value = pipe
+    return redis, pipe
+
+
+@pytest.mark.asyncio
+@patch("app.services.pricing_events.get_redis")
+async def test_publish_adds_one_trimmed_entry_per_id(
+    mock_get_redis: MagicMock,
+) -> None:
+    """Each ID should become one capped XADD, sent in a single round trip."""
+    # Arrange
+    redis, pipe = _redis()
+    mock_get_redis.return_value = redis
+
+    # Act
+    await publish_parcels_created(["p1", "p2"])
+
+    # Assert
+    maxlen = settings.PRICING_STREAM_MAXLEN
+    assert pipe.xadd.call_args_list == [
+        call(STREAM, {"id": "p1"}, maxlen=maxlen, approximate=True),
+        call(STREAM, {"id": "p2"}, maxlen=maxlen, approximate=True),
+    ]
+    pipe.execute.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+@patch("app.services.pricing_events.get_redis")
+async def test_publish_swallows_redis_errors(mock_get_redis: MagicMock) -> None:
+    """A Redis outage must not fail parcel creation; the sweep catches up."""
+    # Arrange
+    redis, pipe = _redis()
+    pipe.execute.side_effect = RedisConnectionError("down")
+    mock_get_redis.return_value = redis
+
+    # Act / Assert
+    await publish_parcels_created(["p1"])
+
+
+@pytest.mark.asyncio
+@patch("app.services.pricing_events.get_redis")
+async def test_publish_is_noop_when_disabled(
+    mock_get_redis: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Disabling the stream should leave Redis untouched."""
+    # Arrange
+    monkeypatch.setattr(settings, "PRICING_STREAM_ENABLED", False)
+
+    # Act
+    await publish_parcels_created(["p1"])
+
+    # Assert
+    mock_get_redis.assert_not_called()
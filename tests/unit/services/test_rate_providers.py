@@ -0,0 +1,145 @@
+"""Unit tests for the exchange-rate providers."""
+
+import json
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import HTTPStatusError, Request, Response
+
+from app.core.settings import settings
+from app.services import rate_providers
+from app.services.rate_providers import (
+    STUB_RATES,
+    CbrRateProvider,
+    RateTable,
+    StubRateProvider,
+    get_rate_provider,
+)
+
+CBR_URL = "https://cbr.test/daily_json.js"
+
+
+def _response(url: str, payload: object, status_code: int = 200) -> Response:
+    """Build an httpx response with a JSON body for ``url``."""
+    return Response(status_code, json=payload, request=Request("GET", url))
+
+
+@pytest.mark.asyncio
+@patch("app.services.rate_providers.get_http_client")
+async def test_cbr_provider_returns_every_currency_per_unit(
+    mock_get_http_client: MagicMock,
+) -> None:
+    """CBR values quoted per 10 or 100 units should be divided down to one."""
+    # Arrange
+    payload = {
+        "Date": "2026-01-10T11:30:00+03:00",
+        "Valute": {
+            "USD": {"Nominal": 1, "Value": 92.3456},
+            "JPY": {"Nominal": 100, "Value": 61.5},
+        },
+    }
+    mock_http_get = AsyncMock(return_value=_response(CBR_URL, payload))
+    mock_get_http_client.return_value.get = mock_http_get
+
+    # Act
+    result = await CbrRateProvider(CBR_URL).fetch_rates()
+
+    # Assert
+    assert result == RateTable.build(
+        date(2026, 1, 10), {"USD": Decimal("92.3456"), "JPY": Decimal("0.615")}
+    )
+    mock_http_get.assert_awaited_once_with(CBR_URL)
+
+
+@pytest.mark.asyncio
+@patch("app.services.rate_providers.get_http_client")
+async def test_cbr_provider_raises_after_retries(
+    mock_get_http_client: MagicMock,
+) -> None:
+    """CBR HTTP errors should be propagated after retries fail."""
+    # Arrange
+    mock_http_get = AsyncMock(return_value=_response(CBR_URL, {}, status_code=500))
+    mock_get_http_client.return_value.get = mock_http_get
+
+    # Act / Assert
+    with pytest.raises(HTTPStatusError):
+        await CbrRateProvider(CBR_URL).fetch_rates()
+    assert mock_http_get.await_count == 3
+    # Every attempt reuses the one shared client.
+    assert mock_get_http_client.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_stub_provider_reads_a_file_or_falls_back_to_builtin(
+    tmp_path: Path,
+) -> None:
+    """The stub should read a flat JSON file, or the built-in table."""
+    # Arrange
+    source = tmp_path / "rates.json"
+    source.write_text(json.dumps({"USD": 80, "EUR": "85.5"}))
+
+    # Act
+    from_file = await StubRateProvider(str(source)).fetch_rates()
+    builtin = await StubRateProvider().fetch_rates()
+
+    # Assert
+    assert from_file.rates == {
+        "USD": Decimal("80"),
+        "EUR": Decimal("85.5"),
+        "RUB": Decimal(1),
+    }
+    assert from_file.day == datetime.now(UTC).date()
+    assert builtin.rates == {
+        **{code: Decimal(value) for code, value in STUB_RATES.items()},
+        "RUB": Decimal(1),
+    }
+
+
+@pytest.mark.asyncio
+@patch("app.services.rate_providers.get_http_client")
+async def test_stub_provider_reads_a_url(mock_get_http_client: MagicMock) -> None:
+    """An HTTP source should be fetched through the shared client."""
+    # Arrange
+    url = "http://stub.test/rates.json"
+    mock_get_http_client.return_value.get = AsyncMock(
+        return_value=_response(url, {"USD": 70.25})
+    )
+
+    # Act
+    result = await StubRateProvider(url).fetch_rates()
+
+    # Assert
+    assert result.rate("USD") == Decimal("70.25")
+
+
+def test_rate_table_crosses_pairs_through_the_rouble() -> None:
+    """Any pair should be derived from the two rouble prices."""
+    # Arrange
+    table = RateTable.build(date(2026, 1, 1), {"usd": Decimal(90), "EUR": Decimal(99)})
+
+    # Act / Assert
+    assert "USD" in table
+    assert table.rate("USD") == Decimal(90)
+    assert table.rate("EUR", "USD") == Decimal("1.1")
+    assert table.rate("RUB", "RUB") == Decimal(1)
+    with pytest.raises(KeyError):
+        table.rate("GBP")
+
+
+def test_get_rate_provider_follows_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The provider should be built once, from RATE_PROVIDER."""
+    # Arrange
+    monkeypatch.setattr(rate_providers, "_provider", None)
+    monkeypatch.setattr(settings, "RATE_PROVIDER", "stub")
+    monkeypatch.setattr(settings, "RATE_STUB_SOURCE", "rates.json")
+
+    # Act
+    provider = get_rate_provider()
+
+    # Assert
+    assert isinstance(provider, StubRateProvider)
+    assert provider.source == "rates.json"
+    assert get_rate_provider() is provider
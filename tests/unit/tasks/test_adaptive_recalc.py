@@ -0,0 +1,133 @@
+"""Unit tests for the backlog-driven delivery scheduler."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.settings import settings
+from app.tasks.adaptive_recalc import _decide, _poll, _run_once, _wait
+
+
+@pytest.fixture(autouse=True)
+def _schedule_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Pin the polling bounds and burst threshold the cases are written for."""
+    monkeypatch.setattr(settings, "DELIVERY_POLL_MIN_SEC", 5.0)
+    monkeypatch.setattr(settings, "DELIVERY_POLL_MAX_SEC", 300.0)
+    monkeypatch.setattr(settings, "DELIVERY_BURST_BACKLOG", 1000)
+    monkeypatch.setattr(settings, "DELIVERY_BURST_RUNS", 3)
+
+
+@pytest.mark.parametrize(
+    ("backlog", "in_flight", "delay", "expected"),
+    [
+        (0, 0, 5.0, ("idle", 0, 10.0)),
+        (0, 0, 200.0, ("idle", 0, 300.0)),
+        (10, 0, 300.0, ("run", 1, 5.0)),
+        (10, 1, 5.0, ("busy", 0, 5.0)),
+        (1000, 1, 5.0, ("burst", 2, 5.0)),
+        (1000, 3, 5.0, ("busy", 0, 5.0)),
+    ],
+)
+def test_decide_backs_off_when_idle_and_bursts_on_backlog(
+    backlog: int,
+    in_flight: int,
+    delay: float,
+    expected: tuple[str, int, float],
+) -> None:
+    """Idle polls double the wait; any backlog resets it and starts runs."""
+    # Act
+    decision = _decide(backlog, in_flight, delay)
+
+    # Assert
+    assert decision == expected
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.adaptive_recalc.DELIVERY_SCHEDULER_DECISIONS")
+@patch("app.tasks.adaptive_recalc.recalc_delivery_costs")
+@patch("app.tasks.adaptive_recalc.estimate_backlog", return_value=1000)
+async def test_poll_starts_burst_runs_and_records_the_decision(
+    mock_estimate: AsyncMock,
+    mock_recalc: AsyncMock,
+    mock_decisions: MagicMock,
+) -> None:
+    """A burst should start runs up to the limit and count the decision."""
+    # Arrange
+    running: set[asyncio.Task[int]] = set()
+
+    # Act
+    delay = await _poll(running, 40.0)
+    await asyncio.gather(*running)
+
+    # Assert
+    assert delay == 5.0
+    mock_estimate.assert_awaited_once_with(1000)
+    assert mock_recalc.await_count == 3
+    mock_decisions.labels.assert_called_once_with(decision="burst")
+    assert not running
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.adaptive_recalc.DELIVERY_SCHEDULER_DECISIONS")
+@patch("app.tasks.adaptive_recalc.recalc_delivery_costs")
+@patch(
+    "app.tasks.adaptive_recalc.estimate_backlog",
+    side_effect=OperationalError("SELECT", {}, Exception("down")),
+)
+async def test_poll_backs_off_when_the_count_fails(
+    mock_estimate: AsyncMock,  # noqa
+    mock_recalc: AsyncMock,
+    mock_decisions: MagicMock,
+) -> None:
+    """A failed count should start nothing and wait longer."""
+    # Act
+    delay = await _poll(set(), 5.0)
+
+    # Assert
+    assert delay == 10.0
+    mock_recalc.assert_not_called()
+    mock_decisions.labels.assert_called_once_with(decision="error")
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.tasks.adaptive_recalc.recalc_delivery_costs",
+    side_effect=RuntimeError("lease lost"),
+)
+async def test_run_once_keeps_the_loop_alive_on_failure(
+    mock_recalc: AsyncMock,
+) -> None:
+    """A failed run is logged, not raised into the scheduling loop."""
+    # Act
+    updated = await _run_once()
+
+    # Assert
+    assert updated == 0
+    mock_recalc.assert_awaited_once_with()
+
+
+async def _priced(rows: int) -> int:
+    return rows
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("rows", "returns_early"), [(10, True), (0, False)])
+async def test_wait_is_cut_short_only_by_a_run_that_made_progress(
+    rows: int,
+    returns_early: bool,
+) -> None:
+    """A run that priced nothing must not trigger the next poll at once."""
+    # Arrange
+    loop = asyncio.get_running_loop()
+    running = {asyncio.create_task(_priced(rows))}
+    delay = 0.2
+
+    # Act
+    started = loop.time()
+    await _wait(running, delay)
+    elapsed = loop.time() - started
+
+    # Assert
+    assert (elapsed < delay) is returns_early
@@ -1,78 +1,167 @@
 """Unit tests for delivery recalculation tasks."""
 
+from datetime import UTC, date, datetime
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.settings import settings
+from app.models.parcel import Parcel
+from app.services.rate_providers import RateTable
+from app.tasks import delivery
 from app.tasks.delivery import (  # noqa
-    _acquire_lock,
-    _fetch_unpriced,
+    _SET_COST,
+    _UNPRICED,
+    Pricing,
+    _cost_expression,
+    _fetch_pending,
+    _load_checkpoint,
+    _next_batch_size,
+    _observe_backlog,
+    _out_of_time,
+    _priced_with,
+    _reprice_pass,
+    _reprice_python,
+    _reprice_shard,
+    _reprice_sql,
+    _save_checkpoint,
+    _shard_bounds,
+    current_pricing,
+    estimate_backlog,
+    price_parcels,
+    pricing_version,
+    pricing_version_counts,
     recalc_delivery_costs,
+    request_recalc_stop,
+    wait_recalc_idle,
 )
+from app.tasks.lock import LockLostError
 
+PRICING = Pricing(Decimal("90.0"), "2026-01-01:0.5:0.01")
+TODAY = datetime.now(UTC).date()
+TABLE = RateTable.build(TODAY, {"USD": Decimal("90.0")}, {"USD": "rate-1"})
 
-@pytest.mark.asyncio
-@patch("app.tasks.delivery.get_redis")
-async def test_acquire_lock_success(mock_get_redis: MagicMock) -> None:
-    """Should acquire a Redis lock successfully if key does not exist."""
-    # Arrange
-    redis_mock = AsyncMock()
-    redis_mock.set.return_value = True
-    mock_get_redis.return_value = redis_mock
 
-    # Act
-    acquired = await _acquire_lock()
+@pytest.fixture(autouse=True)
+def _single_shard(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run the job over one shard unless a test asks for more."""
+    monkeypatch.setattr(settings, "DELIVERY_SHARDS", 1)
+
+
+@pytest.fixture(autouse=True)
+def no_backlog_read(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Keep the per-run backlog gauges off the mocked sessions."""
+    observe = AsyncMock()
+    monkeypatch.setattr("app.tasks.delivery._observe_backlog", observe)
+    return observe
+
+
+@pytest.fixture(autouse=True)
+def checkpoints(monkeypatch: pytest.MonkeyPatch) -> dict[str, AsyncMock]:
+    """Keep shard checkpoints out of Redis; no pass starts from one."""
+    mocks = {
+        "load": AsyncMock(return_value=None),
+        "save": AsyncMock(),
+        "clear": AsyncMock(),
+    }
+    for name, mock in mocks.items():
+        monkeypatch.setattr(f"app.tasks.delivery._{name}_checkpoint", mock)
+    return mocks
 
-    # Assert
-    assert acquired is True
-    redis_mock.set.assert_called_once_with("delivery_job_lock", "1", ex=330, nx=True)
+
+def _lock() -> MagicMock:
+    """Return a RedisLock stand-in that is held and passes fence checks."""
+    lock = MagicMock(fence=1)
+    lock.ensure_held = AsyncMock()
+    return lock
+
+
+def _lock_class(acquired: bool) -> MagicMock:
+    """Return a RedisLock class stand-in whose ``held()`` yields ``acquired``."""
+    lock = _lock()
+    lock.held.return_value.__aenter__.return_value = acquired
+    return MagicMock(return_value=lock)
 
 
 @pytest.mark.asyncio
-async def test_fetch_unpriced() -> None:
-    """Should return unpriced parcels fetched via SELECT with .is_(None)."""
+async def test_fetch_pending() -> None:
+    """Should seek past the last ID and select only the pricing columns."""
     # Arrange
     mock_session = AsyncMock(spec=AsyncSession)
-    mock_scalars_result = MagicMock()
-    mock_scalars_result.all.return_value = ["parcel1", "parcel2"]
-    mock_session.scalars.return_value = mock_scalars_result
+    rows = [("p2", 1000, 1000, None)]
+    mock_result = MagicMock()
+    mock_result.tuples.return_value.all.return_value = rows
+    mock_session.execute.return_value = mock_result
 
     # Act
-    result = await _fetch_unpriced(mock_session)
+    result = await _fetch_pending(mock_session, after="p1", batch=50, before="p9")
 
     # Assert
-    assert len(result) == 2
-    mock_session.scalars.assert_called_once()
-    mock_scalars_result.all.assert_called_once()
+    assert result == rows
+    sql = str(
+        mock_session.execute.await_args_list[0]
+        .args[0]
+        .compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+    assert sql.startswith(
+        "SELECT parcel.id, CAST(parcel.weight_kg * 1000 AS SIGNED INTEGER)"
+        " AS anon_1, CAST(parcel.declared_value_usd * 100 AS SIGNED INTEGER)"
+        " AS anon_2, parcel.pricing_version \nFROM parcel"
+    )
+    assert "parcel.id > 'p1'" in sql
+    assert "parcel.id < 'p9'" in sql
+    assert sql.endswith("ORDER BY parcel.id \n LIMIT 50")
+
+
+@pytest.mark.parametrize(
+    ("size", "elapsed", "expected"),
+    [
+        (500, 0.25, 1000),  # twice as fast as the target: double
+        (500, 0.05, 1000),  # far faster: still only double
+        (500, 1.0, 250),  # twice as slow: halve
+        (500, 0.5, 500),  # on target: keep
+        (4000, 0.1, 5000),  # capped at DELIVERY_BATCH_MAX
+        (150, 2.0, 100),  # floored at DELIVERY_BATCH_MIN
+        (500, 0.0, 1000),  # too fast to measure: grow
+    ],
+)
+def test_next_batch_size_tracks_target_duration(
+    size: int, elapsed: float, expected: int
+) -> None:
+    """Batch size should scale toward the target duration within bounds."""
+    # Act / Assert
+    assert _next_batch_size(size, elapsed) == expected
 
 
 @pytest.mark.asyncio
 @patch("app.tasks.delivery.DELIVERY_RECALC_PARCELS")
 @patch("app.tasks.delivery.DELIVERY_RECALC_DURATION")
-@patch("app.tasks.delivery._acquire_lock", return_value=True)
-@patch("app.tasks.delivery.get_usd_rub_rate", return_value=Decimal("90.0"))
-@patch("app.tasks.delivery._fetch_unpriced")
+@patch("app.tasks.delivery.RedisLock", new_callable=lambda: _lock_class(True))
+@patch("app.tasks.delivery.get_rate_table", return_value=TABLE)
+@patch("app.tasks.delivery._fetch_pending")
 @patch("app.tasks.delivery.AsyncSessionLocal")
 @patch("app.tasks.delivery.get_redis")
 async def test_recalc_delivery_costs_updates(
     mock_get_redis: MagicMock,
     mock_session_local: MagicMock,
-    mock_fetch_unpriced: MagicMock,
+    mock_fetch_pending: MagicMock,
     mock_get_rate: MagicMock,  # noqa
-    mock_acquire_lock: MagicMock,  # noqa
+    mock_lock_class: MagicMock,  # noqa
     mock_recalc_duration: MagicMock,
     mock_recalc_parcels: MagicMock,
 ) -> None:
     """Should recalculate delivery cost for unpriced parcels and persist them."""
     # Arrange
-    mock_parcel = MagicMock(
-        weight_kg=Decimal("2.000"),
-        declared_value_usd=Decimal("100.00"),
-    )
-    mock_fetch_unpriced.side_effect = [[mock_parcel], []]
+    mock_fetch_pending.side_effect = [
+        [("p1", 2000, 10000, None)],
+        [],
+    ]
     mock_session = AsyncMock()
+    mock_session.execute.return_value = MagicMock(rowcount=1)
     mock_session_local.return_value.__aenter__.return_value = mock_session
     mock_redis = AsyncMock()
     mock_get_redis.return_value = mock_redis
@@ -82,8 +171,21 @@ async def test_recalc_delivery_costs_updates(
 
     # Assert
     assert updated == 1
-    assert mock_parcel.delivery_cost_rub == Decimal("180.000000")
+    version = pricing_version(TODAY)
+    mock_session.execute.assert_awaited_once_with(
+        _SET_COST,
+        [
+            {
+                "b_id": "p1",
+                "b_seen": None,
+                "b_kopecks": 18000,
+                "b_version": version,
+                "b_rate_id": "rate-1",
+            }
+        ],
+    )
     mock_session.commit.assert_called_once()
+    assert mock_fetch_pending.call_args_list[1].args[1] == "p1"
     mock_redis.set.assert_any_call("delivery_last_run_updated", "1")
     assert any(
         call.args[0] == "delivery_last_run_at" and "T" in call.args[1]
@@ -94,40 +196,45 @@ async def test_recalc_delivery_costs_updates(
 
 
 @pytest.mark.asyncio
-@patch("app.tasks.delivery._acquire_lock", return_value=False)
-@patch("app.tasks.delivery.get_usd_rub_rate")
+@patch("app.tasks.delivery.DELIVERY_SHARD_SKIPS")
+@patch("app.tasks.delivery.RedisLock", new_callable=lambda: _lock_class(False))
+@patch("app.tasks.delivery.get_rate_table")
 @patch("app.tasks.delivery.AsyncSessionLocal")
 async def test_recalc_delivery_costs_skips_when_lock_exists(
     mock_session_local: MagicMock,
-    mock_get_rate: MagicMock,
-    mock_acquire_lock: MagicMock,  # noqa
+    mock_get_rate: AsyncMock,
+    mock_lock_class: MagicMock,  # noqa
+    mock_skips: MagicMock,
+    no_backlog_read: AsyncMock,
 ) -> None:
     """Should skip recalculation when another worker holds the lock."""
     # Arrange
+    mock_get_rate.return_value = TABLE
 
     # Act
     updated = await recalc_delivery_costs()
 
     # Assert
     assert updated == 0
-    mock_get_rate.assert_not_called()
     mock_session_local.assert_not_called()
+    mock_skips.inc.assert_called_once_with()
+    no_backlog_read.assert_awaited_once_with()
 
 
 @pytest.mark.asyncio
 @patch("app.tasks.delivery.DELIVERY_RECALC_PARCELS")
 @patch("app.tasks.delivery.DELIVERY_RECALC_DURATION")
-@patch("app.tasks.delivery._acquire_lock", return_value=True)
-@patch("app.tasks.delivery.get_usd_rub_rate", return_value=Decimal("90.0"))
-@patch("app.tasks.delivery._fetch_unpriced", return_value=[])
+@patch("app.tasks.delivery.RedisLock", new_callable=lambda: _lock_class(True))
+@patch("app.tasks.delivery.get_rate_table", return_value=TABLE)
+@patch("app.tasks.delivery._fetch_pending", return_value=[])
 @patch("app.tasks.delivery.AsyncSessionLocal")
 @patch("app.tasks.delivery.get_redis")
 async def test_recalc_delivery_costs_handles_no_unpriced_parcels(
     mock_get_redis: MagicMock,
     mock_session_local: MagicMock,
-    mock_fetch_unpriced: MagicMock,  # noqa
+    mock_fetch_pending: MagicMock,  # noqa
     mock_get_rate: MagicMock,  # noqa
-    mock_acquire_lock: MagicMock,  # noqa
+    mock_lock_class: MagicMock,  # noqa
     mock_recalc_duration: MagicMock,
     mock_recalc_parcels: MagicMock,
 ) -> None:
@@ -152,13 +259,13 @@ async def test_recalc_delivery_costs_handles_no_unpriced_parcels(
 @pytest.mark.asyncio
 @patch("app.tasks.delivery.DELIVERY_RECALC_PARCELS")
 @patch("app.tasks.delivery.DELIVERY_RECALC_DURATION")
-@patch("app.tasks.delivery._acquire_lock", return_value=True)
-@patch("app.tasks.delivery.get_usd_rub_rate", side_effect=RuntimeError("rate down"))
+@patch("app.tasks.delivery.RedisLock", new_callable=lambda: _lock_class(True))
+@patch("app.tasks.delivery.get_rate_table", side_effect=RuntimeError("rate down"))
 @patch("app.tasks.delivery.AsyncSessionLocal")
 async def test_recalc_delivery_costs_rate_error_does_not_commit(
     mock_session_local: MagicMock,
     mock_get_rate: MagicMock,  # noqa
-    mock_acquire_lock: MagicMock,  # noqa
+    mock_lock_class: MagicMock,  # noqa
     mock_recalc_duration: MagicMock,
     mock_recalc_parcels: MagicMock,
 ) -> None:
@@ -172,3 +279,604 @@ async def test_recalc_delivery_costs_rate_error_does_not_commit(
     mock_session_local.assert_not_called()
     mock_recalc_duration.observe.assert_not_called()
     mock_recalc_parcels.inc.assert_not_called()
+
+
+def test_cost_expression_rounds_formula_to_cents() -> None:
+    """The SQL formula should mirror _formula and round to the column scale."""
+    # Arrange
+    stmt = update(Parcel).values(delivery_cost_rub=_cost_expression(Decimal("90.5")))
+
+    # Act
+    sql = str(
+        stmt.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+    # Assert
+    assert (
+        "round((parcel.weight_kg * 0.5 + parcel.declared_value_usd * 0.01) * 90.5, 2)"
+        in sql
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery.DELIVERY_BATCH_DURATION")
+@patch("app.tasks.delivery.DELIVERY_BATCH_SIZE")
+async def test_reprice_sql_updates_chunk_by_chunk(
+    mock_batch_size: MagicMock,
+    mock_batch_duration: MagicMock,
+) -> None:
+    """Each chunk should be one guarded UPDATE and one commit."""
+    # Arrange
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.scalar.side_effect = ["id-2", None]
+    mock_session.execute.side_effect = [MagicMock(rowcount=2), MagicMock(rowcount=1)]
+    lock = _lock()
+
+    # Act
+    updated = await _reprice_sql(mock_session, PRICING, lock, batch=2)
+
+    # Assert
+    assert updated == 3
+    mock_batch_size.labels.assert_called_with(mode="sql")
+    sizes = [c.args[0] for c in mock_batch_size.labels.return_value.observe.mock_calls]
+    assert sizes == [2, 1]
+    assert mock_batch_duration.labels.return_value.observe.call_count == 2
+    assert mock_session.commit.await_count == 2
+    assert lock.ensure_held.await_count == 2
+    first, second = (
+        str(call.args[0].compile(dialect=mysql.dialect()))
+        for call in mock_session.execute.await_args_list
+    )
+    assert "delivery_cost_rub IS NULL" in first
+    assert "pricing_version=%s" in first
+    assert "parcel.id <=" in first
+    assert "parcel.id >" in second
+    assert "parcel.id <=" not in second
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery.DELIVERY_RECALC_PARCELS")
+@patch("app.tasks.delivery.DELIVERY_RECALC_DURATION")
+@patch("app.tasks.delivery.RedisLock", new_callable=lambda: _lock_class(True))
+@patch("app.tasks.delivery.get_rate_table", return_value=TABLE)
+@patch("app.tasks.delivery._reprice_sql", return_value=7)
+@patch("app.tasks.delivery._fetch_pending")
+@patch("app.tasks.delivery.AsyncSessionLocal")
+@patch("app.tasks.delivery.get_redis")
+async def test_recalc_delivery_costs_uses_sql_mode(
+    mock_get_redis: MagicMock,
+    mock_session_local: MagicMock,
+    mock_fetch_pending: MagicMock,
+    mock_reprice_sql: MagicMock,
+    mock_get_rate: MagicMock,  # noqa
+    mock_lock_class: MagicMock,  # noqa
+    mock_recalc_duration: MagicMock,  # noqa
+    mock_recalc_parcels: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """DELIVERY_RECALC_MODE=sql should not load parcels into Python."""
+    # Arrange
+    monkeypatch.setattr(settings, "DELIVERY_RECALC_MODE", "sql")
+    mock_get_redis.return_value = AsyncMock()
+
+    # Act
+    updated = await recalc_delivery_costs()
+
+    # Assert
+    assert updated == 7
+    mock_reprice_sql.assert_awaited_once()
+    mock_fetch_pending.assert_not_called()
+    mock_recalc_parcels.inc.assert_called_once_with(7)
+
+
+@pytest.mark.parametrize("shards", [1, 3, 16, 256])
+def test_shard_bounds_cover_key_space_without_overlap(shards: int) -> None:
+    """Shards should be contiguous, open at both ends, and in ID order."""
+    # Act
+    bounds = [_shard_bounds(shard, shards) for shard in range(shards)]
+
+    # Assert
+    assert bounds[0][0] is None
+    assert bounds[-1][1] is None
+    for (_, before), (after, _) in zip(bounds, bounds[1:], strict=False):
+        assert before == after
+    cuts = [after for after, _ in bounds[1:] if after is not None]
+    assert len(cuts) == shards - 1
+    assert cuts == sorted(set(cuts))
+
+
+def test_shard_bounds_split_uuid_prefixes() -> None:
+    """Boundaries should be four-digit hex prefixes of the UUID space."""
+    # Act / Assert
+    assert _shard_bounds(0, 4) == (None, "4000")
+    assert _shard_bounds(1, 4) == ("4000", "8000")
+    assert _shard_bounds(3, 4) == ("c000", None)
+    assert "4000" < "4000a1b2-0000-4000-8000-000000000000" < "8000"
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery.DELIVERY_RECALC_PARCELS")
+@patch("app.tasks.delivery.DELIVERY_RECALC_DURATION")
+@patch("app.tasks.delivery.get_rate_table", return_value=TABLE)
+@patch("app.tasks.delivery._reprice_shard")
+@patch("app.tasks.delivery.get_redis")
+async def test_recalc_delivery_costs_sums_claimed_shards(
+    mock_get_redis: MagicMock,
+    mock_reprice_shard: AsyncMock,
+    mock_get_rate: MagicMock,  # noqa
+    mock_recalc_duration: MagicMock,  # noqa
+    mock_recalc_parcels: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Every shard should be visited once; leased ones count as skipped."""
+    # Arrange
+    monkeypatch.setattr(settings, "DELIVERY_SHARDS", 5)
+    monkeypatch.setattr(settings, "DELIVERY_SHARD_CONCURRENCY", 2)
+    mock_reprice_shard.side_effect = lambda shard, _pricing, _job_id, _stale, **_: (
+        None if shard == 2 else shard * 10
+    )
+    mock_get_redis.return_value = AsyncMock()
+
+    # Act
+    updated = await recalc_delivery_costs()
+
+    # Assert
+    assert updated == 80
+    visited = sorted(call.args[0] for call in mock_reprice_shard.await_args_list)
+    assert visited == [0, 1, 2, 3, 4]
+    mock_recalc_parcels.inc.assert_called_once_with(80)
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery.DELIVERY_RECALC_PARCELS")
+@patch("app.tasks.delivery.get_rate_table", return_value=TABLE)
+@patch("app.tasks.delivery._reprice_shard")
+async def test_recalc_delivery_costs_finishes_other_shards_on_lost_lease(
+    mock_reprice_shard: AsyncMock,
+    mock_get_rate: MagicMock,  # noqa
+    mock_recalc_parcels: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A lost lease should fail the run only after the other shards finish."""
+    # Arrange
+    monkeypatch.setattr(settings, "DELIVERY_SHARDS", 3)
+    monkeypatch.setattr(settings, "DELIVERY_SHARD_CONCURRENCY", 1)
+    mock_reprice_shard.side_effect = [1, LockLostError("lost"), 1]
+
+    # Act / Assert
+    with pytest.raises(LockLostError):
+        await recalc_delivery_costs()
+    assert mock_reprice_shard.await_count == 3
+    mock_recalc_parcels.inc.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_price_parcels_prices_only_unpriced_ids() -> None:
+    """Only IDs still unpriced should be written, in one commit."""
+    # Arrange
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.tuples.return_value.all.return_value = [("p1", 2000, 10000, None)]
+    mock_session.execute.side_effect = [mock_result, MagicMock(rowcount=1)]
+
+    # Act
+    priced = await price_parcels(mock_session, ["p1", "p2"], PRICING)
+
+    # Assert
+    assert priced == 1
+    select_stmt = mock_session.execute.await_args_list[0].args[0]
+    sql = str(select_stmt.compile(dialect=mysql.dialect()))
+    assert "parcel.id IN" in sql
+    assert "delivery_cost_rub IS NULL" in sql
+    assert mock_session.execute.await_args_list[1].args == (
+        _SET_COST,
+        [
+            {
+                "b_id": "p1",
+                "b_seen": None,
+                "b_kopecks": 18000,
+                "b_version": PRICING.version,
+                "b_rate_id": None,
+            }
+        ],
+    )
+    mock_session.commit.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_price_parcels_counts_only_rows_it_wrote() -> None:
+    """A parcel a concurrent writer priced first should not count as priced."""
+    # Arrange
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.tuples.return_value.all.return_value = [
+        ("p1", 2000, 10000, None),
+        ("p2", 1000, 5000, None),
+    ]
+    mock_session.execute.side_effect = [mock_result, MagicMock(rowcount=1)]
+
+    # Act
+    priced = await price_parcels(mock_session, ["p1", "p2"], PRICING)
+
+    # Assert
+    assert priced == 1
+    mock_session.commit.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery.update_job")
+async def test_reprice_sql_reports_batches_to_job(mock_update_job: AsyncMock) -> None:
+    """Runs tied to a job should add each committed batch to its progress."""
+    # Arrange
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.scalar.side_effect = ["id-2", None]
+    mock_session.execute.side_effect = [MagicMock(rowcount=2), MagicMock(rowcount=1)]
+
+    # Act
+    await _reprice_sql(mock_session, PRICING, _lock(), batch=2, job_id="j1")
+
+    # Assert
+    assert [c.kwargs["progress"] for c in mock_update_job.await_args_list] == [
+        {"parcels": 2, "batches": 1},
+        {"parcels": 1, "batches": 1},
+    ]
+
+
+def test_pricing_version_names_rate_date_and_coefficients(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A coefficient change alone should produce a new version."""
+    # Arrange
+    rate_date = date(2026, 1, 1)
+    before = pricing_version(rate_date)
+    monkeypatch.setattr(settings, "DELIVERY_WEIGHT_COEFF", Decimal("0.6"))
+
+    # Act
+    after = pricing_version(rate_date)
+
+    # Assert
+    assert before == "2026-01-01:0.5:0.01"
+    assert after == "2026-01-01:0.6:0.01"
+
+
+def test_set_cost_compares_and_sets_the_version() -> None:
+    """The write should only land if the version read with the row is intact."""
+    # Act
+    sql = str(_SET_COST.compile(dialect=mysql.dialect()))
+
+    # Assert
+    assert "parcel.pricing_version <=> %s" in sql
+    assert "pricing_version=%s" in sql.split("WHERE")[0]
+    assert "currency_rate_id=%s" in sql.split("WHERE")[0]
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery._reprice_python")
+@patch("app.tasks.delivery.AsyncSessionLocal")
+@patch("app.tasks.delivery.RedisLock", new_callable=lambda: _lock_class(True))
+async def test_reprice_shard_reprices_stale_versions_after_unpriced(
+    mock_lock_class: MagicMock,  # noqa
+    mock_session_local: MagicMock,  # noqa
+    mock_reprice_python: AsyncMock,
+) -> None:
+    """Each stale version gets its own pass after the unpriced parcels."""
+    # Arrange
+    mock_reprice_python.side_effect = [1, 2, 3]
+
+    # Act
+    updated = await _reprice_shard(0, PRICING, stale=["2025-12-31:0.5:0.01", None])
+
+    # Assert
+    assert updated == 6
+    first, *stale_passes = mock_reprice_python.await_args_list
+    assert first.kwargs["pending"] is _UNPRICED
+    assert [
+        str(c.kwargs["pending"].compile(dialect=mysql.dialect())) for c in stale_passes
+    ] == [
+        str(_priced_with(v).compile(dialect=mysql.dialect()))
+        for v in ("2025-12-31:0.5:0.01", None)
+    ]
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery.DELIVERY_RECALC_PARCELS")
+@patch("app.tasks.delivery.DELIVERY_RECALC_DURATION")
+@patch("app.tasks.delivery.get_rate_table", return_value=TABLE)
+@patch("app.tasks.delivery._stale_versions", return_value=["2025-12-31:0.5:0.01"])
+@patch("app.tasks.delivery._reprice_shard", return_value=1)
+@patch("app.tasks.delivery.get_redis")
+async def test_recalc_reprices_stale_versions_only_when_asked(
+    mock_get_redis: MagicMock,
+    mock_reprice_shard: AsyncMock,
+    mock_stale_versions: AsyncMock,
+    mock_get_rate: MagicMock,  # noqa
+    mock_recalc_duration: MagicMock,  # noqa
+    mock_recalc_parcels: MagicMock,  # noqa
+) -> None:
+    """Stale versions are looked up once and handed to every shard."""
+    # Arrange
+    mock_get_redis.return_value = AsyncMock()
+
+    # Act
+    await recalc_delivery_costs()
+    await recalc_delivery_costs(reprice_stale=True)
+
+    # Assert
+    current = pricing_version(TODAY)
+    mock_stale_versions.assert_awaited_once_with(current)
+    assert [c.args[3] for c in mock_reprice_shard.await_args_list] == [
+        [],
+        ["2025-12-31:0.5:0.01"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pricing_version_counts_groups_by_version() -> None:
+    """Counts come from one GROUP BY over the version column."""
+    # Arrange
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.tuples.return_value.all.return_value = [("v2", 5), (None, 1)]
+    mock_session.execute.return_value = mock_result
+
+    # Act
+    counts = await pricing_version_counts(mock_session)
+
+    # Assert
+    assert counts == [("v2", 5), (None, 1)]
+    sql = str(mock_session.execute.await_args.args[0].compile(dialect=mysql.dialect()))
+    assert "GROUP BY parcel.pricing_version" in sql
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("row", "expected_age"),
+    [
+        ((3, datetime(2026, 1, 1, 11, 59, 30)), 30.0),
+        ((0, None), 0.0),
+    ],
+)
+@patch("app.tasks.delivery.datetime")
+@patch("app.tasks.delivery.DELIVERY_OLDEST_UNPRICED_AGE")
+@patch("app.tasks.delivery.DELIVERY_BACKLOG")
+@patch("app.tasks.delivery.AsyncSessionLocal")
+async def test_observe_backlog_sets_gauges(
+    mock_session_local: MagicMock,
+    mock_backlog: MagicMock,
+    mock_age: MagicMock,
+    mock_datetime: MagicMock,
+    row: tuple[int, datetime | None],
+    expected_age: float,
+) -> None:
+    """The gauges should hold the unpriced count and the oldest one's age."""
+    # Arrange
+    mock_datetime.now.return_value = datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+    mock_session = AsyncMock(spec=AsyncSession)
+    result = MagicMock()
+    result.tuples.return_value.one.return_value = row
+    mock_session.execute.return_value = result
+    mock_session_local.return_value.__aenter__.return_value = mock_session
+
+    # Act
+    await _observe_backlog()
+
+    # Assert
+    query = str(
+        mock_session.execute.await_args.args[0].compile(dialect=mysql.dialect())
+    )
+    assert "min(parcel.created_at)" in query
+    assert "delivery_cost_rub IS NULL" in query
+    mock_backlog.set.assert_called_once_with(row[0])
+    mock_age.set.assert_called_once_with(expected_age)
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery._reprice_python")
+async def test_reprice_pass_resumes_from_checkpoint_and_wraps_around(
+    mock_reprice_python: AsyncMock,
+    checkpoints: dict[str, AsyncMock],
+) -> None:
+    """A resumed pass should finish the shard, then cover its start."""
+    # Arrange
+    checkpoints["load"].return_value = "8000"
+    mock_reprice_python.side_effect = [3, 2]
+    session = AsyncMock(spec=AsyncSession)
+
+    # Act
+    updated = await _reprice_pass(
+        session, 0, "unpriced", PRICING, _lock(), None, _UNPRICED, None
+    )
+
+    # Assert
+    assert updated == 5
+    legs = [
+        (c.kwargs["after"], c.kwargs["before"])
+        for c in mock_reprice_python.await_args_list
+    ]
+    assert legs == [("8000", None), (None, "8000")]
+    checkpoints["load"].assert_awaited_once_with(0, "unpriced")
+    checkpoints["clear"].assert_awaited_once_with(0, "unpriced")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery._reprice_python", return_value=4)
+async def test_reprice_pass_keeps_checkpoint_when_out_of_time(
+    mock_reprice_python: AsyncMock,
+    checkpoints: dict[str, AsyncMock],
+) -> None:
+    """A pass cut short by the budget should leave its checkpoint behind."""
+    # Arrange
+    checkpoints["load"].return_value = "8000"
+    session = AsyncMock(spec=AsyncSession)
+
+    # Act
+    updated = await _reprice_pass(
+        session, 0, "unpriced", PRICING, _lock(), None, _UNPRICED, 0.0
+    )
+
+    # Assert
+    assert updated == 4
+    mock_reprice_python.assert_awaited_once()
+    checkpoints["clear"].assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery._out_of_time", side_effect=[False, True])
+@patch("app.tasks.delivery._fetch_pending")
+async def test_reprice_python_checkpoints_batches_until_out_of_time(
+    mock_fetch_pending: AsyncMock,
+    mock_out_of_time: MagicMock,  # noqa
+) -> None:
+    """No batch should start once the budget is spent; each commit is saved."""
+    # Arrange
+    mock_fetch_pending.return_value = [("p1", 2000, 10000, None)]
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock(rowcount=1)
+    checkpoint = AsyncMock()
+
+    # Act
+    updated = await _reprice_python(
+        session, PRICING, _lock(), deadline=1.0, checkpoint=checkpoint
+    )
+
+    # Assert
+    assert updated == 1
+    mock_fetch_pending.assert_awaited_once()
+    session.commit.assert_awaited_once_with()
+    checkpoint.assert_awaited_once_with("p1")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery._fetch_pending")
+async def test_reprice_python_counts_only_rows_it_wrote(
+    mock_fetch_pending: AsyncMock,
+) -> None:
+    """Rows a concurrent writer priced first should not count as updated."""
+    # Arrange
+    mock_fetch_pending.side_effect = [
+        [("p1", 2000, 10000, None), ("p2", 1000, 5000, None)],
+        [],
+    ]
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock(rowcount=1)
+
+    # Act
+    updated = await _reprice_python(session, PRICING, _lock())
+
+    # Assert
+    assert updated == 1
+    session.commit.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery._reprice_shard")
+@patch("app.tasks.delivery.get_rate_table", return_value=TABLE)
+@patch("app.tasks.delivery.update_job")
+async def test_recalc_stops_claiming_shards_after_the_budget(
+    mock_update_job: AsyncMock,
+    mock_get_rate: MagicMock,  # noqa
+    mock_reprice_shard: AsyncMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A run out of budget should claim no shard and tell the job why."""
+    # Arrange
+    monkeypatch.setattr(settings, "DELIVERY_RUN_BUDGET_SEC", 0.0)
+
+    # Act
+    updated = await recalc_delivery_costs(job_id="j1")
+
+    # Assert
+    assert updated == 0
+    mock_reprice_shard.assert_not_awaited()
+    assert "resumes" in mock_update_job.await_args_list[-1].kwargs["message"]
+
+
+@pytest.mark.asyncio
+async def test_stop_request_ends_runs_at_the_next_batch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """After a stop request no batch may start, and idle waits report runs."""
+    # Arrange
+    monkeypatch.setattr(delivery, "_stop_requested", False)
+    monkeypatch.setattr(delivery, "_active_runs", 1)
+
+    # Act
+    request_recalc_stop()
+
+    # Assert
+    assert _out_of_time(None)
+    assert not await wait_recalc_idle(0.0)
+    monkeypatch.setattr(delivery, "_active_runs", 0)
+    assert await wait_recalc_idle(0.0)
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_kept_per_shard_count_with_a_ttl(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checkpoints live in one expiring hash per shard, one field per pass."""
+    # Arrange
+    monkeypatch.setattr(settings, "DELIVERY_SHARDS", 4)
+    redis = AsyncMock()
+    redis.hget.return_value = "4000"
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    redis.pipeline = MagicMock(return_value=pipe)
+    monkeypatch.setattr("app.tasks.delivery.get_redis", lambda: redis)
+
+    # Act
+    await _save_checkpoint(1, "unpriced", "4000")
+    resumed = await _load_checkpoint(1, "unpriced")
+
+    # Assert
+    assert resumed == "4000"
+    pipe.hset.assert_called_once_with("delivery_checkpoint:4:1", "unpriced", "4000")
+    pipe.expire.assert_called_once_with(
+        "delivery_checkpoint:4:1", delivery.CHECKPOINT_TTL_SEC
+    )
+    redis.hget.assert_awaited_once_with("delivery_checkpoint:4:1", "unpriced")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.delivery.AsyncSessionLocal")
+async def test_estimate_backlog_counts_up_to_the_limit(
+    mock_session_local: MagicMock,
+) -> None:
+    """The poll should count unpriced IDs through a LIMIT, not the whole set."""
+    # Arrange
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.scalar.return_value = 42
+    mock_session_local.return_value.__aenter__.return_value = mock_session
+
+    # Act
+    backlog = await estimate_backlog(100)
+
+    # Assert
+    assert backlog == 42
+    query = mock_session.scalar.await_args.args[0]
+    sql = str(
+        query.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+    assert "count(*)" in sql
+    assert "delivery_cost_rub IS NULL" in sql
+    assert "LIMIT 100" in sql
+
+
+@pytest.mark.asyncio
+@patch(
+    "app.tasks.delivery.get_rate_table",
+    return_value=RateTable.build(
+        date(2026, 1, 1), {"USD": Decimal("88.5")}, {"USD": "rate-1"}
+    ),
+)
+async def test_current_pricing_versions_by_the_rate_date(
+    mock_get_table: AsyncMock,  # noqa
+) -> None:
+    """A fallback rate from an earlier day should carry that day's version."""
+    # Act
+    pricing = await current_pricing()
+
+    # Assert
+    assert pricing == Pricing(Decimal("88.5"), "2026-01-01:0.5:0.01", "rate-1")
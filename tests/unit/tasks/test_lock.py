@@ -0,0 +1,245 @@
+"""Unit tests for the owner-tokened Redis job lock."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from app.tasks.lock import (
+    _ACQUIRE,
+    _EXTEND,
+    _IS_HELD,
+    _RELEASE,
+    LockLostError,
+    RedisLock,
+)
+
+
+def _redis(**results: object) -> tuple[MagicMock, dict[str, AsyncMock]]:
+    """Return a Redis stand-in whose scripts return the given results."""
+    scripts = {
+        _ACQUIRE: AsyncMock(return_value=results.get("acquire", 0)),
+        _EXTEND: AsyncMock(return_value=results.get("extend", 0)),
+        _RELEASE: AsyncMock(return_value=results.get("release", 0)),
+        _IS_HELD: AsyncMock(return_value=results.get("is_held", 0)),
+    }
+    redis = MagicMock()
+    redis.register_script.side_effect = scripts.__getitem__
+    return redis, scripts
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.get_redis")
+async def test_acquire_records_fence(mock_get_redis: MagicMock) -> None:
+    """A successful acquire should store the fence returned by Redis."""
+    # Arrange
+    redis, scripts = _redis(acquire=7)
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+
+    # Act
+    acquired = await lock.acquire()
+
+    # Assert
+    assert acquired is True
+    assert lock.fence == 7
+    scripts[_ACQUIRE].assert_awaited_once_with(
+        keys=["job", "job:fence"], args=[lock.token, 60_000]
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.get_redis")
+async def test_acquire_fails_when_taken(mock_get_redis: MagicMock) -> None:
+    """Acquire should report failure and leave the fence unset."""
+    # Arrange
+    mock_get_redis.return_value, _ = _redis(acquire=0)
+    lock = RedisLock("job", ttl_sec=60)
+
+    # Act
+    acquired = await lock.acquire()
+
+    # Assert
+    assert acquired is False
+    assert lock.fence is None
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.get_redis")
+async def test_release_compares_owner_token(mock_get_redis: MagicMock) -> None:
+    """Release should pass this holder's token to the compare-and-delete."""
+    # Arrange
+    redis, scripts = _redis(acquire=1, release=1)
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+    await lock.acquire()
+
+    # Act
+    released = await lock.release()
+
+    # Assert
+    assert released is True
+    assert lock.fence is None
+    scripts[_RELEASE].assert_awaited_once_with(keys=["job"], args=[lock.token])
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.get_redis")
+async def test_ensure_held_raises_when_replaced(mock_get_redis: MagicMock) -> None:
+    """A holder whose token or fence no longer matches must stop writing."""
+    # Arrange
+    redis, scripts = _redis(acquire=3, is_held=0)
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+    await lock.acquire()
+
+    # Act / Assert
+    with pytest.raises(LockLostError):
+        await lock.ensure_held()
+    scripts[_IS_HELD].assert_awaited_once_with(
+        keys=["job", "job:fence"], args=[lock.token, 3]
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.get_redis")
+async def test_ensure_held_passes_for_current_holder(
+    mock_get_redis: MagicMock,
+) -> None:
+    """The current holder should pass the fencing check."""
+    # Arrange
+    mock_get_redis.return_value, _ = _redis(acquire=3, is_held=1)
+    lock = RedisLock("job", ttl_sec=60)
+    await lock.acquire()
+
+    # Act / Assert
+    await lock.ensure_held()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.get_redis")
+async def test_held_yields_false_without_release(mock_get_redis: MagicMock) -> None:
+    """A busy lock should skip the block and never delete the other holder's key."""
+    # Arrange
+    redis, scripts = _redis(acquire=0)
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+
+    # Act
+    async with lock.held() as acquired:
+        pass
+
+    # Assert
+    assert acquired is False
+    scripts[_RELEASE].assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.get_redis")
+async def test_held_releases_on_error(mock_get_redis: MagicMock) -> None:
+    """The lock should be released even when the block raises."""
+    # Arrange
+    redis, scripts = _redis(acquire=1, release=1)
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+
+    # Act
+    with pytest.raises(RuntimeError):
+        async with lock.held():
+            raise RuntimeError("boom")
+
+    # Assert
+    scripts[_RELEASE].assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.tasks.lock.get_redis")
+async def test_heartbeat_extends_while_progressing(
+    mock_get_redis: MagicMock,
+    mock_sleep: AsyncMock,
+) -> None:
+    """The heartbeat should extend until Redis reports the lock gone."""
+    # Arrange
+    redis, scripts = _redis()
+    scripts[_EXTEND].side_effect = [1, 1, 0]
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+
+    # Act
+    await lock._heartbeat()
+
+    # Assert
+    assert scripts[_EXTEND].await_count == 3
+    mock_sleep.assert_awaited_with(20.0)
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.tasks.lock.get_redis")
+async def test_heartbeat_retries_after_a_redis_error(
+    mock_get_redis: MagicMock,
+    mock_sleep: AsyncMock,  # noqa: ARG001
+) -> None:
+    """A transient Redis error should not stop the heartbeat."""
+    # Arrange
+    redis, scripts = _redis()
+    scripts[_EXTEND].side_effect = [RedisError("timeout"), 1, 0]
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+    lock.fence = 7
+
+    # Act
+    await lock._heartbeat()
+
+    # Assert
+    assert scripts[_EXTEND].await_count == 3
+    assert lock.fence == 7
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.tasks.lock.get_redis")
+async def test_heartbeat_marks_the_lock_lost_once_the_ttl_ran_out(
+    mock_get_redis: MagicMock,
+    mock_sleep: AsyncMock,  # noqa: ARG001
+) -> None:
+    """Redis errors for a whole TTL should mark the lock lost, not raise."""
+    # Arrange
+    redis, scripts = _redis()
+    scripts[_EXTEND].side_effect = RedisError("down")
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+    lock.fence = 7
+    lock._extended_at = time.monotonic() - 60
+
+    # Act
+    await lock._heartbeat()
+
+    # Assert
+    scripts[_EXTEND].assert_awaited_once()
+    with pytest.raises(LockLostError):
+        await lock.ensure_held()
+    scripts[_IS_HELD].assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.lock.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.tasks.lock.get_redis")
+async def test_heartbeat_stops_when_progress_stalls(
+    mock_get_redis: MagicMock,
+    mock_sleep: AsyncMock,  # noqa: ARG001
+) -> None:
+    """A job stuck for longer than the TTL should let the lock expire."""
+    # Arrange
+    redis, scripts = _redis(extend=1)
+    mock_get_redis.return_value = redis
+    lock = RedisLock("job", ttl_sec=60)
+    lock._last_progress = time.monotonic() - 61
+
+    # Act
+    await lock._heartbeat()
+
+    # Assert
+    scripts[_EXTEND].assert_not_awaited()
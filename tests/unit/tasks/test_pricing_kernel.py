@@ -0,0 +1,123 @@
+"""Unit tests for the batch pricing kernel."""
+
+import random
+from decimal import ROUND_HALF_UP, Decimal
+from types import ModuleType
+
+import pytest
+
+from app.core.settings import settings
+from app.tasks.delivery import _formula
+from app.tasks.pricing_kernel import (
+    _kopecks_numpy,
+    _kopecks_python,
+    _Terms,
+    price_kopecks,
+)
+
+MAX_GRAMS = 10**10 - 1  # weight_kg Numeric(10, 3)
+MAX_CENTS = 10**12 - 1  # declared_value_usd Numeric(12, 2)
+
+
+def _expected(grams: int, cents: int, rate: Decimal) -> int:
+    """Return ``_formula`` in kopecks, rounded the way the cost column stores it."""
+    cost = _formula(Decimal(grams).scaleb(-3), Decimal(cents).scaleb(-2), rate)
+    return int(cost.scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _random_case(rng: random.Random) -> tuple[int, int, Decimal]:
+    """Return grams, cents, and a rate drawn across their full ranges."""
+    grams = rng.randint(0, 10 ** rng.randint(1, 10) - 1)
+    cents = rng.randint(0, 10 ** rng.randint(1, 12) - 1)
+    rate = Decimal(rng.randint(1, 10 ** rng.randint(1, 8))).scaleb(-rng.randint(0, 6))
+    return grams, cents, rate
+
+
+def test_price_kopecks_matches_formula_on_random_inputs() -> None:
+    """The kernel should equal the rounded Decimal formula on any column value."""
+    # Arrange
+    rng = random.Random(20240601)  # nosec B311
+    cases = [_random_case(rng) for _ in range(5000)]
+
+    # Act
+    results = [price_kopecks([g], [c], rate) for g, c, rate in cases]
+
+    # Assert
+    for (grams, cents, rate), kopecks in zip(cases, results, strict=True):
+        assert kopecks == [_expected(grams, cents, rate)], (grams, cents, rate)
+
+
+@pytest.mark.parametrize(
+    ("grams", "cents", "rate"),
+    [
+        (1, 0, Decimal("10")),  # exactly half a kopeck
+        (1, 0, Decimal("9.999")),  # just below half
+        (0, 50, Decimal("1")),  # exactly half a kopeck
+        (0, 0, Decimal("90")),
+        (MAX_GRAMS, MAX_CENTS, Decimal("999.9999")),
+    ],
+)
+def test_price_kopecks_edge_cases(grams: int, cents: int, rate: Decimal) -> None:
+    """Halves round up and the largest column values price exactly."""
+    # Act
+    kopecks = price_kopecks([grams], [cents], rate)
+
+    # Assert
+    assert kopecks == [_expected(grams, cents, rate)]
+
+
+def test_price_kopecks_follows_configured_coefficients(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Coefficients with more places than the columns should still be exact."""
+    # Arrange
+    monkeypatch.setattr(settings, "DELIVERY_WEIGHT_COEFF", Decimal("0.12345"))
+    monkeypatch.setattr(settings, "DELIVERY_VALUE_COEFF", Decimal("2"))
+    rng = random.Random(11)  # nosec B311
+    cases = [_random_case(rng) for _ in range(500)]
+
+    # Act
+    results = [price_kopecks([g], [c], rate) for g, c, rate in cases]
+
+    # Assert
+    assert results == [[_expected(g, c, rate)] for g, c, rate in cases]
+
+
+def test_price_kopecks_prices_a_batch_in_order() -> None:
+    """A batch should price each parcel as if priced alone."""
+    # Arrange
+    grams, cents = [2000, 1, 125], [10000, 0, 1250]
+
+    # Act
+    kopecks = price_kopecks(grams, cents, Decimal("90"))
+
+    # Assert
+    assert kopecks == [18000, 5, 1688]
+    assert price_kopecks([], [], Decimal("90")) == []
+
+
+def test_price_kopecks_rejects_negative_inputs() -> None:
+    """Negative inputs would round the wrong way, so they are refused."""
+    # Act / Assert
+    with pytest.raises(ValueError, match="negative"):
+        price_kopecks([-1], [0], Decimal("90"))
+    with pytest.raises(ValueError, match="Cannot price"):
+        price_kopecks([1], [0], Decimal("-90"))
+
+
+def test_numpy_backend_matches_python_backend() -> None:
+    """Both backends should return identical kopecks for the same batch."""
+    # Arrange
+    np: ModuleType = pytest.importorskip("numpy")
+    rng = random.Random(7)  # nosec B311
+    cases = [_random_case(rng) for _ in range(2000)]
+    grams = [c[0] for c in cases]
+    cents = [c[1] for c in cases]
+    terms = _Terms(Decimal("90.1234"))
+
+    # Act
+    from_numpy = _kopecks_numpy(np, grams, cents, terms)
+    from_python = _kopecks_python(grams, cents, terms)
+
+    # Assert
+    assert from_numpy == from_python
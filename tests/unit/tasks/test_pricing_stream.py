@@ -0,0 +1,140 @@
+"""Unit tests for the pricing stream consumer."""
+
+import asyncio
+import time
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import ResponseError
+
+from app.services.pricing_events import GROUP, STREAM
+from app.tasks.delivery import Pricing
+from app.tasks.pricing_stream import (
+    _ensure_group,
+    _price_entries,
+    _read_new,
+    consume_pricing_stream,
+)
+
+PRICING = Pricing(Decimal("90"), "2026-01-01:0.5:0.01")
+
+
+def _entry_id(age_sec: float = 0.0) -> str:
+    """Return a stream entry ID stamped ``age_sec`` seconds ago."""
+    return f"{int((time.time() - age_sec) * 1000)}-0"
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.pricing_stream.get_redis")
+async def test_ensure_group_ignores_existing_group(mock_get_redis: MagicMock) -> None:
+    """A group created by another process should not be an error."""
+    # Arrange
+    redis = AsyncMock()
+    redis.xgroup_create.side_effect = ResponseError("BUSYGROUP group exists")
+    mock_get_redis.return_value = redis
+
+    # Act
+    await _ensure_group()
+
+    # Assert
+    redis.xgroup_create.assert_awaited_once_with(STREAM, GROUP, id="0", mkstream=True)
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.pricing_stream.get_redis")
+async def test_read_new_returns_entries_of_the_stream(
+    mock_get_redis: MagicMock,
+) -> None:
+    """New entries should be unwrapped from the per-stream reply."""
+    # Arrange
+    redis = AsyncMock()
+    redis.xreadgroup.return_value = [[STREAM, [("1-0", {"id": "p1"})]]]
+    mock_get_redis.return_value = redis
+
+    # Act
+    entries = await _read_new("worker-1")
+
+    # Assert
+    assert entries == [("1-0", {"id": "p1"})]
+    assert redis.xreadgroup.await_args.args == (GROUP, "worker-1", {STREAM: ">"})
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.pricing_stream.DELIVERY_RECALC_PARCELS")
+@patch("app.tasks.pricing_stream.current_pricing", return_value=PRICING)
+@patch("app.tasks.pricing_stream.price_parcels", return_value=1)
+@patch("app.tasks.pricing_stream.AsyncSessionLocal")
+@patch("app.tasks.pricing_stream.get_redis")
+async def test_price_entries_prices_then_acks(
+    mock_get_redis: MagicMock,
+    mock_session_local: MagicMock,
+    mock_price_parcels: AsyncMock,
+    mock_current_pricing: MagicMock,  # noqa
+    mock_recalc_parcels: MagicMock,
+) -> None:
+    """Every entry, including trimmed ones, is acked after pricing commits."""
+    # Arrange
+    redis = AsyncMock()
+    mock_get_redis.return_value = redis
+    session = AsyncMock()
+    mock_session_local.return_value.__aenter__.return_value = session
+    first, trimmed = _entry_id(0.2), _entry_id(0.1)
+
+    # Act
+    priced = await _price_entries([(first, {"id": "p1"}), (trimmed, None)])
+
+    # Assert
+    assert priced == 1
+    mock_price_parcels.assert_awaited_once_with(session, ["p1"], PRICING)
+    redis.xack.assert_awaited_once_with(STREAM, GROUP, first, trimmed)
+    mock_recalc_parcels.inc.assert_called_once_with(1)
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.pricing_stream.current_pricing", return_value=PRICING)
+@patch("app.tasks.pricing_stream.price_parcels", side_effect=RuntimeError("db"))
+@patch("app.tasks.pricing_stream.AsyncSessionLocal")
+@patch("app.tasks.pricing_stream.get_redis")
+async def test_price_entries_leaves_entries_pending_on_failure(
+    mock_get_redis: MagicMock,
+    mock_session_local: MagicMock,  # noqa
+    mock_price_parcels: AsyncMock,  # noqa
+    mock_current_pricing: MagicMock,  # noqa
+) -> None:
+    """Failed batches must stay unacknowledged so they are reclaimed later."""
+    # Arrange
+    redis = AsyncMock()
+    mock_get_redis.return_value = redis
+
+    # Act / Assert
+    with pytest.raises(RuntimeError):
+        await _price_entries([(_entry_id(), {"id": "p1"})])
+    redis.xack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.pricing_stream._price_entries")
+@patch("app.tasks.pricing_stream._read_new")
+@patch("app.tasks.pricing_stream._claim_stale")
+@patch("app.tasks.pricing_stream._ensure_group")
+async def test_consumer_reclaims_stale_entries_before_reading_new(
+    mock_ensure_group: AsyncMock,  # noqa
+    mock_claim_stale: AsyncMock,
+    mock_read_new: AsyncMock,
+    mock_price_entries: AsyncMock,
+) -> None:
+    """Reclaimed entries are priced first; new ones are read once none remain."""
+    # Arrange
+    stale = [("1-0", {"id": "p-stale"})]
+    fresh = [("2-0", {"id": "p-new"})]
+    mock_claim_stale.return_value = stale
+    mock_read_new.side_effect = [fresh, asyncio.CancelledError()]
+
+    # Act
+    with pytest.raises(asyncio.CancelledError):
+        await consume_pricing_stream("worker-1")
+
+    # Assert
+    assert [c.args[0] for c in mock_price_entries.await_args_list] == [stale, fresh]
+    mock_claim_stale.assert_awaited_once_with("worker-1")
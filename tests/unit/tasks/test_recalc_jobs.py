@@ -0,0 +1,293 @@
+"""Unit tests for queued manual delivery recalculations."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.exceptions import NotFoundError
+from app.core.jobs import Job, JobStatus
+from app.tasks.recalc_jobs import (
+    ABANDONED_MESSAGE,
+    ALIVE_KEY_TMPL,
+    JOB_KIND,
+    PROCESSING_KEY_TMPL,
+    QUEUE_KEY,
+    REPRICE_STALE_MODE,
+    consume_recalc_requests,
+    enqueue_recalc,
+    get_recalc_job,
+    recalc_job_read,
+    recover_abandoned_jobs,
+    run_recalc_job,
+)
+
+STARTED = datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC)
+
+
+def _job(status: JobStatus, updated_after_sec: float = 4.0) -> Job:
+    """Return a recalculation job that started at ``STARTED``."""
+    return Job(
+        job_id="j1",
+        kind=JOB_KIND,
+        owner_id="admin",
+        status=status,
+        created_at=STARTED,
+        started_at=STARTED,
+        updated_at=STARTED + timedelta(seconds=updated_after_sec),
+        progress={"parcels": 1200, "batches": 6, "shards": 2},
+        info={"rate": "90.1234"},
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.get_redis")
+@patch("app.tasks.recalc_jobs.create_job", return_value="j1")
+async def test_enqueue_recalc_queues_new_job(
+    mock_create_job: AsyncMock,
+    mock_get_redis: MagicMock,
+) -> None:
+    """Enqueueing should create a pending job and push its ID for the worker."""
+    # Arrange
+    redis = AsyncMock()
+    mock_get_redis.return_value = redis
+
+    # Act
+    job_id = await enqueue_recalc("admin")
+
+    # Assert
+    assert job_id == "j1"
+    mock_create_job.assert_awaited_once_with(JOB_KIND, "admin")
+    redis.lpush.assert_awaited_once_with(QUEUE_KEY, "j1")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.get_redis")
+@patch("app.tasks.recalc_jobs.update_job")
+@patch("app.tasks.recalc_jobs.create_job", return_value="j1")
+async def test_enqueue_recalc_records_repricing_mode_before_queueing(
+    mock_create_job: AsyncMock,  # noqa
+    mock_update_job: AsyncMock,
+    mock_get_redis: MagicMock,
+) -> None:
+    """The worker must see the mode as soon as it can pop the job."""
+    # Arrange
+    redis = AsyncMock()
+    mock_get_redis.return_value = redis
+
+    # Act
+    await enqueue_recalc("admin", reprice_stale=True)
+
+    # Assert
+    mock_update_job.assert_awaited_once_with("j1", info={"mode": REPRICE_STALE_MODE})
+    redis.lpush.assert_awaited_once_with(QUEUE_KEY, "j1")
+
+
+def test_recalc_job_read_derives_throughput_of_finished_run() -> None:
+    """Finished runs should be timed from start to their last update."""
+    # Act
+    view = recalc_job_read(_job("completed"), STARTED + timedelta(minutes=10))
+
+    # Assert
+    assert view.parcels_done == 1200
+    assert view.rate == Decimal("90.1234")
+    assert view.elapsed_sec == 4.0
+    assert view.batches_per_sec == 1.5
+
+
+def test_recalc_job_read_times_running_job_until_now() -> None:
+    """A running job's elapsed time should keep growing between updates."""
+    # Act
+    view = recalc_job_read(_job("running"), STARTED + timedelta(seconds=12))
+
+    # Assert
+    assert view.elapsed_sec == 12.0
+    assert view.batches_per_sec == 0.5
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.get_job", return_value=None)
+async def test_get_recalc_job_hides_missing_jobs(mock_get_job: AsyncMock) -> None:  # noqa
+    """Unknown or expired IDs should surface as 404s."""
+    # Act / Assert
+    with pytest.raises(NotFoundError):
+        await get_recalc_job("missing")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.update_job")
+@patch("app.tasks.recalc_jobs.recalc_delivery_costs", return_value=5)
+@patch("app.tasks.recalc_jobs.get_job")
+@patch("app.tasks.recalc_jobs.start_job", return_value=True)
+async def test_run_recalc_job_marks_completion(
+    mock_start_job: AsyncMock,  # noqa
+    mock_get_job: AsyncMock,
+    mock_recalc: AsyncMock,
+    mock_update_job: AsyncMock,
+) -> None:
+    """A successful run should honour the job's mode and complete the job."""
+    # Arrange
+    job = _job("running")
+    job.info["mode"] = REPRICE_STALE_MODE
+    mock_get_job.return_value = job
+
+    # Act
+    await run_recalc_job("j1")
+
+    # Assert
+    mock_recalc.assert_awaited_once_with(job_id="j1", reprice_stale=True)
+    mock_update_job.assert_awaited_once_with("j1", status="completed")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.update_job")
+@patch("app.tasks.recalc_jobs.recalc_delivery_costs", side_effect=RuntimeError("x"))
+@patch("app.tasks.recalc_jobs.get_job", return_value=None)
+@patch("app.tasks.recalc_jobs.start_job", return_value=True)
+async def test_run_recalc_job_records_failure(
+    mock_start_job: AsyncMock,  # noqa
+    mock_get_job: AsyncMock,  # noqa
+    mock_recalc: AsyncMock,  # noqa
+    mock_update_job: AsyncMock,
+) -> None:
+    """A failing run should be marked failed with its reason."""
+    # Act
+    await run_recalc_job("j1")
+
+    # Assert
+    mock_update_job.assert_awaited_once_with("j1", status="failed", message="x")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.recalc_delivery_costs")
+@patch("app.tasks.recalc_jobs.start_job", return_value=False)
+async def test_run_recalc_job_skips_started_jobs(
+    mock_start_job: AsyncMock,  # noqa
+    mock_recalc: AsyncMock,
+) -> None:
+    """A job already picked up elsewhere must not run twice."""
+    # Act
+    await run_recalc_job("j1")
+
+    # Assert
+    mock_recalc.assert_not_awaited()
+
+
+def _queue_redis(processing_keys: list[str], alive: set[str]) -> AsyncMock:
+    """Return a Redis stand-in with the given processing lists and alive keys."""
+    redis = AsyncMock()
+
+    async def _scan_iter(match: str) -> AsyncIterator[str]:  # noqa
+        for key in processing_keys:
+            yield key
+
+    redis.scan_iter = _scan_iter
+    redis.exists.side_effect = lambda key: int(key in alive)
+    redis.lrange.return_value = []
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    redis.pipeline = MagicMock(return_value=pipe)
+    return redis
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.update_job")
+@patch("app.tasks.recalc_jobs.get_job")
+@patch("app.tasks.recalc_jobs.get_redis")
+async def test_recover_abandoned_jobs_requeues_pending_and_fails_running(
+    mock_get_redis: MagicMock,
+    mock_get_job: AsyncMock,
+    mock_update_job: AsyncMock,
+) -> None:
+    """Jobs of a dead consumer are requeued if unstarted, failed if running."""
+    # Arrange
+    own = PROCESSING_KEY_TMPL.format(consumer="me")
+    dead = PROCESSING_KEY_TMPL.format(consumer="dead")
+    live = PROCESSING_KEY_TMPL.format(consumer="live")
+    redis = _queue_redis([own, dead, live], {ALIVE_KEY_TMPL.format(consumer="live")})
+    redis.lmove.side_effect = ["j-pending", "j-running", None]
+    mock_get_redis.return_value = redis
+    pending = _job("pending")
+    running = _job("running")
+    mock_get_job.side_effect = [pending, running]
+
+    # Act
+    handled = await recover_abandoned_jobs("me")
+
+    # Assert
+    assert handled == 2
+    assert {c.args[0] for c in redis.lmove.await_args_list} == {dead}
+    pipe = redis.pipeline.return_value
+    pipe.rpush.assert_called_once_with(QUEUE_KEY, "j-pending")
+    pipe.lrem.assert_called_once_with(own, 1, "j-pending")
+    mock_update_job.assert_awaited_once_with(
+        "j-running", status="failed", message=ABANDONED_MESSAGE
+    )
+    redis.lrem.assert_awaited_once_with(own, 1, "j-running")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.recover_abandoned_jobs")
+@patch("app.tasks.recalc_jobs.run_recalc_job")
+@patch("app.tasks.recalc_jobs.get_redis")
+async def test_consume_recalc_requests_keeps_jobs_listed_until_done(
+    mock_get_redis: MagicMock,
+    mock_run: AsyncMock,
+    mock_recover: AsyncMock,
+) -> None:
+    """A job should stay in the processing list until its run has finished."""
+    # Arrange
+    processing = PROCESSING_KEY_TMPL.format(consumer="me")
+    redis = AsyncMock()
+    redis.blmove.side_effect = ["j1", asyncio.CancelledError()]
+    mock_get_redis.return_value = redis
+
+    async def _run(job_id: str) -> None:
+        redis.lrem.assert_not_awaited()
+
+    mock_run.side_effect = _run
+
+    # Act
+    with pytest.raises(asyncio.CancelledError):
+        await consume_recalc_requests("me")
+
+    # Assert
+    mock_recover.assert_awaited_once_with("me")
+    redis.blmove.assert_awaited_with(QUEUE_KEY, processing, 5, "RIGHT", "LEFT")
+    mock_run.assert_awaited_once_with("j1")
+    redis.lrem.assert_awaited_once_with(processing, 1, "j1")
+
+
+@pytest.mark.asyncio
+@patch("app.tasks.recalc_jobs.update_job")
+@patch("app.tasks.recalc_jobs.get_job")
+@patch("app.tasks.recalc_jobs.get_redis")
+async def test_restart_under_the_same_name_recovers_its_leftover_job(
+    mock_get_redis: MagicMock,
+    mock_get_job: AsyncMock,
+    mock_update_job: AsyncMock,
+) -> None:
+    """A restarted consumer reusing its name should settle its own old list."""
+    # Arrange
+    own = PROCESSING_KEY_TMPL.format(consumer="me")
+    redis = _queue_redis([own], {ALIVE_KEY_TMPL.format(consumer="me")})
+    redis.lrange.return_value = ["j-running"]
+    mock_get_redis.return_value = redis
+    mock_get_job.return_value = _job("running")
+
+    # Act
+    handled = await recover_abandoned_jobs("me")
+
+    # Assert
+    assert handled == 1
+    redis.lrange.assert_awaited_once_with(own, 0, -1)
+    redis.lmove.assert_not_awaited()
+    mock_update_job.assert_awaited_once_with(
+        "j-running", status="failed", message=ABANDONED_MESSAGE
+    )
+    redis.lrem.assert_awaited_once_with(own, 1, "j-running")
@@ -3,8 +3,10 @@
 from unittest.mock import MagicMock
 
 import pytest
+from pydantic import ValidationError
 
-from app.core.settings import settings
+from app.core.settings import Settings, settings
+from app.services.rates import refresh_rate_ahead
 from app.tasks import scheduler as scheduler_module
 from app.tasks.delivery import recalc_delivery_costs
 from app.tasks.scheduler import init_scheduler
@@ -19,6 +21,7 @@ def test_init_scheduler_registers_delivery_recalculation(
     scheduler = MagicMock()
     scheduler_cls = MagicMock(return_value=scheduler)
     monkeypatch.setattr(scheduler_module, "AsyncIOScheduler", scheduler_cls)
+    monkeypatch.setattr(settings, "DELIVERY_SCHEDULE", "cron")
     monkeypatch.setattr(settings, "DELIVERY_JOB_INTERVAL_MIN", 7)
 
     # Act
@@ -27,7 +30,7 @@ def test_init_scheduler_registers_delivery_recalculation(
     # Assert
     assert result == scheduler
     scheduler_cls.assert_called_once_with(timezone="UTC", event_loop=loop)
-    scheduler.add_job.assert_called_once_with(
+    scheduler.add_job.assert_any_call(
         recalc_delivery_costs,
         trigger="cron",
         minute="*/7",
@@ -36,3 +39,39 @@ def test_init_scheduler_registers_delivery_recalculation(
         coalesce=True,
         replace_existing=True,
     )
+
+
+def test_init_scheduler_leaves_adaptive_schedule_to_its_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The adaptive schedule should register only the rate refresh job."""
+    # Arrange
+    scheduler = MagicMock()
+    monkeypatch.setattr(
+        scheduler_module, "AsyncIOScheduler", MagicMock(return_value=scheduler)
+    )
+    monkeypatch.setattr(settings, "DELIVERY_SCHEDULE", "adaptive")
+    monkeypatch.setattr(settings, "RATE_REFRESH_LEAD_MIN", 10)
+
+    # Act
+    init_scheduler(MagicMock())
+
+    # Assert
+    scheduler.add_job.assert_called_once_with(
+        refresh_rate_ahead,
+        trigger="cron",
+        hour=23,
+        minute=50,
+        id="refresh_rate_ahead",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+    )
+
+
+@pytest.mark.parametrize("lead", [0, 60])
+def test_rate_refresh_lead_must_fit_in_the_hour(lead: int) -> None:
+    """A lead outside 1-59 would give the cron trigger an invalid minute."""
+    # Act / Assert
+    with pytest.raises(ValidationError):
+        Settings(RATE_REFRESH_LEAD_MIN=lead)
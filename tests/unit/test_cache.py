@@ -1,10 +1,11 @@
 """Unit tests for Redis cache decorator argument handling."""
 
 from collections.abc import Callable
-from unittest.mock import AsyncMock
+from unittest.mock import ANY, AsyncMock
 
 import pytest
 from starlette.requests import Request
+from starlette.responses import Response
 
 from app.core.cache import redis_cache
 
@@ -71,3 +72,54 @@ async def test_redis_cache_returns_cached_value_without_calling_handler(
     assert result == {"limit": 30}
     assert handler_calls == 0
     redis.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_stores_encoded_response_body(
+    monkeypatch: pytest.MonkeyPatch,
+    request_factory: RequestFactory,
+) -> None:
+    """Pre-encoded responses should be cached as their raw body."""
+    # Arrange
+    redis = AsyncMock()
+    redis.get.return_value = None
+    monkeypatch.setattr("app.core.cache.get_redis", lambda: redis)
+
+    @redis_cache("items", ttl=5, media_type="application/json")
+    async def handler(request: Request) -> Response:
+        return Response(content=b'{"total":1}', media_type="application/json")
+
+    # Act
+    result = await handler(request_factory())
+
+    # Assert
+    assert result.body == b'{"total":1}'
+    redis.set.assert_awaited_once_with(ANY, b'{"total":1}', ex=5)
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_replays_encoded_response_body(
+    monkeypatch: pytest.MonkeyPatch,
+    request_factory: RequestFactory,
+) -> None:
+    """Cache hits for pre-encoded responses should skip JSON decoding."""
+    # Arrange
+    redis = AsyncMock()
+    redis.get.return_value = '{"total":1}'
+    monkeypatch.setattr("app.core.cache.get_redis", lambda: redis)
+    handler_calls = 0
+
+    @redis_cache("items", media_type="application/json")
+    async def handler(request: Request) -> Response:
+        nonlocal handler_calls
+        handler_calls += 1
+        return Response(content=b"{}", media_type="application/json")
+
+    # Act
+    result = await handler(request_factory())
+
+    # Assert
+    assert isinstance(result, Response)
+    assert result.body == b'{"total":1}'
+    assert result.media_type == "application/json"
+    assert handler_calls == 0
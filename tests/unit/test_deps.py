@@ -1,13 +1,15 @@
 """Unit tests for request ownership dependencies."""
 
 from collections.abc import Callable
+from unittest.mock import MagicMock
 
 import pytest
 from starlette.requests import Request
 
-from app.api.deps import get_owner_id, require_task_admin_token
+from app.api import deps
+from app.api.deps import get_current_claims, get_owner_id, require_task_admin_token
 from app.core.exceptions import ForbiddenError, UnauthorizedError
-from app.core.security import create_access_token
+from app.core.security import create_access_token, decode_token
 from app.core.settings import settings
 
 RequestFactory = Callable[..., Request]
@@ -89,6 +91,32 @@ async def test_get_owner_id_rejects_missing_required_scope(
         )
 
 
+@pytest.mark.asyncio
+async def test_claims_are_decoded_once_per_request(
+    monkeypatch: pytest.MonkeyPatch,
+    request_factory: RequestFactory,
+) -> None:
+    """Dependencies sharing a request should reuse the first token decode."""
+    # Arrange
+    monkeypatch.setattr(settings, "AUTH_REQUIRED", True)
+    token = create_access_token("user-123")
+    decode = MagicMock(wraps=decode_token)
+    monkeypatch.setattr(deps, "decode_token_cached", decode)
+    request = _request_with_session(request_factory, "session-123")
+
+    # Act
+    claims = await get_current_claims(request, token=token)
+    owner_id = await get_owner_id(
+        request,
+        token=token,
+        required_scopes=("parcels:write",),
+    )
+
+    # Assert
+    assert claims.sub == owner_id == "user-123"
+    decode.assert_called_once_with(token)
+
+
 def test_require_task_admin_token_accepts_configured_token(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -0,0 +1,42 @@
+"""Unit tests for the shared outbound HTTP client."""
+
+import pytest
+
+from app.core.settings import settings
+from app.http_client import client as http_module
+
+
+@pytest.mark.asyncio
+async def test_get_http_client_reuses_one_configured_pool(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Every call should return the same client, built from the settings."""
+    # Arrange
+    monkeypatch.setattr(http_module, "_client", None)
+    monkeypatch.setattr(settings, "HTTP_TIMEOUT_SEC", 4.0)
+    monkeypatch.setattr(settings, "HTTP_CONNECT_TIMEOUT_SEC", 1.5)
+
+    # Act
+    first = http_module.get_http_client()
+    second = http_module.get_http_client()
+
+    # Assert
+    assert first is second
+    assert first.timeout.read == 4.0
+    assert first.timeout.connect == 1.5
+    await http_module.close_http_client()
+    assert first.is_closed
+    assert http_module._client is None
+
+
+@pytest.mark.asyncio
+async def test_close_http_client_when_none(monkeypatch: pytest.MonkeyPatch) -> None:
+    """close_http_client should not raise when no client was created."""
+    # Arrange
+    monkeypatch.setattr(http_module, "_client", None)
+
+    # Act
+    await http_module.close_http_client()
+
+    # Assert
+    assert http_module._client is None
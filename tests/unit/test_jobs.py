@@ -0,0 +1,141 @@
+"""Unit tests for Redis-backed job progress records."""
+
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+
+from app.core import jobs as jobs_module
+from app.core.jobs import get_job, start_job, update_job
+
+
+@pytest.fixture
+def redis_mock(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Replace Redis with a mock whose pipeline records queued commands."""
+    redis = AsyncMock()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis.pipeline = MagicMock(return_value=pipe)
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=None)
+    redis.exists.return_value = 1
+    monkeypatch.setattr(jobs_module, "get_redis", lambda: redis)
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_update_job_queues_counters_and_capped_errors(
+    redis_mock: AsyncMock,
+) -> None:
+    """Progress and errors should be written in one pipeline with a cap."""
+    # Arrange
+    pipe = redis_mock.pipeline.return_value
+
+    # Act
+    await update_job(
+        "job-1",
+        status="running",
+        progress={"processed": 3, "failed": 1},
+        info={"rate": "90.5"},
+        errors=[{"line": 2, "msg": "bad"}],
+    )
+
+    # Assert
+    pipe.hset.assert_any_call("job:job-1", "status", "running")
+    pipe.hset.assert_any_call("job:job-1", "info.rate", "90.5")
+    assert pipe.hincrby.call_args_list == [
+        call("job:job-1", "progress.processed", 3),
+        call("job:job-1", "progress.failed", 1),
+    ]
+    pipe.rpush.assert_called_once_with("job:job-1:errors", '{"line": 2, "msg": "bad"}')
+    pipe.ltrim.assert_called_once()
+    pipe.execute.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_writes_to_an_expired_job_are_dropped(redis_mock: AsyncMock) -> None:
+    """Late writes must not recreate a job hash without its kind and owner."""
+    # Arrange
+    redis_mock.exists.return_value = 0
+
+    # Act
+    started = await start_job("job-1")
+    await update_job("job-1", status="completed", progress={"processed": 1})
+
+    # Assert
+    assert started is False
+    redis_mock.hsetnx.assert_not_awaited()
+    redis_mock.pipeline.assert_not_called()
+
+
+@pytest.mark.parametrize(("claimed", "expected"), [(1, True), (0, False)])
+@pytest.mark.asyncio
+async def test_start_job_runs_only_once(
+    redis_mock: AsyncMock,
+    claimed: int,
+    expected: bool,
+) -> None:
+    """Only the caller that sets started_at first should start the job."""
+    # Arrange
+    redis_mock.hsetnx.return_value = claimed
+
+    # Act
+    started = await start_job("job-1")
+
+    # Assert
+    assert started is expected
+    assert redis_mock.pipeline.return_value.execute.await_count == int(expected)
+
+
+@pytest.mark.asyncio
+async def test_get_job_parses_progress_and_errors(redis_mock: AsyncMock) -> None:
+    """Stored hash fields and error JSON should map onto a Job snapshot."""
+    # Arrange
+    redis_mock.hgetall.return_value = {
+        "kind": "parcel_import",
+        "owner_id": "owner",
+        "status": "completed",
+        "created_at": "2026-01-01T12:00:00+00:00",
+        "updated_at": "2026-01-01T12:00:03+00:00",
+        "started_at": "2026-01-01T12:00:01+00:00",
+        "progress.processed": "3",
+        "progress.created": "2",
+        "info.rate": "90.5",
+    }
+    redis_mock.lrange.return_value = ['{"line": 2, "msg": "bad"}']
+
+    # Act
+    job = await get_job("job-1")
+
+    # Assert
+    assert job is not None
+    assert job.status == "completed"
+    assert job.progress == {"processed": 3, "created": 2}
+    assert job.info == {"rate": "90.5"}
+    assert job.started_at is not None
+    assert job.errors == [{"line": 2, "msg": "bad"}]
+
+
+@pytest.mark.asyncio
+async def test_get_job_returns_none_for_missing_job(redis_mock: AsyncMock) -> None:
+    """Expired or unknown job IDs should read as missing."""
+    # Arrange
+    redis_mock.hgetall.return_value = {}
+
+    # Act / Assert
+    assert await get_job("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_get_job_treats_a_partial_hash_as_missing(redis_mock: AsyncMock) -> None:
+    """A hash left by an update racing expiry should read as an expired job."""
+    # Arrange
+    redis_mock.hgetall.return_value = {
+        "updated_at": "2026-01-01T12:00:00+00:00",
+        "status": "completed",
+    }
+
+    # Act
+    job = await get_job("job-1")
+
+    # Assert
+    assert job is None
@@ -0,0 +1,100 @@
+"""Byte-for-byte compatibility tests for the pluggable JSON codec."""
+
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from starlette.responses import JSONResponse
+
+from app.core.json_codec import JSONCodec, orjson_codec, stdlib_codec
+from app.schemas import PaginatedResponse, ParcelCreate, ParcelRead, ParcelTypeRead
+
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def codec(request: pytest.FixtureRequest) -> JSONCodec:
+    """Return each backend that is installed in this environment."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        return orjson_codec()
+    return stdlib_codec()
+
+
+def test_error_envelope_matches_previous_rendering(codec: JSONCodec) -> None:
+    """Validation error envelopes should encode exactly as before."""
+    # Arrange
+    with pytest.raises(ValidationError) as exc_info:
+        ParcelCreate.model_validate(
+            {"name": "Посылка", "weightKg": "-1", "declaredValueUsd": "x"}
+        )
+    envelope = {
+        "code": "validation_error",
+        "message": "Payload validation failed",
+        "details": exc_info.value.errors(),
+    }
+    expected = JSONResponse(content=jsonable_encoder(envelope)).body
+
+    # Act
+    body = codec.dumps(envelope)
+
+    # Assert
+    assert body == expected
+
+
+def test_model_matches_response_model_rendering(codec: JSONCodec) -> None:
+    """Models should encode like FastAPI renders them as response models."""
+    # Arrange
+    page = PaginatedResponse[ParcelRead](
+        items=[
+            ParcelRead(
+                id="p1",
+                name='Посылка "1"',
+                weight_kg=Decimal("1.200"),
+                declared_value_usd=Decimal("1E+2"),
+                delivery_cost_rub=None,
+                parcel_type=ParcelTypeRead(id="t1", name="электроника"),
+            )
+        ],
+        total=1,
+        limit=20,
+        offset=0,
+    )
+
+    # Act
+    body = codec.dumps(page)
+
+    # Assert
+    assert body == page.model_dump_json(by_alias=True).encode()
+
+
+def test_plain_values_match_stdlib_conventions(codec: JSONCodec) -> None:
+    """Bare values should encode as jsonable_encoder renders them."""
+    # Arrange
+    payload = {
+        "gt": Decimal("0"),
+        "cost": Decimal("150.50"),
+        "at": datetime(2026, 1, 2, 3, 4, 5, 600, tzinfo=UTC),
+        "id": UUID("99e93aee-776d-4bc5-8157-ab80a12b6556"),
+        1: None,
+    }
+
+    # Act
+    body = codec.dumps(payload)
+
+    # Assert
+    assert body == (
+        b'{"gt":0,"cost":150.5,"at":"2026-01-02T03:04:05.000600+00:00",'
+        b'"id":"99e93aee-776d-4bc5-8157-ab80a12b6556","1":null}'
+    )
+
+
+def test_loads_reads_text_and_bytes(codec: JSONCodec) -> None:
+    """Cache hits come back from Redis as text; both forms should decode."""
+    # Act
+    from_text = codec.loads('{"limit":30}')
+    from_bytes = codec.loads(b'{"limit":30}')
+
+    # Assert
+    assert from_text == from_bytes == {"limit": 30}
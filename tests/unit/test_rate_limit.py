@@ -1,12 +1,19 @@
-"""Unit tests for rate-limit response helpers."""
+"""Unit tests for the route limiter and rate-limit response helpers."""
 
 import json
 from collections.abc import Callable
+from typing import cast
+from unittest.mock import AsyncMock
 
 import pytest
 from starlette.requests import Request
 
-from app.core.rate_limit import RateLimitExceeded, rate_limit_exceeded_handler
+from app.core.rate_limit import (
+    Limiter,
+    RateLimitExceeded,
+    rate_limit_exceeded_handler,
+)
+from app.core.settings import settings
 
 RequestFactory = Callable[..., Request]
 
@@ -28,3 +35,50 @@ async def test_rate_limit_exceeded_handler_returns_stable_json(
     assert json.loads(bytes(response.body)) == {
         "error": "Rate limit exceeded: 20 per 1 minute",
     }
+
+
+@pytest.mark.asyncio
+async def test_limit_charges_cost_computed_from_handler_kwargs(
+    request_factory: RequestFactory,
+) -> None:
+    """Weighted limits should consume as many hits as the cost callable says."""
+    # Arrange
+    limiter = Limiter(settings.REDIS_RATE_LIMIT_URL)
+    strategy = AsyncMock()
+    strategy.hit.return_value = True
+    limiter._strategy = strategy
+
+    @limiter.limit(
+        "10/minute", cost=lambda kwargs: len(cast(list[int], kwargs["body"]))
+    )
+    async def handler(request: Request, body: list[int]) -> int:
+        return len(body)
+
+    # Act
+    result = await handler(request=request_factory(), body=[1, 2, 3])
+
+    # Assert
+    assert result == 3
+    assert strategy.hit.await_args.kwargs["cost"] == 3
+
+
+@pytest.mark.asyncio
+async def test_limit_rejects_when_weighted_hit_is_refused(
+    request_factory: RequestFactory,
+) -> None:
+    """A refused hit should raise RateLimitExceeded before the handler runs."""
+    # Arrange
+    limiter = Limiter(settings.REDIS_RATE_LIMIT_URL)
+    strategy = AsyncMock()
+    strategy.hit.return_value = False
+    limiter._strategy = strategy
+    handler_body = AsyncMock()
+
+    @limiter.limit("10/minute", cost=lambda _kwargs: 11)
+    async def handler(request: Request) -> None:
+        await handler_body()
+
+    # Act / Assert
+    with pytest.raises(RateLimitExceeded):
+        await handler(request=request_factory())
+    handler_body.assert_not_awaited()
@@ -9,6 +9,7 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from app import scheduler_main
+from app.core.settings import settings
 from app.version import __version__
 
 
@@ -37,10 +38,31 @@ async def test_main_wires_scheduler_lifecycle(
     init_sentry = MagicMock()
     init_scheduler = MagicMock(return_value=scheduler)
     close_redis = AsyncMock()
+    close_http_client = AsyncMock()
+    consume_pricing_stream = AsyncMock()
+    consume_recalc_requests = AsyncMock()
+    schedule_recalc_adaptively = AsyncMock()
+    start_http_server = MagicMock()
+    request_recalc_stop = MagicMock()
+    wait_recalc_idle = AsyncMock(return_value=True)
+    monkeypatch.setattr(scheduler_main, "start_http_server", start_http_server)
+    monkeypatch.setattr(scheduler_main, "request_recalc_stop", request_recalc_stop)
+    monkeypatch.setattr(scheduler_main, "wait_recalc_idle", wait_recalc_idle)
     monkeypatch.setattr(scheduler_main, "setup_logging", setup_logging)
     monkeypatch.setattr(scheduler_main, "init_sentry", init_sentry)
     monkeypatch.setattr(scheduler_main, "init_scheduler", init_scheduler)
     monkeypatch.setattr(scheduler_main, "close_redis", close_redis)
+    monkeypatch.setattr(scheduler_main, "close_http_client", close_http_client)
+    monkeypatch.setattr(
+        scheduler_main, "consume_pricing_stream", consume_pricing_stream
+    )
+    monkeypatch.setattr(
+        scheduler_main, "consume_recalc_requests", consume_recalc_requests
+    )
+    monkeypatch.setattr(
+        scheduler_main, "schedule_recalc_adaptively", schedule_recalc_adaptively
+    )
+    monkeypatch.setattr(settings, "DELIVERY_SCHEDULE", "adaptive")
     monkeypatch.setattr(asyncio, "new_event_loop", lambda: loop)
     set_event_loop = MagicMock()
     monkeypatch.setattr(asyncio, "set_event_loop", set_event_loop)
@@ -48,16 +70,50 @@ async def test_main_wires_scheduler_lifecycle(
     # Act
     scheduler_main.main()
     signal_handlers[int(signal.SIGTERM)]()
-    await created_tasks[0]
+    *consumer_coros, cleanup_coro = created_tasks
+    for coro in consumer_coros:
+        await coro
+    await cleanup_coro
 
     # Assert
     setup_logging.assert_called_once_with()
     init_sentry.assert_called_once_with(release=__version__)
+    start_http_server.assert_called_once_with(settings.SCHEDULER_METRICS_PORT)
     set_event_loop.assert_called_once_with(loop)
     init_scheduler.assert_called_once_with(loop)
     scheduler.start.assert_called_once_with()
+    consume_pricing_stream.assert_called_once_with()
+    consume_recalc_requests.assert_called_once_with()
+    schedule_recalc_adaptively.assert_called_once_with()
     assert set(signal_handlers) == {int(signal.SIGINT), int(signal.SIGTERM)}
     loop.run_forever.assert_called_once_with()
     scheduler.shutdown.assert_called_once_with()
+    request_recalc_stop.assert_called_once_with()
+    wait_recalc_idle.assert_awaited_once_with(settings.DELIVERY_DRAIN_TIMEOUT_SEC)
     close_redis.assert_awaited_once_with()
+    close_http_client.assert_awaited_once_with()
     loop.stop.assert_called_once_with()
+
+
+def test_main_skips_metrics_server_when_disabled(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """No metrics port should be opened when metrics are turned off."""
+    # Arrange
+    start_http_server = MagicMock()
+    monkeypatch.setattr(settings, "ENABLE_METRICS", False)
+    monkeypatch.setattr(settings, "PRICING_STREAM_ENABLED", False)
+    monkeypatch.setattr(scheduler_main, "start_http_server", start_http_server)
+    monkeypatch.setattr(scheduler_main, "setup_logging", MagicMock())
+    monkeypatch.setattr(scheduler_main, "init_sentry", MagicMock())
+    monkeypatch.setattr(scheduler_main, "init_scheduler", MagicMock())
+    monkeypatch.setattr(scheduler_main, "consume_recalc_requests", MagicMock())
+    monkeypatch.setattr(scheduler_main, "schedule_recalc_adaptively", MagicMock())
+    monkeypatch.setattr(asyncio, "new_event_loop", MagicMock)
+    monkeypatch.setattr(asyncio, "set_event_loop", MagicMock())
+
+    # Act
+    scheduler_main.main()
+
+    # Assert
+    start_http_server.assert_not_called()
@@ -1,16 +1,27 @@
 """Unit tests for JWT token and password hashing utilities."""
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
 
 import jwt
 import pytest
 
+from app.core import security
+from app.core.exceptions import ServiceUnavailableError
 from app.core.security import (
     create_access_token,
     decode_token,
+    decode_token_cached,
     hash_password,
+    hash_password_async,
+    shutdown_password_hasher,
     validate_jwt_secret,
     verify_password,
+    verify_password_async,
 )
 from app.core.settings import settings
 
@@ -40,6 +51,61 @@ def test_verify_wrong_password() -> None:
     assert not verified
 
 
+@pytest.mark.asyncio
+async def test_async_password_helpers_run_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Hashing should run on the bcrypt pool and record its queue wait."""
+    # Arrange
+    wait = MagicMock()
+    monkeypatch.setattr(security, "PASSWORD_HASH_WAIT", wait)
+    threads: list[str] = []
+
+    def recording_hash_password(password: str) -> str:
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+
+    monkeypatch.setattr(security, "hash_password", recording_hash_password)
+
+    # Act
+    hashed = await hash_password_async("my-secret-password")
+    verified = await verify_password_async("my-secret-password", hashed)
+    shutdown_password_hasher()
+
+    # Assert
+    assert verified
+    assert threads[0].startswith("bcrypt")
+    assert [call.kwargs for call in wait.labels.call_args_list] == [
+        {"op": "hash"},
+        {"op": "verify"},
+    ]
+    assert security._hash_pending == 0
+
+
+@pytest.mark.asyncio
+async def test_async_password_helpers_reject_when_the_queue_is_full(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Calls beyond PASSWORD_HASH_MAX_PENDING should fail fast with 503."""
+    # Arrange
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 1)
+    rejected = MagicMock()
+    monkeypatch.setattr(security, "PASSWORD_HASH_REJECTED", rejected)
+    release = threading.Event()
+    monkeypatch.setattr(security, "hash_password", lambda _: release.wait() and "h")
+    running = asyncio.create_task(hash_password_async("first"))
+    await asyncio.sleep(0)
+
+    # Act / Assert
+    with pytest.raises(ServiceUnavailableError):
+        await verify_password_async("second", "hash")
+    release.set()
+    assert await running == "h"
+    shutdown_password_hasher()
+    rejected.labels.assert_called_once_with(op="verify")
+    assert security._hash_pending == 0
+
+
 def test_create_and_decode_token() -> None:
     """JWT creation and decoding should round-trip the subject."""
     # Arrange
@@ -133,6 +199,87 @@ def test_decode_rejects_wrong_issuer_or_audience(claim: str, value: str) -> None
     assert decoded is None
 
 
+@pytest.fixture
+def decode_calls(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Start from an empty claims cache and count full token verifications."""
+    monkeypatch.setattr(security, "_claims_cache", OrderedDict())
+    spy = MagicMock(wraps=security._decode_claims)
+    monkeypatch.setattr(security, "_decode_claims", spy)
+    return spy
+
+
+def test_decode_token_cached_verifies_token_once(decode_calls: MagicMock) -> None:
+    """Repeat lookups of a token should reuse the verified claims."""
+    # Arrange
+    token = create_access_token("user-123", scopes=("parcels:read",))
+
+    # Act
+    first = decode_token_cached(token)
+    second = decode_token_cached(token)
+    missing_scope = decode_token_cached(token, required_scopes=("parcels:write",))
+
+    # Assert
+    assert first is not None
+    assert second == first
+    assert missing_scope is None
+    decode_calls.assert_called_once_with(token)
+
+
+def test_decode_token_cached_reverifies_after_exp(decode_calls: MagicMock) -> None:
+    """A cached entry should not be served once its exp has passed."""
+    # Arrange
+    token = create_access_token("user-123")
+    claims = decode_token_cached(token)
+    assert claims is not None
+    ((key, _),) = security._claims_cache.items()
+    security._claims_cache[key] = (claims, time.time() - 1)
+
+    # Act
+    decoded = decode_token_cached(token)
+
+    # Assert
+    assert decoded == claims
+    assert decode_calls.call_count == 2
+    assert security._claims_cache[key][1] > time.time()
+
+
+def test_decode_token_cached_evicts_least_recently_used(
+    monkeypatch: pytest.MonkeyPatch,
+    decode_calls: MagicMock,
+) -> None:
+    """The cache should hold JWT_CLAIMS_CACHE_SIZE tokens, evicting the oldest."""
+    # Arrange
+    monkeypatch.setattr(settings, "JWT_CLAIMS_CACHE_SIZE", 2)
+    first, second, third = (create_access_token(f"user-{i}") for i in range(3))
+    decode_token_cached(first)
+    decode_token_cached(second)
+    decode_token_cached(first)
+
+    # Act
+    decode_token_cached(third)
+    decode_token_cached(first)
+    decode_token_cached(second)
+
+    # Assert
+    assert [call.args[0] for call in decode_calls.call_args_list] == [
+        first,
+        second,
+        third,
+        second,
+    ]
+
+
+def test_decode_token_cached_skips_invalid_tokens(decode_calls: MagicMock) -> None:
+    """Failed verifications should not be cached."""
+    # Act
+    decoded = decode_token_cached("not-a-valid-token")
+
+    # Assert
+    assert decoded is None
+    assert decode_calls.call_count == 1
+    assert not security._claims_cache
+
+
 def test_validate_jwt_secret_rejects_default_in_prod(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None: